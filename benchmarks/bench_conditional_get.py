@@ -0,0 +1,37 @@
+import time
+from benchmarks import stub_server
+from lib.api_client import APIClient
+from lib.rate_limit import RateLimiter
+
+POLLS = 200
+
+
+def poll(client: APIClient):
+    for _ in range(POLLS):
+        client.get_agents()
+        client.get_orchestrator_status()
+        client.get_health()
+
+
+def main():
+    server = stub_server.start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    unlimited = dict(rate=1e9, burst=1e9, endpoints={})
+
+    for conditional in (False, True):
+        client = APIClient(base_url, limiter=RateLimiter(**unlimited))
+        if not conditional:
+            # Drop validators so every poll downloads and parses the full body
+            client.cache.get = lambda key: None
+        server.bytes_sent = 0
+        start = time.perf_counter()
+        poll(client)
+        elapsed = time.perf_counter() - start
+        print(f"conditional={conditional}: {elapsed * 1000 / (POLLS * 3):.3f} ms/call, "
+              f"{server.bytes_sent} body bytes sent, cache {client.cache.stats()}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
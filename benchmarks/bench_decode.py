@@ -0,0 +1,86 @@
+import gzip
+import json
+import time
+from benchmarks import stub_server
+from lib.api_client import APIClient
+from lib.datagen import Dataset
+from lib.rate_limit import RateLimiter
+from lib import wire_format
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+REPEAT = 5
+
+
+def log_page(size: int) -> dict:
+    template = APIClient._mock_logs()["logs"]
+    logs = [dict(template[i % len(template)], id=f"log-{i:06d}") for i in range(size)]
+    return {"logs": logs, "total": size, "hasMore": False}
+
+
+def best_of(fn, payload) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn(payload)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def end_to_end(base_url: str, size: int, accept: str) -> float:
+    """Best get_logs time through APIClient (request, gzip, decode, parse into records) for one Accept"""
+    client = APIClient(base_url, limiter=RateLimiter(rate=1e9, burst=1e9, endpoints={}))
+    client.session.headers["Accept"] = accept
+    client.cache.get = lambda key: None  # Every call downloads and decodes the full body
+    try:
+        return best_of(lambda limit: client.get_logs(limit=limit), size)
+    finally:
+        client.close()
+
+
+def main():
+    server = stub_server.start(dataset=Dataset(logs=10_000))
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    for size in (1000, 10000):
+        page = log_page(size)
+        body = json.dumps(page).encode()
+        print(f"--- {size} logs ---")
+
+        sizes = {"json": len(body), "json+gzip": len(gzip.compress(body, 5))}
+        if brotli is not None:
+            sizes["json+br"] = len(brotli.compress(body, quality=5))
+        if zstandard is not None:
+            sizes["json+zstd"] = len(zstandard.ZstdCompressor(level=3).compress(body))
+        decoders = {"json.loads": (json.loads, body)}
+        if wire_format.orjson is not None:
+            decoders["orjson.loads"] = (wire_format.orjson.loads, body)
+        if wire_format.msgpack is not None:
+            packed = wire_format.encode(page, wire_format.MSGPACK_TYPE)
+            sizes["msgpack"] = len(packed)
+            sizes["msgpack+gzip"] = len(gzip.compress(packed, 5))
+            decoders["msgpack.unpackb"] = (lambda b: wire_format.msgpack.unpackb(b, raw=False), packed)
+
+        for name, nbytes in sizes.items():
+            print(f"{name:>16}: {nbytes:>10,} bytes on the wire")
+        for name, (fn, payload) in decoders.items():
+            print(f"{name:>16}: {best_of(fn, payload):8.2f} ms decode")
+        accepts = {"json": wire_format.JSON_TYPE}
+        if wire_format.msgpack is not None:
+            accepts["msgpack"] = wire_format.MSGPACK_TYPE
+        for name, accept in accepts.items():
+            print(f"{name:>16}: {end_to_end(base_url, size, accept):8.2f} ms get_logs via APIClient")
+        print(f"{'default Accept':>16}: {wire_format.ACCEPT}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""Concurrent-viewer load test
+
+    python -m benchmarks.loadtest --sessions 1 5 10 25 --duration 30
+
+Each simulated viewer cycles through the dashboard pages and re-renders every
+config.REFRESH_INTERVAL seconds, either through Streamlit's headless AppTest
+(`--mode render`, the real page code) or by replaying each page's APIClient calls
+(`--mode client`). The stub backend runs in a child process so CPU and RSS figures
+belong to the dashboard side only.
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+PAGES = ["📊 Overview", "🤖 Agents", "📝 Logs", "📊 Metrics", "🔗 Traces", "⚙️ Settings"]
+
+# The APIClient calls each page's render() makes, in order
+PAGE_CALLS: Dict[str, Callable[[Any], Any]] = {
+    "📊 Overview": lambda c: c.batch(lambda c: c.get_overview_stats(), lambda c: c.get_overview_activity(),
+                                     lambda c: c.get_orchestrator_status(), lambda c: c.get_agents(),
+                                     lambda c: c.get_logs(limit=5)),
+    "🤖 Agents": lambda c: c.get_agents(),
+    "📝 Logs": lambda c: c.get_logs(limit=50),
+    "📊 Metrics": lambda c: (c.get_metrics_frame("tokens"), c.get_metrics_frame("costs"),
+                            c.get_metrics_frame("latency"), c.get_agents(), c.get_logs(limit=500)),
+    "🔗 Traces": lambda c: c.get_traces(limit=20),
+    "⚙️ Settings": lambda c: (c.get_health(), c.get_orchestrator_status()),
+}
+
+
+def rss_mb() -> float:
+    """Current resident set size; falls back to the peak where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class Viewer(threading.Thread):
+    """One simulated dashboard session"""
+
+    def __init__(self, index: int, base_url: str, mode: str, interval: float, stop: threading.Event,
+                 samples: List[float], errors: List[str]):
+        super().__init__(daemon=True, name=f"viewer-{index}")
+        self.index = index
+        self.base_url = base_url
+        self.mode = mode
+        self.interval = interval
+        self.stop = stop
+        self.samples = samples
+        self.errors = errors
+
+    def run(self):
+        render = self._app_render() if self.mode == "render" else self._client_render()
+        # Stagger sessions so they do not all refresh in the same instant
+        self.stop.wait(self.interval * self.index / 10 % self.interval)
+        tick = 0
+        while not self.stop.is_set():
+            page = PAGES[(self.index + tick // 3) % len(PAGES)]
+            start = time.perf_counter()
+            try:
+                render(page)
+            except Exception as e:
+                self.errors.append(f"{page}: {e}")
+            elapsed = time.perf_counter() - start
+            self.samples.append(elapsed)
+            tick += 1
+            self.stop.wait(max(0.0, self.interval - elapsed))
+
+    def _app_render(self) -> Callable[[str], None]:
+        from streamlit.testing.v1 import AppTest
+
+        main_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+        at = AppTest.from_file(main_path, default_timeout=120)
+        at.session_state["api_base_url"] = self.base_url
+        at.run()
+
+        def render(page: str):
+            if at.sidebar.radio(key="nav").value != page:
+                at.sidebar.radio(key="nav").set_value(page)
+            at.run()
+            if at.exception:
+                raise RuntimeError(at.exception[0].value)
+        return render
+
+    def _client_render(self) -> Callable[[str], None]:
+        from lib.client_registry import registry
+
+        client = registry.get(self.base_url)
+        return lambda page: PAGE_CALLS[page](client)
+
+
+def backend_requests() -> int:
+    from lib.instrumentation import instrumentation
+    return sum(row["requests"] for row in instrumentation.snapshot())
+
+
+def run_step(sessions: int, base_url: str, mode: str, interval: float, duration: float) -> Dict[str, Any]:
+    stop = threading.Event()
+    samples: List[float] = []
+    errors: List[str] = []
+    viewers = [Viewer(i, base_url, mode, interval, stop, samples, errors) for i in range(sessions)]
+    for viewer in viewers:
+        viewer.start()
+    # Let every session finish its first render (imports, connection setup) before measuring
+    time.sleep(min(interval, duration / 3))
+    samples.clear()
+    requests_before, cpu_before, started = backend_requests(), cpu_seconds(), time.perf_counter()
+    time.sleep(duration)
+    elapsed = time.perf_counter() - started
+    requests_after, cpu_after = backend_requests(), cpu_seconds()
+    rss = rss_mb()
+    stop.set()
+    for viewer in viewers:
+        viewer.join(timeout=interval + 30)
+    return {
+        "sessions": sessions,
+        "renders": len(samples),
+        "renders_per_second": round(len(samples) / elapsed, 2),
+        "backend_qps": round((requests_after - requests_before) / elapsed, 1),
+        "render_p50_ms": round(percentile(samples, 0.50) * 1000, 1),
+        "render_p99_ms": round(percentile(samples, 0.99) * 1000, 1),
+        "render_mean_ms": round(statistics.mean(samples) * 1000, 1) if samples else 0.0,
+        "cpu_percent": round(100 * (cpu_after - cpu_before) / elapsed, 1),
+        "rss_mb": round(rss, 1),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+    }
+
+
+def start_stub(args) -> subprocess.Popen:
+    command = [sys.executable, "-u", "-m", "benchmarks.stub_server", "--port", str(args.stub_port),
+               "--logs", str(args.logs), "--agents", str(args.agents), "--traces", str(args.traces),
+               "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+               "--error-rate", str(args.error_rate)]
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen(command, cwd=root, stdout=subprocess.PIPE, text=True)
+    # The stub prints its address once the dataset is generated and the socket is bound
+    for line in process.stdout:
+        if "listening" in line:
+            return process
+    raise RuntimeError("Stub backend failed to start")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Simulate concurrent dashboard viewers")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 25])
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds per step")
+    parser.add_argument("--mode", choices=["render", "client"], default="render")
+    parser.add_argument("--interval", type=float, help="Seconds between refreshes (default config.REFRESH_INTERVAL)")
+    parser.add_argument("--base-url", help="Use a running backend instead of starting the stub")
+    parser.add_argument("--stub-port", type=int, default=8765)
+    parser.add_argument("--logs", type=int, default=200_000)
+    parser.add_argument("--agents", type=int, default=50)
+    parser.add_argument("--traces", type=int, default=10_000)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--no-rate-limit", action="store_true", help="Lift the client's rate limits")
+    parser.add_argument("--output", "-o", help="Write results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.no_rate_limit:
+        os.environ["RATE_LIMIT_RPS"] = os.environ["RATE_LIMIT_BURST"] = "1000000"
+    import config
+    if args.no_rate_limit:
+        config.RATE_LIMIT_ENDPOINTS.clear()
+    interval = args.interval or config.REFRESH_INTERVAL
+
+    stub = None
+    base_url = args.base_url
+    if base_url is None:
+        stub = start_stub(args)
+        base_url = f"http://127.0.0.1:{args.stub_port}"
+    results = []
+    try:
+        print(f"{'sessions':>8} {'renders/s':>9} {'backend qps':>11} {'p50 ms':>8} {'p99 ms':>8} "
+              f"{'cpu %':>6} {'rss MB':>7} {'errors':>6}")
+        for sessions in args.sessions:
+            step = run_step(sessions, base_url, args.mode, interval, args.duration)
+            results.append(step)
+            print(f"{step['sessions']:>8} {step['renders_per_second']:>9} {step['backend_qps']:>11} "
+                  f"{step['render_p50_ms']:>8} {step['render_p99_ms']:>8} {step['cpu_percent']:>6} "
+                  f"{step['rss_mb']:>7} {step['errors']:>6}")
+            if step["first_error"]:
+                print(f"         first error: {step['first_error']}", file=sys.stderr)
+    finally:
+        if stub is not None:
+            stub.terminate()
+            stub.wait()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"mode": args.mode, "interval": interval, "base_url": base_url, "steps": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Re-render dashboard pages from a recorded cassette, with no backend
+
+    API_CASSETTE=session.cassette API_CASSETTE_MODE=record streamlit run main.py
+    python -m benchmarks.replay session.cassette --page "📊 Overview" --runs 5 --latency-scale 0
+
+Recording captures every API exchange of a real session (status, headers, raw body and
+time to last byte). Replaying serves them back byte for byte, waiting the recorded
+latencies times --latency-scale, so a slow render can be profiled and benchmarked
+offline. Requests the recording never made fail as if the backend were down; their
+count is reported as `misses`.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+from typing import Any, Dict, List, Optional
+from benchmarks.loadtest import PAGES
+
+
+def replay(pages: List[str], runs: int) -> Dict[str, Dict[str, Any]]:
+    from streamlit.testing.v1 import AppTest
+    from benchmarks.suite import summarize
+    from lib.cassette import open_cassette
+
+    main_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+    cassette = open_cassette()
+    results = {}
+    for page in pages:
+        at = AppTest.from_file(main_path, default_timeout=120)
+        at.run()
+        totals, phases, misses = [], {}, cassette.misses
+        for run in range(runs):
+            if run == 0:
+                at.sidebar.radio(key="nav").set_value(page).run()
+            else:
+                at.run()
+            if at.exception:
+                raise RuntimeError(f"{page} failed to render: {at.exception[0].value}")
+            profile = at.session_state["render_profiles"][-1]
+            totals.append(profile.total)
+            for name, seconds in profile.seconds.items():
+                phases.setdefault(name, []).append(seconds)
+        results[page] = summarize(totals, misses=cassette.misses - misses,
+                                  **{f"{name}_median_ms": round(statistics.median(samples) * 1000, 3)
+                                     for name, samples in phases.items()})
+    results["cassette"] = cassette.stats()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay a recorded session through the dashboard pages")
+    parser.add_argument("cassette", help="File written with API_CASSETTE_MODE=record")
+    parser.add_argument("--page", action="append", choices=PAGES, help="Pages to render (default: all)")
+    parser.add_argument("--runs", type=int, default=5, help="Renders per page; the first is the cold one")
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="Multiplier on recorded latencies (0 replays instantly)")
+    parser.add_argument("--output", "-o", help="Also write the results here as JSON")
+    args = parser.parse_args(argv)
+
+    # Config reads these on first import. The rate limit is lifted so a replay never refuses
+    # a call the recorded session made
+    os.environ["API_CASSETTE"] = args.cassette
+    os.environ["API_CASSETTE_MODE"] = "replay"
+    os.environ["API_CASSETTE_LATENCY_SCALE"] = str(args.latency_scale)
+    os.environ.setdefault("RATE_LIMIT_RPS", "1000000")
+    os.environ.setdefault("RATE_LIMIT_BURST", "1000000")
+    results = replay(args.page or PAGES, args.runs)
+
+    for name, result in results.items():
+        print(f"{name}: {json.dumps(result, ensure_ascii=False)}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,354 @@
+import base64
+import gzip
+import hashlib
+import json
+import random
+import re
+import select
+import struct
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse, parse_qs
+from lib.datagen import Dataset, iso
+from lib import wire_format
+
+STARTED = formatdate(usegmt=True)
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+BATCH_PATH = "/api/v1/batch"
+MAX_BATCH_SIZE = 20
+
+
+def _int(params: Dict[str, str], name: str, default: int) -> int:
+    try:
+        return max(0, int(params.get(name, default)))
+    except ValueError:
+        return default
+
+
+def _prefers(accept: str, media_type: str, other: str) -> bool:
+    """Whether an Accept header ranks `media_type` above `other` (by q, then by listed order)"""
+    ranks = {}
+    for position, entry in enumerate(accept.split(",")):
+        name, *params = [part.strip() for part in entry.split(";")]
+        q = next((float(p[2:]) for p in params if p.startswith("q=")), 1.0)
+        ranks.setdefault(name.lower(), (q, -position))
+    return media_type in ranks and ranks[media_type] > ranks.get(other, (0.0, 0))
+
+
+def _logs(data: Dataset, params: Dict[str, str], agent_id: str = "") -> Dict[str, Any]:
+    return data.logs(_int(params, "limit", 50), _int(params, "offset", 0), params.get("level", "all"),
+                     params.get("status", "all"), agent_id or params.get("agentId", ""), params.get("search", ""),
+                     params.get("traceId", ""))
+
+
+# path: handler(dataset, query params) -> response body
+ROUTES = {
+    "/api/v1/overview/stats": lambda data, params: data.overview_stats(),
+    "/api/v1/overview/activity": lambda data, params: data.activity(params.get("period", "24h")),
+    "/api/v1/agents": lambda data, params: data.agents(params.get("status", "all"), params.get("search", "")),
+    "/api/v1/logs": _logs,
+    "/api/v1/traces": lambda data, params: data.traces(_int(params, "limit", 20), _int(params, "offset", 0)),
+    "/api/v1/metrics/tokens": lambda data, params: data.metrics_tokens(params.get("period", "24h")),
+    "/api/v1/metrics/costs": lambda data, params: data.metrics_costs(params.get("period", "24h")),
+    "/api/v1/metrics/latency": lambda data, params: data.metrics_latency(params.get("period", "24h")),
+    "/api/v1/orchestrator/status": lambda data, params: data.orchestrator_status(),
+    "/api/v1/health": lambda data, params: {"status": "healthy", "version": "stub"},
+    "/api/v1/capabilities": lambda data, params: {"batch": BATCH_PATH, "maxBatchSize": MAX_BATCH_SIZE},
+}
+
+
+def _by_id(lookup: str, build):
+    def handler(data: Dataset, params: Dict[str, str], identifier: str):
+        index = getattr(data, lookup)(identifier)
+        return None if index is None else build(data, params, index, identifier)
+    return handler
+
+
+# (path pattern, handler(dataset, query params, id)); a handler returning None means 404
+ID_ROUTES = [
+    (re.compile(r"^/api/v1/agents/([^/]+)/logs$"),
+     _by_id("agent_index", lambda data, params, index, identifier: _logs(data, params, identifier))),
+    (re.compile(r"^/api/v1/agents/([^/]+)$"),
+     _by_id("agent_index", lambda data, params, index, identifier: data.agent_detail(index))),
+    (re.compile(r"^/api/v1/logs/([^/]+)$"),
+     _by_id("log_index", lambda data, params, index, identifier: data.log(index, detail=True))),
+    (re.compile(r"^/api/v1/traces/([^/]+)$"),
+     _by_id("trace_index", lambda data, params, index, identifier: data.trace_detail(index))),
+]
+
+# Routes that can also be served as Arrow IPC streams
+COLUMNAR_ROUTES = {"/api/v1/logs", "/api/v1/metrics/tokens", "/api/v1/metrics/costs", "/api/v1/metrics/latency"}
+
+
+class Faults:
+    """Latency, errors and slow-drip bodies injected into HTTP responses (seeded, so runs repeat)"""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 drip_bytes_per_second: int = 0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.drip_bytes_per_second = drip_bytes_per_second
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        """Seconds to wait before answering"""
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def error_status(self) -> Optional[int]:
+        """A 5xx status to fail this request with, or None"""
+        if not self.error_rate:
+            return None
+        with self._lock:
+            if self._rng.random() >= self.error_rate:
+                return None
+            return self._rng.choice((500, 502, 503))
+
+
+def _ws_frame(payload: bytes, opcode: int = 0x1) -> bytes:
+    """One unmasked, final server-to-client WebSocket frame"""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes = b"", headers: dict = None, drip: int = 0):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not body:
+            return
+        if not drip:
+            self.wfile.write(body)
+            return
+        # Slow drip: a tenth of the byte budget every 100ms
+        chunk = max(1, drip // 10)
+        for start in range(0, len(body), chunk):
+            self.wfile.write(body[start:start + chunk])
+            self.wfile.flush()
+            time.sleep(0.1)
+
+    def _route(self, path: str, params: Dict[str, str]) -> Any:
+        route = ROUTES.get(path)
+        if route is not None:
+            return route(self.server.dataset, params)
+        for pattern, handler in ID_ROUTES:
+            match = pattern.match(path)
+            if match:
+                return handler(self.server.dataset, params, match.group(1))
+        return None
+
+    def _inject_faults(self) -> bool:
+        """Apply the configured delay; True if this request was answered with an injected error"""
+        faults = self.server.faults
+        delay = faults.delay()
+        if delay:
+            time.sleep(delay)
+        status = faults.error_status()
+        if status is None:
+            return False
+        self._send(status, json.dumps({"error": "injected fault"}).encode(),
+                   {"Content-Type": wire_format.JSON_TYPE})
+        return True
+
+    def _encode(self, data: Any, columnar: bool = False):
+        """Body and headers for `data` in the best format the client accepts"""
+        accept = self.headers.get("Accept", "")
+        media_type = wire_format.JSON_TYPE
+        if columnar and wire_format.pa is not None and wire_format.ARROW_STREAM_TYPE in accept:
+            media_type = wire_format.ARROW_STREAM_TYPE
+        elif wire_format.msgpack is not None and _prefers(accept, wire_format.MSGPACK_TYPE, wire_format.JSON_TYPE):
+            media_type = wire_format.MSGPACK_TYPE
+        body = wire_format.encode(data, media_type)
+        headers = {"Content-Type": media_type, "Vary": "Accept, Accept-Encoding"}
+        if "gzip" in self.headers.get("Accept-Encoding", "") and len(body) > 1024:
+            body = gzip.compress(body, 5, mtime=0)
+            headers["Content-Encoding"] = "gzip"
+        return body, headers
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        self.server.count_request()
+        if url.path == "/ws/logs":
+            self._stream_logs(params)
+            return
+        if self._inject_faults():
+            return
+        data = self._route(url.path, params)
+        if data is None:
+            self._send(404)
+            return
+        body, headers = self._encode(data, url.path in COLUMNAR_ROUTES)
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        validators = {"ETag": etag, "Last-Modified": STARTED}
+        if self.headers.get("If-None-Match") == etag or (
+                "If-None-Match" not in self.headers and self.headers.get("If-Modified-Since") == STARTED):
+            self._send(304, headers=validators)
+            return
+        self.server.bytes_sent += len(body)
+        self._send(200, body, {**headers, **validators}, self.server.faults.drip_bytes_per_second)
+
+    def do_POST(self):
+        """Batched GETs: {"requests": [{id, path, params, headers}]} -> {"responses": [{id, status, headers, body}]}"""
+        url = urlparse(self.path)
+        self.server.count_request()
+        payload = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+        if url.path != BATCH_PATH:
+            self._send(404)
+            return
+        if self._inject_faults():
+            return
+        try:
+            batch = json.loads(payload)["requests"]
+        except (ValueError, KeyError, TypeError):
+            self._send(400)
+            return
+        if len(batch) > MAX_BATCH_SIZE:
+            self._send(413)
+            return
+        responses = []
+        for item in batch:
+            sub = urlparse(item.get("path", ""))
+            params = {k: v[0] for k, v in parse_qs(sub.query).items()}
+            params.update({k: str(v) for k, v in (item.get("params") or {}).items()})
+            data = self._route(sub.path, params)
+            if data is None:
+                responses.append({"id": item.get("id"), "status": 404, "headers": {}, "body": None})
+                continue
+            # Sub-response ETags hash the item's JSON, independent of how the whole batch is encoded
+            etag = '"%s"' % hashlib.sha1(wire_format.encode(data)).hexdigest()
+            if (item.get("headers") or {}).get("If-None-Match") == etag:
+                responses.append({"id": item.get("id"), "status": 304, "headers": {"ETag": etag}, "body": None})
+            else:
+                responses.append({"id": item.get("id"), "status": 200, "headers": {"ETag": etag}, "body": data})
+        body, headers = self._encode({"responses": responses})
+        self.server.bytes_sent += len(body)
+        self._send(200, body, headers, self.server.faults.drip_bytes_per_second)
+
+    def _stream_logs(self, params: Dict[str, str]):
+        """Push one new log entry per tick over a WebSocket until the client closes"""
+        key = self.headers.get("Sec-WebSocket-Key")
+        if self.headers.get("Upgrade", "").lower() != "websocket" or not key:
+            self._send(400)
+            return
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        self.send_response(101)
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.end_headers()
+        self.close_connection = True
+
+        try:
+            interval = 1 / float(params.get("rate", self.server.ws_rate))
+        except (ValueError, ZeroDivisionError):
+            interval = 1 / self.server.ws_rate
+        dataset = self.server.dataset
+        sequence = 0
+        while True:
+            # Replay the dataset as live traffic, newest timestamps first
+            log = dataset.log(sequence % dataset.n_logs)
+            log["id"] = f"live-{sequence:08d}"
+            log["timestamp"] = iso(time.time())
+            try:
+                self.wfile.write(_ws_frame(json.dumps(log).encode()))
+                self.wfile.flush()
+            except OSError:
+                return
+            sequence += 1
+            readable, _, _ = select.select([self.connection], [], [], interval)
+            if readable and not self._read_client_frame():
+                return
+
+    def _read_client_frame(self) -> bool:
+        """Consume one (masked) client frame; False once the client closed"""
+        header = self.rfile.read(2)
+        if len(header) < 2:
+            return False
+        opcode, length = header[0] & 0x0F, header[1] & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", self.rfile.read(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", self.rfile.read(8))[0]
+        mask = self.rfile.read(4) if header[1] & 0x80 else b"\0\0\0\0"
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(self.rfile.read(length)))
+        if opcode == 0x8:
+            try:
+                self.wfile.write(_ws_frame(payload[:2], 0x8))
+            except OSError:
+                pass
+            return False
+        if opcode == 0x9:
+            self.wfile.write(_ws_frame(payload, 0xA))
+        return True
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, dataset: Dataset, faults: Faults, ws_rate: float):
+        super().__init__(address, StubHandler)
+        self.dataset = dataset
+        self.faults = faults
+        self.ws_rate = ws_rate
+        self.bytes_sent = 0
+        self.requests = 0
+        self._count_lock = threading.Lock()
+
+    def count_request(self):
+        with self._count_lock:
+            self.requests += 1
+
+
+def start(port: int = 0, dataset: Optional[Dataset] = None, faults: Optional[Faults] = None,
+          ws_rate: float = 5.0, host: str = "127.0.0.1") -> StubServer:
+    """Start the stub on a daemon thread; port 0 picks a free port"""
+    server = StubServer((host, port), dataset or Dataset(), faults or Faults(), ws_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Local stub of the monitoring backend")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--logs", type=int, default=200_000, help="Synthetic log entries")
+    parser.add_argument("--agents", type=int, default=50)
+    parser.add_argument("--traces", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- spread around the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 5xx")
+    parser.add_argument("--drip-bps", type=int, default=0, help="Send bodies at this many bytes per second")
+    parser.add_argument("--ws-rate", type=float, default=5.0, help="Log entries per second on /ws/logs")
+    args = parser.parse_args()
+    started = time.perf_counter()
+    dataset = Dataset(args.logs, args.agents, args.traces, args.seed)
+    print(f"Generated {args.logs:,} logs, {args.agents:,} agents, {args.traces:,} traces "
+          f"in {time.perf_counter() - started:.1f}s")
+    faults = Faults(args.latency_ms, args.jitter_ms, args.error_rate, args.drip_bps, args.seed)
+    server = start(args.port, dataset, faults, args.ws_rate, args.host)
+    print(f"Stub backend listening on http://{args.host}:{server.server_port} (ws://{args.host}:{server.server_port}/ws/logs)")
+    threading.Event().wait()
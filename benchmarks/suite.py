@@ -0,0 +1,242 @@
+"""Offline benchmark suite for the client and render hot paths
+
+    python -m benchmarks.suite -o results.json [--baseline baseline.json] [--quick]
+
+Runs against the local stub backend only. Exits non-zero when any benchmark is slower
+than its baseline by more than its suite's regression threshold.
+"""
+import os
+
+# Benchmarks measure the client, not the rate limiter: lift the global limit before config is imported
+os.environ.setdefault("RATE_LIMIT_RPS", "1000000")
+os.environ.setdefault("RATE_LIMIT_BURST", "1000000")
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+import pandas as pd
+import config
+
+config.RATE_LIMIT_ENDPOINTS.clear()
+
+from benchmarks import stub_server
+from lib.datagen import Dataset
+from lib.api_client import APIClient
+from lib import ui_helpers
+
+SUITES = ["client", "charts", "pages"]
+# Relative slowdown of the median tolerated per suite; renders and network calls are noisier
+THRESHOLDS = {"client": 0.30, "charts": 0.20, "pages": 0.30}
+CHART_SIZES = [24, 1_000, 100_000, 1_000_000]
+CHART_BUILDERS = ["create_activity_chart", "create_token_distribution_chart", "create_cost_chart",
+                  "create_latency_chart"]
+PAGE_CASES = [
+    ("overview", "📊 Overview", {}),
+    ("logs.50", "📝 Logs", {"logs": 50}),
+    ("logs.200", "📝 Logs", {"logs": 200}),
+    ("logs.1000", "📝 Logs", {"logs": 1000}),
+    ("metrics", "📊 Metrics", {}),
+    ("agents.10", "🤖 Agents", {"agents": 10}),
+    ("agents.500", "🤖 Agents", {"agents": 500}),
+]
+
+
+def summarize(samples: List[float], **extra) -> Dict[str, Any]:
+    """Median, min and p95 of timings given in seconds, reported in milliseconds"""
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return {"median_ms": round(statistics.median(samples) * 1000, 4), "min_ms": round(samples[0] * 1000, 4),
+            "p95_ms": round(p95 * 1000, 4), "runs": len(samples), **extra}
+
+
+def timeit(fn: Callable[[], Any], runs: int, warmup: int = 1) -> List[float]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def sized_routes(logs: int = 50, agents: int = 20) -> Dict[str, Callable]:
+    """Stub routes returning fixed-size pages (the log page size ignores the request's limit)"""
+    data = Dataset(logs=max(logs, 2_000), agents=agents, traces=200)
+    return {
+        "/api/v1/logs": lambda dataset, params: data.logs(limit=logs),
+        "/api/v1/agents": lambda dataset, params: data.agents(),
+    }
+
+
+def bench_client(base_url: str, quick: bool) -> Dict[str, Dict[str, Any]]:
+    calls = 50 if quick else 300
+    results = {}
+    endpoints = {
+        "get_agents": lambda c: c.get_agents(),
+        "get_logs": lambda c: c.get_logs(),
+        "get_metrics_frame": lambda c: c.get_metrics_frame("tokens"),
+    }
+    for name, call in endpoints.items():
+        for conditional in (False, True):
+            client = APIClient(base_url)
+            if not conditional:
+                # Drop validators so every call downloads and decodes the full body
+                client.cache.get = lambda key: None
+            label = "revalidated" if conditional else "full"
+            results[f"client.sequential.{name}.{label}"] = summarize(timeit(lambda: call(client), calls))
+            client.close()
+
+    for workers in (4, 16):
+        client = APIClient(base_url, pool_size=workers)
+        client.cache.get = lambda key: None
+        per_worker = calls // workers or 1
+
+        def worker():
+            return timeit(lambda: client.get_agents(), per_worker, warmup=0)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(workers) as pool:
+            samples = [s for chunk in pool.map(lambda _: worker(), range(workers)) for s in chunk]
+        elapsed = time.perf_counter() - start
+        results[f"client.concurrent.get_agents.x{workers}"] = summarize(
+            samples, calls_per_second=round(len(samples) / elapsed, 1))
+        client.close()
+    return results
+
+
+def chart_data(size: int) -> pd.DataFrame:
+    rng = np.random.default_rng(size)
+    return pd.DataFrame({
+        "time": pd.date_range("2024-01-01", periods=size, freq="min"),
+        "requests": rng.integers(50, 500, size),
+        "tokens": rng.integers(5_000, 15_000, size),
+        "inputTokens": rng.integers(5_000, 50_000, size),
+        "outputTokens": rng.integers(10_000, 80_000, size),
+        "totalTokens": rng.integers(20_000, 100_000, size),
+        "cost": rng.uniform(0.1, 5, size),
+        "avg": rng.uniform(200, 400, size),
+        "p50": rng.uniform(150, 300, size),
+        "p95": rng.uniform(400, 800, size),
+        "p99": rng.uniform(800, 1500, size),
+    })
+
+
+def bench_charts(quick: bool) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    sizes = CHART_SIZES[:-1] if quick else CHART_SIZES
+    for size in sizes:
+        data = chart_data(size)
+        runs = 20 if size <= 1_000 else 5 if size <= 100_000 else 2
+        for name in CHART_BUILDERS:
+            build = getattr(ui_helpers, name)
+            results[f"charts.{name}.{size}"] = summarize(timeit(lambda: build(data), runs))
+            # Streamlit serializes each figure to JSON before sending it to the browser
+            fig = build(data)
+            results[f"charts.{name}.{size}.to_json"] = summarize(timeit(fig.to_json, runs, warmup=0))
+    return results
+
+
+def bench_pages(base_url: str, quick: bool) -> Dict[str, Dict[str, Any]]:
+    from streamlit.testing.v1 import AppTest
+
+    main_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+    runs = 3 if quick else 10
+    results = {}
+    defaults = dict(stub_server.ROUTES)
+    for name, label, sizes in PAGE_CASES:
+        stub_server.ROUTES.update(sized_routes(**sizes))
+        at = AppTest.from_file(main_path, default_timeout=120)
+        at.session_state["api_base_url"] = base_url
+        at.run()
+        at.sidebar.radio(key="nav").set_value(label).run()
+        if at.exception:
+            raise RuntimeError(f"{name} failed to render: {at.exception[0].value}")
+        script, render = [], []
+        for _ in range(runs):
+            start = time.perf_counter()
+            at.run()
+            script.append(time.perf_counter() - start)
+            render.append(at.session_state["render_profiles"][-1].total)
+        results[f"pages.{name}"] = summarize(script, render_median_ms=round(statistics.median(render) * 1000, 3),
+                                             elements=sum(at.session_state["render_profiles"][-1].elements.values()))
+        stub_server.ROUTES.clear()
+        stub_server.ROUTES.update(defaults)
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            thresholds: Dict[str, float]) -> List[str]:
+    """Describe every benchmark whose median regressed past its suite's threshold"""
+    regressions = []
+    for name, result in sorted(results.items()):
+        before = baseline.get(name)
+        if not before or not before.get("median_ms"):
+            continue
+        change = result["median_ms"] / before["median_ms"] - 1
+        result["baseline_median_ms"] = before["median_ms"]
+        result["change"] = round(change, 4)
+        if change > thresholds[name.split(".")[0]]:
+            regressions.append(f"{name}: {before['median_ms']:.3f} -> {result['median_ms']:.3f} ms "
+                               f"(+{change * 100:.0f}%)")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the dashboard benchmark suite")
+    parser.add_argument("--output", "-o", default="benchmark-results.json")
+    parser.add_argument("--baseline", help="Earlier results to compare against")
+    parser.add_argument("--suite", action="append", choices=SUITES, help="Run only these suites")
+    parser.add_argument("--quick", action="store_true", help="Fewer runs and no 1M-point charts")
+    parser.add_argument("--threshold", type=float, help="Override every suite's regression threshold")
+    args = parser.parse_args(argv)
+
+    suites = args.suite or SUITES
+    server = stub_server.start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    results = {}
+    try:
+        for suite in suites:
+            start = time.perf_counter()
+            if suite == "client":
+                results.update(bench_client(base_url, args.quick))
+            elif suite == "charts":
+                results.update(bench_charts(args.quick))
+            else:
+                results.update(bench_pages(base_url, args.quick))
+            print(f"{suite}: done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    finally:
+        server.shutdown()
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        thresholds = {suite: args.threshold for suite in SUITES} if args.threshold is not None else THRESHOLDS
+        regressions = compare(results, baseline, thresholds)
+
+    report = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "quick": args.quick, "suites": suites},
+        "results": results,
+        "regressions": regressions,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for name, result in results.items():
+        change = f" ({result['change'] * 100:+.0f}%)" if "change" in result else ""
+        print(f"{name:<60} {result['median_ms']:>10.3f} ms{change}")
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
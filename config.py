@@ -6,12 +6,109 @@ load_dotenv()
 # API Configuration
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
 API_WS_URL = os.getenv("API_WS_URL", "ws://localhost:8000")
+# Comma-separated list of backends to federate; defaults to the single API_BASE_URL
+API_BASE_URLS = [url.strip() for url in os.getenv("API_BASE_URLS", API_BASE_URL).split(",") if url.strip()]
+FEDERATION_DEADLINE = float(os.getenv("FEDERATION_DEADLINE", "2.0"))  # Seconds to wait for slow backends
+FEDERATION_WORKERS = 4  # Concurrent calls per backend; each backend has its own pool
+FEDERATION_CURSORS = 256  # Per-backend paging positions kept for follow-on pages of merged lists
+FEDERATION_AGENT_SOURCES = 10_000  # Agent ids remembered with the backend that owns them
 
 # App Configuration
 APP_NAME = "Multi-Agent Monitor"
 APP_DESCRIPTION = "Real-time monitoring and analytics for multi-agent AI systems"
 REFRESH_INTERVAL = 3
 
+# Mock mode: fallback data when a backend is unreachable (generated by lib/datagen.py)
+MOCK_DATASET = {"logs": 20_000, "agents": 8, "traces": 500, "seed": int(os.getenv("MOCK_SEED", "0"))}
+
+# Client Rate Limiting (per process, shared by all sessions)
+RATE_LIMIT_RPS = float(os.getenv("RATE_LIMIT_RPS", "20"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "40"))
+RATE_LIMIT_ENDPOINTS = {  # endpoint: (requests per second, burst)
+    "/api/v1/logs": (5, 10),
+    "/api/v1/traces": (5, 10),
+    "/api/v1/agents": (5, 10),
+    "/api/v1/overview/activity": (2, 4),
+    "/api/v1/metrics/tokens": (2, 4),
+    "/api/v1/metrics/costs": (2, 4),
+    "/api/v1/metrics/latency": (2, 4),
+}
+RATE_LIMIT_BACKGROUND_RESERVE = 0.25  # Share of each bucket kept for interactive calls
+RATE_LIMIT_INTERACTIVE_WAIT = 0.5  # Seconds an interactive call may wait for a token
+STRICT_RATE_LIMIT_WAIT = 30  # Seconds bulk calls (exports) wait for a token before failing
+# HTTP connection pools (one pool and cache per backend URL, see lib/client_registry.py)
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))  # Max pooled connections per backend
+HTTP_KEEPALIVE_IDLE = 30  # Seconds before TCP keep-alive probes start on idle pooled sockets
+HTTP_PREWARM_CONNECTIONS = 2  # Connections opened when a backend is selected
+CLIENT_IDLE_TTL = 600  # Seconds before an unused backend client and its pool are evicted
+RESPONSE_CACHE_SIZE = 256  # Parsed responses kept for revalidation and degraded mode
+HTTP_RETRIES = 2  # Transport retries for connection errors and 502/503/504 on GET
+BREAKER_FAILURE_THRESHOLD = 5  # Consecutive failures before a backend's circuit opens
+BREAKER_RESET_TIMEOUT = 30  # Seconds an open circuit waits before letting a probe through
+CAPABILITIES_TTL = 300  # Seconds before re-probing a backend's optional features (e.g. batched GETs)
+# Record every API exchange to a cassette file, or replay one with no backend (see lib/cassette.py)
+API_CASSETTE = os.getenv("API_CASSETTE", "")
+API_CASSETTE_MODE = os.getenv("API_CASSETTE_MODE", "replay" if API_CASSETTE else "")  # "record" or "replay"
+API_CASSETTE_LATENCY_SCALE = float(os.getenv("API_CASSETTE_LATENCY_SCALE", "1.0"))  # 0 replays instantly
+
+# Speculative prefetch of agent details for the agents on screen (see lib/prefetch.py)
+PREFETCH_WORKERS = 2  # Background threads shared by all sessions
+PREFETCH_TTL = 30  # Seconds a prefetched detail is served without a round trip
+PREFETCH_MAX_ENTRIES = 500
+PREFETCH_MAX_PENDING = 32  # Queued loads beyond this are dropped, not deferred
+PREFETCH_VISIBLE_AGENTS = 24  # Agents per render whose details are prefetched
+PREFETCH_WAIT = 1.0  # Seconds opening an agent waits for its in-flight prefetch
+
+# Session state memory (see lib/session_memory.py); API data lives in the shared response caches instead
+SESSION_MEMORY_CAP_MB = int(os.getenv("SESSION_MEMORY_CAP_MB", "20"))
+GLOBAL_SESSION_MEMORY_CAP_MB = int(os.getenv("GLOBAL_SESSION_MEMORY_CAP_MB", "500"))
+SESSION_EVICTABLE_KEYS = ("render_profiles", "export_file_", "trace_timeline")  # Names, or prefixes ending in "_"
+SESSION_MEMORY_IDLE_TTL = 1800  # Seconds before an unseen session stops being tracked
+# Rows one UI export may hold in session memory; larger exports go through `python -m lib.export`
+EXPORT_UI_MAX_ROWS = 50_000
+
+# Streaming anomaly detection over per-agent latency, cost and error rate (see lib/anomaly.py)
+ANOMALY_ALPHA = 0.1  # EWMA weight of the newest interval in the overall baseline
+ANOMALY_SEASONAL_ALPHA = 0.1  # Weight within an hour-of-day baseline
+ANOMALY_SEASONAL_MIN = 5  # Points an hour needs before it replaces the overall baseline
+ANOMALY_WARMUP = 10  # Points before a series may flag anything
+ANOMALY_Z_THRESHOLD = 3.0
+ANOMALY_DAMPING = 0.05  # Relative weight of anomalous points in the baselines
+ANOMALY_MIN_REQUESTS = 20  # Requests an interval must cover to count as a point
+ANOMALY_TTL = 600  # Seconds a flag stays up after its last anomalous point
+
+# Traces page concurrency timeline: how many of the most recent traces to index
+TRACE_TIMELINE_SIZES = [1_000, 10_000, 100_000]
+
+# Metrics page cost/token attribution cube, fed from every logs page the client downloads
+CUBE_TOP_K = {"agent": 50, "model": 20, "trace": 200}  # Values kept per dimension; the rest become "Other"
+CUBE_PAGE_SIZE = 500  # Logs per request when the Attribution tab catches up
+CUBE_BACKFILL = 5_000  # Most recent logs pulled on first open
+CUBE_SYNC_INTERVAL = 60  # Seconds between catch-up pulls; listeners keep the cube current meanwhile
+CUBE_SEEN_IDS = 200_000  # Log ids remembered so re-fetched pages are not double counted
+CUBE_RETENTION_HOURS = 24 * 30
+
+# Overview hotspots: rolling top-K slowest/costliest logs and traces, and agents by errors
+HOTSPOT_K = 20
+HOTSPOT_SEEN_IDS = 100_000
+
+# Logs page template mining (Drain): parse tree depth, match threshold and fan-out per node
+LOG_TEMPLATE_DEPTH = 4
+LOG_TEMPLATE_SIMILARITY = 0.5  # Share of positions that must agree to join a template
+LOG_TEMPLATE_MAX_CHILDREN = 100
+LOG_TEMPLATE_SAMPLES = 5  # Log ids kept per template
+LOG_TEMPLATE_SEEN_IDS = 100_000
+
+# traceId/agentId -> logs join index over the most recent logs the client has fetched
+LOG_INDEX_WINDOW = 50_000
+LOG_INDEX_TRACE_LIMIT = 200  # Most logs fetched for one trace missing from the window
+LOG_SIBLINGS_SHOWN = 5  # Same-trace logs listed under each entry on the Logs page
+
+# Client instrumentation (Prometheus text served at http://<host>:<port>/metrics; 0 disables)
+METRICS_EXPORTER_PORT = int(os.getenv("METRICS_EXPORTER_PORT", "0"))
+# Loopback only by default; set to 0.0.0.0 (or an interface address) for a remote scraper
+METRICS_EXPORTER_HOST = os.getenv("METRICS_EXPORTER_HOST", "127.0.0.1")
+
 # Color Theme (Light Mode)
 PRIMARY_COLOR = "#0ea5e9"  # Sky Blue
 SECONDARY_COLOR = "#06b6d4"  # Cyan
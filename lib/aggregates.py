@@ -0,0 +1,48 @@
+import threading
+import weakref
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+_aggregates: Dict[Tuple[Callable[[], Any], str], Any] = {}
+_callbacks: Dict[Tuple[Hashable, str], Callable[[str, Any], None]] = {}  # (key, base URL) -> listener
+_subscribed: Dict[Tuple[Hashable, str], "weakref.WeakSet"] = {}
+_lock = threading.Lock()
+
+
+def shared(client, factory: Callable[[], Any]) -> Any:
+    """The process-wide `factory()` aggregate for a backend, subscribed to `client`'s responses
+
+    Aggregates are keyed by base URL, so they outlive clients the registry closes when idle
+    and rebuilds later; every client seen for a backend is subscribed to its aggregates once.
+    """
+    with _lock:
+        aggregate = _aggregates.get((factory, client.base_url))
+        if aggregate is None:
+            aggregate = _aggregates[(factory, client.base_url)] = factory()
+            _callbacks[(factory, client.base_url)] = aggregate.on_response
+        _subscribe(client, (factory, client.base_url))
+        return aggregate
+
+
+def listen(client, key: Hashable, callback: Callable[[str, Any], None]):
+    """Subscribe `callback` to `client`'s responses, and to every later client for the same backend
+
+    The first callback registered under `key` for a backend is the one kept.
+    """
+    with _lock:
+        _callbacks.setdefault((key, client.base_url), callback)
+        _subscribe(client, (key, client.base_url))
+
+
+def attach(client):
+    """Subscribe a newly created client (and each backend of a federated one) to what its backend had"""
+    with _lock:
+        for each in [client] + list(getattr(client, "clients", [])):
+            for key in [key for key in _callbacks if key[1] == each.base_url]:
+                _subscribe(each, key)
+
+
+def _subscribe(client, key: Tuple[Hashable, str]):
+    clients = _subscribed.setdefault(key, weakref.WeakSet())
+    if client not in clients:
+        client.add_listener(_callbacks[key])
+        clients.add(client)
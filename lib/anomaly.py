@@ -0,0 +1,217 @@
+import math
+import threading
+import time
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+from lib import aggregates
+import config
+
+# Spread floors so a near-constant series does not flag every tiny wobble
+RELATIVE_FLOOR = 0.05
+ABSOLUTE_FLOOR = {"latency": 5.0, "costPerRequest": 0.0001, "errorRate": 0.5}
+
+
+class Score:
+    __slots__ = ("value", "expected", "std", "z", "anomalous", "at")
+
+    def __init__(self, value: float, expected: Optional[float], std: float, z: float, anomalous: bool, at: float):
+        self.value = value
+        self.expected = expected
+        self.std = std
+        self.z = z
+        self.anomalous = anomalous
+        self.at = at
+
+    @property
+    def delta(self) -> Optional[float]:
+        return None if self.expected is None else self.value - self.expected
+
+
+class SeasonalEWMA:
+    """Exponentially weighted mean and variance, overall and per hour of day, in O(1) per point
+
+    A point is scored against its hour's baseline once that hour has `seasonal_min`
+    points, otherwise against the overall one; no history is kept.
+    """
+    __slots__ = ("alpha", "seasonal_alpha", "seasonal_min", "n", "mean", "var", "hours")
+
+    def __init__(self, alpha: float = config.ANOMALY_ALPHA, seasonal_alpha: float = config.ANOMALY_SEASONAL_ALPHA,
+                 seasonal_min: int = config.ANOMALY_SEASONAL_MIN):
+        self.alpha = alpha
+        self.seasonal_alpha = seasonal_alpha
+        self.seasonal_min = seasonal_min
+        self.n = 0
+        self.mean = 0.0
+        self.var = 0.0
+        self.hours = [[0, 0.0, 0.0] for _ in range(24)]  # [n, mean, var] per UTC hour
+
+    def baseline(self, ts: float) -> Tuple[Optional[float], float]:
+        """Expected value and spread at `ts`, or (None, 0.0) before the first point"""
+        n, mean, var = self.hours[int(ts // 3600) % 24]
+        if n >= self.seasonal_min:
+            return mean, math.sqrt(var)
+        if self.n:
+            return self.mean, math.sqrt(self.var)
+        return None, 0.0
+
+    def update(self, value: float, ts: float, weight: float = 1.0):
+        """Fold in a point; `weight` < 1 slows how fast it moves the baselines"""
+        self.n += 1
+        self.mean, self.var = _ewm(self.mean, self.var, value, weight * self.alpha if self.n > 1 else 1.0)
+        hour = self.hours[int(ts // 3600) % 24]
+        hour[0] += 1
+        hour[1], hour[2] = _ewm(hour[1], hour[2], value, weight * self.seasonal_alpha if hour[0] > 1 else 1.0)
+
+
+def _ewm(mean: float, var: float, value: float, alpha: float) -> Tuple[float, float]:
+    diff = value - mean
+    increment = alpha * diff
+    return mean + increment, (1 - alpha) * (var + diff * increment)
+
+
+class _Anchor:
+    """Cumulative counters at the last accepted poll of one agent (or of the whole system)"""
+    __slots__ = ("requests", "latency_sum", "cost", "errors")
+
+    def __init__(self, requests: int, latency_sum: float, cost: float, errors: float):
+        self.requests = requests
+        self.latency_sum = latency_sum
+        self.cost = cost
+        self.errors = errors
+
+
+class AnomalyDetector:
+    """Flags agents whose latency, cost per request or error rate jumps above their usual level
+
+    Fed with the cumulative counters the API already returns (agent rows, overview
+    stats): each poll that adds at least `min_requests` requests becomes one interval
+    point per metric. Identical snapshots from other sessions' polls add nothing, so
+    any number of viewers can feed the same detector. Only fresh responses may feed it
+    (see `subscribe`): a mock or stale fallback would read as a counter reset followed
+    by one huge bogus interval.
+    """
+
+    def __init__(self, threshold: float = config.ANOMALY_Z_THRESHOLD, warmup: int = config.ANOMALY_WARMUP,
+                 min_requests: int = config.ANOMALY_MIN_REQUESTS, ttl: float = config.ANOMALY_TTL):
+        self.threshold = threshold
+        self.warmup = warmup
+        self.min_requests = min_requests
+        self.ttl = ttl
+        self._anchors: Dict[tuple, _Anchor] = {}
+        self._series: Dict[tuple, SeasonalEWMA] = {}
+        self._last: Dict[tuple, Score] = {}
+        self._flags: Dict[tuple, Score] = {}  # Last anomalous point per series
+        self._lock = threading.Lock()
+
+    def observe_stats(self, backend: str, stats: Dict[str, Any], now: Optional[float] = None):
+        """Feed the system-wide counters from get_overview_stats"""
+        requests = int(stats.get("totalRequests", 0) or 0)
+        self._observe((backend, "all"), requests, float(stats.get("avgLatency", 0) or 0),
+                      float(stats.get("totalCost", 0) or 0), float(stats.get("successRate", 100) or 0), now)
+
+    def observe_agents(self, backend: str, agents: List[Any], now: Optional[float] = None):
+        """Feed the per-agent counters from get_agents"""
+        for agent in agents:
+            self._observe((backend, agent.id), agent.total_requests, agent.avg_latency, agent.total_cost,
+                          agent.success_rate, now)
+
+    def on_response(self, backend: str, endpoint: str, data: Any):
+        """APIClient listener body: observe a freshly downloaded stats or agents response"""
+        if not isinstance(data, dict):
+            return
+        if endpoint == "/api/v1/overview/stats":
+            self.observe_stats(backend, data)
+        elif endpoint == "/api/v1/agents":
+            self.observe_agents(backend, data.get("agents") or [])
+
+    def subscribe(self, client):
+        """Feed this detector from each backend behind `client`, keyed by that backend's URL"""
+        for backend in backends(client):
+            aggregates.listen(backend, "anomaly", partial(self.on_response, backend.base_url))
+
+    def _observe(self, scope: tuple, requests: int, avg_latency: float, cost: float, success_rate: float,
+                 now: Optional[float]):
+        now = time.time() if now is None else now
+        current = _Anchor(requests, avg_latency * requests, cost, requests * (100 - success_rate) / 100)
+        with self._lock:
+            anchor = self._anchors.get(scope)
+            if anchor is None or requests < anchor.requests:
+                # First sight, or the backend's counters were reset
+                self._anchors[scope] = current
+                return
+            added = requests - anchor.requests
+            if added < self.min_requests:
+                return
+            self._anchors[scope] = current
+            interval = {
+                "latency": (current.latency_sum - anchor.latency_sum) / added,
+                "costPerRequest": (current.cost - anchor.cost) / added,
+                "errorRate": 100 * (current.errors - anchor.errors) / added,
+            }
+            for metric, value in interval.items():
+                self._score((scope, metric), metric, max(0.0, value), now)
+
+    def _score(self, key: tuple, metric: str, value: float, now: float):
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = SeasonalEWMA()
+        expected, std = series.baseline(now)
+        z, anomalous = 0.0, False
+        if expected is not None:
+            std = max(std, RELATIVE_FLOOR * abs(expected), ABSOLUTE_FLOOR[metric])
+            z = (value - expected) / std
+            anomalous = series.n >= self.warmup and z >= self.threshold
+        self._last[key] = Score(value, expected, std, z, anomalous, now)
+        if anomalous:
+            self._flags[key] = self._last[key]
+        # Anomalous points barely move the baseline, so a sustained regression stays flagged
+        # until it has lasted long enough to become the new normal
+        series.update(value, now, config.ANOMALY_DAMPING if anomalous else 1.0)
+
+    def latest(self, backend: str, scope: str, metric: str) -> Optional[Score]:
+        """The most recent interval point for `scope` ("all" or an agent id), with its baseline"""
+        with self._lock:
+            return self._last.get(((backend, scope), metric))
+
+    def anomalies(self, backend: str, agent_id: Optional[str] = None,
+                  now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Series with an anomalous point in the last `ttl` seconds, worst first"""
+        now = time.time() if now is None else now
+        with self._lock:
+            found = [{"scope": scope, "metric": metric, "value": score.value, "expected": score.expected,
+                      "z": score.z, "at": score.at}
+                     for ((source, scope), metric), score in self._flags.items()
+                     if source == backend and now - score.at <= self.ttl
+                     and (agent_id is None or scope == agent_id)]
+        return sorted(found, key=lambda a: -a["z"])
+
+
+def describe(anomaly: Dict[str, Any]) -> str:
+    """Short human description, e.g. 'latency 840ms vs usual 310ms'"""
+    metric, value, expected = anomaly["metric"], anomaly["value"], anomaly["expected"]
+    if metric == "latency":
+        return f"latency {value:.0f}ms vs usual {expected:.0f}ms"
+    if metric == "costPerRequest":
+        return f"cost ${value:.4f}/req vs usual ${expected:.4f}"
+    return f"error rate {value:.1f}% vs usual {expected:.1f}%"
+
+
+def baseline_delta(score: Optional[Score], template: str, sign: int = 1) -> str:
+    """Stat card subtext comparing the latest interval with its baseline, e.g. '+12ms vs usual'"""
+    if score is None or score.delta is None:
+        return "Baseline warming up"
+    return template.format(sign * score.delta) + " vs usual"
+
+
+def backends(client) -> List[Any]:
+    """The single-backend clients behind `client` (itself, or each client of a federated one)"""
+    return list(getattr(client, "clients", [client]))
+
+
+def anomalies_for(client) -> List[Dict[str, Any]]:
+    """`detector.anomalies` across every backend behind `client`, worst first"""
+    found = [anomaly for backend in backends(client) for anomaly in detector.anomalies(backend.base_url)]
+    return sorted(found, key=lambda a: -a["z"])
+
+
+detector = AnomalyDetector()
@@ -1,330 +1,617 @@
+import inspect
 import requests
+import socket
+import threading
+import time
+import types
 import pandas as pd
-from typing import Dict, List, Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+from typing import Dict, List, Any, Optional, Callable
 import config
+from lib.rate_limit import RateLimiter, CircuitBreaker, INTERACTIVE, BACKGROUND
+from lib.instrumentation import instrumentation
+from lib.http_cache import ResponseCache, CacheEntry
+from lib import wire_format, datagen
+from lib.cassette import CassetteAdapter, open_cassette, REPLAY
+from lib.models import Log, Trace, Agent, MetricPoint, parse_page
+from lib.json_stream import RecordStream
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled sockets use TCP keep-alive so idle connections survive between polls"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        options = list(HTTPConnection.default_socket_options) + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            options += [(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, config.HTTP_KEEPALIVE_IDLE),
+                        (socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, config.HTTP_KEEPALIVE_IDLE)]
+        kwargs["socket_options"] = options
+        super().init_poolmanager(*args, **kwargs)
+
+class _NotBatchable(Exception):
+    pass
+
+class _BatchedGet:
+    """The arguments of one APIClient._get call, captured for a batch"""
+    __slots__ = ("endpoint", "path", "params", "fallback", "priority", "parse")
+
+    def __init__(self, endpoint: str, path: str, params: Optional[Dict[str, Any]],
+                 fallback: Callable[[], Any], priority: int, parse: Optional[Callable[[Any], Any]]):
+        self.endpoint = endpoint
+        self.path = path
+        self.params = params
+        self.fallback = fallback
+        self.priority = priority
+        self.parse = parse
+
+class _BatchRecorder:
+    """Stands in for an APIClient while a batched call runs, capturing its GET instead of sending it"""
+
+    def __init__(self, client: "APIClient"):
+        self._client = client
+        self._captured: List[_BatchedGet] = []
+
+    def __getattr__(self, name: str) -> Any:
+        # Methods run against the recorder so their self._get lands here; everything else is the client's
+        attr = inspect.getattr_static(type(self._client), name, None)
+        if inspect.isfunction(attr):
+            return types.MethodType(attr, self)
+        return getattr(self._client, name)
+
+    def _get(self, endpoint: str, path: str, params: Optional[Dict[str, Any]] = None,
+             fallback: Callable[[], Any] = dict, priority: int = BACKGROUND,
+             accept: Optional[str] = None, decode: Callable[[bytes, str], Any] = wire_format.decode,
+             parse: Optional[Callable[[Any], Any]] = None) -> Any:
+        if accept is not None or decode is not wire_format.decode:
+            raise _NotBatchable()
+        self._captured.append(_BatchedGet(endpoint, path, params, fallback, priority, parse))
+        return self._captured[-1]
+
+    def _stream(self, *args, **kwargs):
+        raise _NotBatchable()
+
+    def record(self, call: Callable[[Any], Any]) -> Optional[_BatchedGet]:
+        """The single plain GET `call` makes, or None if it has to run on its own"""
+        self._captured = []
+        try:
+            result = call(self)
+        except _NotBatchable:
+            return None
+        if len(self._captured) != 1 or result is not self._captured[0]:
+            return None
+        return result
 
 class APIClient:
-    def __init__(self, base_url: str = config.API_BASE_URL):
+    def __init__(self, base_url: str = config.API_BASE_URL, limiter: Optional[RateLimiter] = None,
+                 use_mock: bool = True, pool_size: int = config.HTTP_POOL_SIZE, timeout: Optional[float] = None):
         self.base_url = base_url
+        # Without mock fallback, failed calls return None (used when federating several backends)
+        self.use_mock = use_mock
+        # Per-request connect/read timeout in seconds; None waits as long as the backend takes
+        self.timeout = timeout
         self.session = requests.Session()
+        retries = Retry(total=config.HTTP_RETRIES, backoff_factor=0.1, status_forcelist=(502, 503, 504),
+                        allowed_methods=frozenset({"GET"}), raise_on_status=False)
+        adapter = KeepAliveAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retries)
+        # A configured cassette records what the live adapter sends and receives, or replaces it entirely
+        self.cassette = open_cassette() if config.API_CASSETTE else None
+        if self.cassette is not None:
+            adapter = CassetteAdapter(self.cassette, adapter)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Accept": wire_format.ACCEPT,
+                                     "Accept-Encoding": wire_format.ACCEPT_ENCODING})
+        self.limiter = limiter or RateLimiter()
+        self.cache = ResponseCache(config.RESPONSE_CACHE_SIZE)
+        self.breaker = CircuitBreaker()
+        self._listeners: List[Callable[[str, Any], None]] = []
+        self._capabilities: Optional[Dict[str, Any]] = None
+        self._capabilities_checked = 0.0
 
-    def get_overview_stats(self) -> Dict[str, Any]:
-        """Get overall system statistics"""
+    def add_listener(self, callback: Callable[[str, Any], None]):
+        """Call `callback(endpoint, data)` with every freshly downloaded, parsed response
+
+        Revalidated (304), degraded and fallback responses are not reported, so a
+        listener sees each new body once and can aggregate incrementally.
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, endpoint: str, data: Any):
+        for callback in self._listeners:
+            try:
+                callback(endpoint, data)
+            except Exception:
+                pass
+
+    def warm(self, connections: int = config.HTTP_PREWARM_CONNECTIONS):
+        """Open pooled connections in the background so the first real calls skip TCP/TLS setup"""
+        if self.cassette is not None and self.cassette.mode == REPLAY:
+            return
+        for _ in range(connections):
+            threading.Thread(target=self.get_health, daemon=True).start()
+
+    def close(self):
+        self.session.close()
+
+    @staticmethod
+    def _cache_key(path: str, params: Optional[Dict[str, Any]]) -> tuple:
+        return (path, tuple(sorted((params or {}).items())))
+
+    def _get(self, endpoint: str, path: str, params: Optional[Dict[str, Any]] = None,
+             fallback: Callable[[], Any] = dict, priority: int = BACKGROUND,
+             accept: Optional[str] = None, decode: Callable[[bytes, str], Any] = wire_format.decode,
+             parse: Optional[Callable[[Any], Any]] = None) -> Any:
+        """GET a resource through the rate limiter, revalidating cached copies
+
+        `parse` converts the decoded body (and the fallback) into its final shape; the
+        converted object is what gets cached, so a 304 skips both decoding and parsing.
+        """
+        fallback = self._fallback(endpoint, fallback, parse)
+        key = self._cache_key(path, params) + (accept,)
+        entry = self.cache.get(key)
+        refused = self._admit(endpoint, priority)
+        if refused:
+            instrumentation.count(self.base_url, endpoint, refused)
+            if entry is not None:
+                instrumentation.count(self.base_url, endpoint, "degraded")
+                return entry.data
+            return fallback()
+        headers = entry.validators() if entry is not None else {}
+        if accept:
+            headers["Accept"] = accept
+        start = time.perf_counter()
         try:
-            response = self.session.get(f"{self.base_url}/api/v1/overview/stats")
-            response.raise_for_status()
-            return response.json()
+            response = self.session.get(f"{self.base_url}{path}", params=params, headers=headers,
+                                        timeout=self.timeout)
         except Exception as e:
-            return self._mock_overview_stats()
-
-    def get_overview_activity(self, period: str = "24h") -> Dict[str, Any]:
-        """Get activity data for charts"""
+            self._record_failure(endpoint, time.perf_counter() - start)
+            return fallback()
+        elapsed = time.perf_counter() - start
+        retries = self._retries(response)
+        if response.status_code >= 500:
+            self._record_failure(endpoint, elapsed, retries)
+            return fallback()
+        self.breaker.record_success()
+        instrumentation.set_breaker(self.base_url, self.breaker.state)
+        if response.status_code == 304 and entry is not None:
+            self.cache.record_not_modified(entry)
+            instrumentation.record_request(self.base_url, endpoint, elapsed, retries=retries)
+            instrumentation.count(self.base_url, endpoint, "cache_hits")
+            return entry.data
+        nbytes = self._wire_bytes(response)
         try:
-            response = self.session.get(
-                f"{self.base_url}/api/v1/overview/activity",
-                params={"period": period}
-            )
             response.raise_for_status()
-            return response.json()
+            decode_start = time.perf_counter()
+            data = decode(response.content, response.headers.get("Content-Type", ""))
+            if parse is not None:
+                data = parse(data)
+            parse_seconds = time.perf_counter() - decode_start
         except Exception as e:
-            return self._mock_activity_data()
+            instrumentation.record_request(self.base_url, endpoint, elapsed, nbytes, error=True, retries=retries)
+            return fallback()
+        instrumentation.record_request(self.base_url, endpoint, elapsed, nbytes, parse_seconds, retries=retries)
+        instrumentation.count(self.base_url, endpoint, "cache_misses")
+        self.cache.put(key, CacheEntry(data, response.headers.get("ETag"),
+                                       response.headers.get("Last-Modified"),
+                                       nbytes, parse_seconds))
+        self._notify(endpoint, data)
+        return data
 
-    def get_agents(self, status: str = "all", search: str = "") -> Dict[str, Any]:
-        """Get list of all agents"""
+    def _fallback(self, endpoint: str, fallback: Callable[[], Any],
+                  parse: Optional[Callable[[Any], Any]]) -> Callable[[], Any]:
+        if not self.use_mock or fallback is None:
+            fallback = lambda: None
+        else:
+            fallback = self._counted(endpoint, fallback)
+        if parse is not None:
+            fallback = lambda fallback=fallback: parse(fallback())
+        return fallback
+
+    def capabilities(self) -> Dict[str, Any]:
+        """Optional features the backend advertises at /api/v1/capabilities ({} if none), re-probed periodically"""
+        now = time.monotonic()
+        if self._capabilities is None or now - self._capabilities_checked > config.CAPABILITIES_TTL:
+            self._capabilities_checked = now
+            self._capabilities = self._get("/api/v1/capabilities", "/api/v1/capabilities", fallback=dict,
+                                           parse=lambda data: data if isinstance(data, dict) else {})
+        return self._capabilities
+
+    def batch(self, *calls: Callable[["APIClient"], Any]) -> List[Any]:
+        """Run several client calls as one request when the backend supports batching
+
+        Each call is a function of a client, e.g. `lambda c: c.get_logs(limit=5)`; results
+        come back in order, shaped exactly as the methods return them. Calls a batch cannot
+        carry (streams, Arrow frames), and every call on a backend without a batch
+        endpoint, run individually.
+        """
+        batch_path = self.capabilities().get("batch") if len(calls) > 1 else None
+        if not batch_path:
+            return [call(self) for call in calls]
+        recorder = _BatchRecorder(self)
+        planned = [recorder.record(call) for call in calls]
+        gets = [get for get in planned if get is not None]
+        size = max(1, int(self.capabilities().get("maxBatchSize") or len(gets)))
+        results: Dict[int, Any] = {}
+        for start in range(0, len(gets), size):
+            chunk = gets[start:start + size]
+            answers = self._send_batch(batch_path, chunk)
+            if answers is None:
+                # The backend stopped accepting batches: run everything individually until the next probe
+                self._capabilities = {}
+                return [call(self) for call in calls]
+            results.update(zip(map(id, chunk), answers))
+        return [call(self) if get is None else results[id(get)] for call, get in zip(calls, planned)]
+
+    def _send_batch(self, batch_path: str, gets: List["_BatchedGet"]) -> Optional[List[Any]]:
+        """POST several recorded GETs as one request and demultiplex the answers
+
+        Each sub-response goes through the same cache, parse hook and fallback as its
+        GET would have. Returns None when the backend rejects the batch endpoint itself.
+        """
+        fallbacks = [self._fallback(get.endpoint, get.fallback, get.parse) for get in gets]
+        keys = [self._cache_key(get.path, get.params) + (None,) for get in gets]
+        entries = [self.cache.get(key) for key in keys]
+
+        def degraded(counter: Optional[str] = None) -> List[Any]:
+            results = []
+            for get, entry, fallback in zip(gets, entries, fallbacks):
+                if counter:
+                    instrumentation.count(self.base_url, get.endpoint, counter)
+                if entry is not None:
+                    instrumentation.count(self.base_url, get.endpoint, "degraded")
+                    results.append(entry.data)
+                else:
+                    results.append(fallback())
+            return results
+
+        # One request against the global budget, at the most urgent of the bundled priorities
+        refused = self._admit(batch_path, min(get.priority for get in gets))
+        if refused:
+            return degraded(refused)
+        body = {"requests": [{"id": str(i), "path": get.path, "params": get.params or {},
+                              "headers": entry.validators() if entry is not None else {}}
+                             for i, (get, entry) in enumerate(zip(gets, entries))]}
+        start = time.perf_counter()
         try:
-            response = self.session.get(
-                f"{self.base_url}/api/v1/agents",
-                params={"status": status, "search": search}
-            )
-            response.raise_for_status()
-            return response.json()
+            response = self.session.post(f"{self.base_url}{batch_path}", json=body, timeout=self.timeout)
         except Exception as e:
-            return self._mock_agents()
-
-    def get_agent_detail(self, agent_id: str) -> Dict[str, Any]:
-        """Get detailed agent information"""
+            self._record_failure(batch_path, time.perf_counter() - start)
+            return degraded()
+        elapsed = time.perf_counter() - start
+        if response.status_code >= 500 and response.status_code != 501:
+            self._record_failure(batch_path, elapsed)
+            return degraded()
+        self.breaker.record_success()
+        instrumentation.set_breaker(self.base_url, self.breaker.state)
+        nbytes = self._wire_bytes(response)
+        if response.status_code in (404, 405, 501):
+            instrumentation.record_request(self.base_url, batch_path, elapsed, nbytes, error=True)
+            return None
         try:
-            response = self.session.get(f"{self.base_url}/api/v1/agents/{agent_id}")
             response.raise_for_status()
-            return response.json()
+            decode_start = time.perf_counter()
+            answers = {str(answer.get("id")): answer for answer in
+                       wire_format.decode(response.content, response.headers.get("Content-Type", ""))["responses"]}
         except Exception as e:
-            return self._mock_agent_detail(agent_id)
+            instrumentation.record_request(self.base_url, batch_path, elapsed, nbytes, error=True)
+            return degraded()
+
+        results = []
+        for i, (get, key, entry, fallback) in enumerate(zip(gets, keys, entries, fallbacks)):
+            answer = answers.get(str(i)) or {}
+            status = answer.get("status")
+            headers = answer.get("headers") or {}
+            if status == 304 and entry is not None:
+                self.cache.record_not_modified(entry)
+                instrumentation.count(self.base_url, get.endpoint, "cache_hits")
+                results.append(entry.data)
+                continue
+            if status != 200:
+                instrumentation.count(self.base_url, get.endpoint, "errors")
+                results.append(fallback())
+                continue
+            try:
+                data = answer.get("body")
+                if get.parse is not None:
+                    data = get.parse(data)
+            except Exception as e:
+                instrumentation.count(self.base_url, get.endpoint, "errors")
+                results.append(fallback())
+                continue
+            instrumentation.count(self.base_url, get.endpoint, "cache_misses")
+            self.cache.put(key, CacheEntry(data, headers.get("ETag"), headers.get("Last-Modified")))
+            self._notify(get.endpoint, data)
+            results.append(data)
+        instrumentation.record_request(self.base_url, batch_path, elapsed, nbytes,
+                                       time.perf_counter() - decode_start)
+        return results
+
+    def _admit(self, endpoint: str, priority: int, timeout: Optional[float] = None) -> Optional[str]:
+        """Pass the rate limiter and circuit breaker; return the refusing counter's name, or None"""
+        if not self.limiter.acquire(endpoint, priority, timeout=timeout):
+            return "rate_limited"
+        if not self.breaker.allow():
+            instrumentation.set_breaker(self.base_url, self.breaker.state)
+            return "breaker_rejected"
+        return None
+
+    def _counted(self, endpoint: str, fallback: Callable[[], Any]) -> Callable[[], Any]:
+        def call():
+            instrumentation.count(self.base_url, endpoint, "fallbacks")
+            return fallback()
+        return call
+
+    def _record_failure(self, endpoint: str, seconds: float, retries: int = 0):
+        self.breaker.record_failure()
+        instrumentation.set_breaker(self.base_url, self.breaker.state)
+        instrumentation.record_request(self.base_url, endpoint, seconds, error=True, retries=retries)
+
+    @staticmethod
+    def _retries(response: requests.Response) -> int:
+        history = getattr(getattr(response.raw, "retries", None), "history", None)
+        return len(history) if history else 0
+
+    @staticmethod
+    def _wire_bytes(response: requests.Response) -> int:
+        """Body size as transferred, before gzip/zstd decoding: Content-Length, else the bytes urllib3 read"""
+        length = response.headers.get("Content-Length", "")
+        if length.isdigit():
+            return int(length)
+        tell = getattr(response.raw, "tell", None)
+        return tell() if callable(tell) and tell() else len(response.content)
+
+    def get_overview_stats(self) -> Dict[str, Any]:
+        """Get overall system statistics"""
+        return self._get("/api/v1/overview/stats", "/api/v1/overview/stats",
+                         fallback=self._mock_overview_stats)
+
+    def get_overview_activity(self, period: str = "24h") -> Dict[str, Any]:
+        """Get activity data for charts"""
+        return self._get("/api/v1/overview/activity", "/api/v1/overview/activity",
+                         params={"period": period}, fallback=lambda: self._mock_activity_data(period),
+                         parse=lambda data: parse_page(data, "data", MetricPoint))
+
+    def get_agents(self, status: str = "all", search: str = "", priority: int = BACKGROUND) -> Dict[str, Any]:
+        """Get list of all agents"""
+        return self._get("/api/v1/agents", "/api/v1/agents",
+                         params={"status": status, "search": search},
+                         fallback=lambda: self._mock_agents(status, search), priority=priority,
+                         parse=lambda data: parse_page(data, "agents", Agent))
+
+    def get_agent_detail(self, agent_id: str, priority: int = INTERACTIVE,
+                         mock_fallback: bool = True) -> Optional[Dict[str, Any]]:
+        """Get detailed agent information (None on failure when `mock_fallback` is off)"""
+        return self._get("/api/v1/agents/:id", f"/api/v1/agents/{agent_id}",
+                         fallback=(lambda: self._mock_agent_detail(agent_id)) if mock_fallback else None,
+                         priority=priority)
 
     def get_logs(self, limit: int = 50, offset: int = 0, level: str = "all",
-                 status: str = "all", agent_id: str = "", search: str = "") -> Dict[str, Any]:
-        """Get paginated logs"""
+                 status: str = "all", agent_id: str = "", search: str = "",
+                 priority: int = BACKGROUND, trace_id: str = "",
+                 mock_fallback: bool = True) -> Optional[Dict[str, Any]]:
+        """Get paginated logs (of one trace when `trace_id` is given; None on failure when `mock_fallback` is off)"""
+        return self._get("/api/v1/logs", "/api/v1/logs",
+                         params={
+                             "limit": limit,
+                             "offset": offset,
+                             "level": level,
+                             "status": status,
+                             "agentId": agent_id,
+                             "search": search,
+                             "traceId": trace_id
+                         },
+                         fallback=(lambda: self._mock_logs(limit, offset, level, status, agent_id, search,
+                                                           trace_id)) if mock_fallback else None,
+                         priority=priority, parse=lambda data: parse_page(data, "logs", Log))
+
+    def _stream(self, endpoint: str, path: str, params: Dict[str, Any], array_key: str, record_cls,
+                fallback: Callable[[], Dict[str, Any]], priority: int = BACKGROUND,
+                chunk_size: int = 65536, strict: bool = False) -> RecordStream:
+        """GET a list resource with stream=True and parse its records incrementally (never cached)
+
+        With `strict`, the call waits for a rate-limit token and raises on errors instead of
+        degrading to mock data, so bulk consumers such as exports never mix in fake records.
+        """
+        if not self.use_mock:
+            fallback = lambda: {array_key: [], "total": 0, "hasMore": False}
+        else:
+            fallback = self._counted(endpoint, fallback)
+        refused = self._admit(endpoint, priority, timeout=config.STRICT_RATE_LIMIT_WAIT if strict else None)
+        if refused:
+            instrumentation.count(self.base_url, endpoint, refused)
+            if strict:
+                raise RuntimeError(f"Request to {endpoint} refused ({refused})")
+            return RecordStream.from_page(fallback(), array_key, record_cls)
+        start = time.perf_counter()
         try:
-            response = self.session.get(
-                f"{self.base_url}/api/v1/logs",
-                params={
-                    "limit": limit,
-                    "offset": offset,
-                    "level": level,
-                    "status": status,
-                    "agentId": agent_id,
-                    "search": search
-                }
-            )
-            response.raise_for_status()
-            return response.json()
+            response = self.session.get(f"{self.base_url}{path}", params=params,
+                                        headers={"Accept": wire_format.JSON_TYPE}, stream=True,
+                                        timeout=self.timeout)
+            if response.status_code >= 500:
+                self._record_failure(endpoint, time.perf_counter() - start, self._retries(response))
+                response.raise_for_status()
         except Exception as e:
-            return self._mock_logs()
+            if not isinstance(e, requests.HTTPError):
+                self._record_failure(endpoint, time.perf_counter() - start)
+            if strict:
+                raise
+            return RecordStream.from_page(fallback(), array_key, record_cls)
+        self.breaker.record_success()
+        instrumentation.set_breaker(self.base_url, self.breaker.state)
+        # Time to headers; body bytes and parse time are spread over the consumer's iteration
+        instrumentation.record_request(self.base_url, endpoint, time.perf_counter() - start,
+                                       int(response.headers.get("Content-Length") or 0),
+                                       error=not response.ok, retries=self._retries(response))
+        if not response.ok:
+            response.close()
+            if strict:
+                response.raise_for_status()
+            return RecordStream.from_page(fallback(), array_key, record_cls)
+        return RecordStream.from_json(response.iter_content(chunk_size), array_key, record_cls,
+                                      close=response.close)
+
+    def stream_logs(self, limit: int = 50, offset: int = 0, level: str = "all",
+                    status: str = "all", agent_id: str = "", search: str = "",
+                    priority: int = BACKGROUND, chunk_size: int = 65536, strict: bool = False) -> RecordStream:
+        """Stream a page of logs, yielding Log records one at a time in constant memory"""
+        return self._stream("/api/v1/logs", "/api/v1/logs",
+                            params={
+                                "limit": limit,
+                                "offset": offset,
+                                "level": level,
+                                "status": status,
+                                "agentId": agent_id,
+                                "search": search
+                            },
+                            array_key="logs", record_cls=Log,
+                            fallback=lambda: self._mock_logs(limit, offset, level, status, agent_id, search),
+                            priority=priority, chunk_size=chunk_size, strict=strict)
 
-    def get_log_detail(self, log_id: str) -> Dict[str, Any]:
+    def get_logs_frame(self, limit: int = 50, offset: int = 0, level: str = "all",
+                       status: str = "all", agent_id: str = "", search: str = "") -> pd.DataFrame:
+        """Get paginated logs as a DataFrame; total/hasMore are in frame.attrs"""
+        return self._get("/api/v1/logs", "/api/v1/logs",
+                         params={
+                             "limit": limit,
+                             "offset": offset,
+                             "level": level,
+                             "status": status,
+                             "agentId": agent_id,
+                             "search": search
+                         },
+                         fallback=lambda: wire_format.records_frame(
+                             self._mock_logs(limit, offset, level, status, agent_id, search), "logs"),
+                         accept=wire_format.ACCEPT_FRAME,
+                         decode=lambda content, content_type: wire_format.decode_frame(content, content_type, "logs"))
+
+    def get_log_detail(self, log_id: str, priority: int = INTERACTIVE) -> Dict[str, Any]:
         """Get detailed log entry"""
-        try:
-            response = self.session.get(f"{self.base_url}/api/v1/logs/{log_id}")
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            return {}
+        return self._get("/api/v1/logs/:id", f"/api/v1/logs/{log_id}",
+                         fallback=lambda: self._mock_log_detail(log_id), priority=priority)
 
-    def get_traces(self, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+    def get_traces(self, limit: int = 20, offset: int = 0, priority: int = BACKGROUND) -> Dict[str, Any]:
         """Get list of traces"""
-        try:
-            response = self.session.get(
-                f"{self.base_url}/api/v1/traces",
-                params={"limit": limit, "offset": offset}
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            return self._mock_traces()
+        return self._get("/api/v1/traces", "/api/v1/traces",
+                         params={"limit": limit, "offset": offset},
+                         fallback=lambda: self._mock_traces(limit, offset), priority=priority,
+                         parse=lambda data: parse_page(data, "traces", Trace))
+
+    def stream_traces(self, limit: int = 20, offset: int = 0, priority: int = BACKGROUND,
+                      chunk_size: int = 65536, strict: bool = False) -> RecordStream:
+        """Stream a page of traces, yielding Trace records one at a time"""
+        return self._stream("/api/v1/traces", "/api/v1/traces",
+                            params={"limit": limit, "offset": offset},
+                            array_key="traces", record_cls=Trace,
+                            fallback=lambda: self._mock_traces(limit, offset),
+                            priority=priority, chunk_size=chunk_size, strict=strict)
 
-    def get_trace_detail(self, trace_id: str) -> Dict[str, Any]:
+    def get_trace_detail(self, trace_id: str, priority: int = INTERACTIVE) -> Dict[str, Any]:
         """Get detailed trace"""
-        try:
-            response = self.session.get(f"{self.base_url}/api/v1/traces/{trace_id}")
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            return {}
+        return self._get("/api/v1/traces/:id", f"/api/v1/traces/{trace_id}",
+                         fallback=lambda: self._mock_trace_detail(trace_id), priority=priority)
 
     def get_metrics_tokens(self, period: str = "24h") -> Dict[str, Any]:
         """Get token usage metrics"""
-        try:
-            response = self.session.get(
-                f"{self.base_url}/api/v1/metrics/tokens",
-                params={"period": period}
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            return self._mock_metrics_tokens()
+        return self._get("/api/v1/metrics/tokens", "/api/v1/metrics/tokens",
+                         params={"period": period}, fallback=lambda: self._mock_metrics_tokens(period),
+                         parse=lambda data: parse_page(data, "data", MetricPoint))
 
     def get_metrics_costs(self, period: str = "24h") -> Dict[str, Any]:
         """Get cost metrics"""
-        try:
-            response = self.session.get(
-                f"{self.base_url}/api/v1/metrics/costs",
-                params={"period": period}
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            return self._mock_metrics_costs()
+        return self._get("/api/v1/metrics/costs", "/api/v1/metrics/costs",
+                         params={"period": period}, fallback=lambda: self._mock_metrics_costs(period),
+                         parse=lambda data: parse_page(data, "data", MetricPoint))
 
     def get_metrics_latency(self, period: str = "24h") -> Dict[str, Any]:
         """Get latency metrics"""
-        try:
-            response = self.session.get(
-                f"{self.base_url}/api/v1/metrics/latency",
-                params={"period": period}
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            return self._mock_metrics_latency()
+        return self._get("/api/v1/metrics/latency", "/api/v1/metrics/latency",
+                         params={"period": period}, fallback=lambda: self._mock_metrics_latency(period),
+                         parse=lambda data: parse_page(data, "data", MetricPoint))
+
+    def get_metrics_frame(self, kind: str, period: str = "24h") -> pd.DataFrame:
+        """Get a metric series (tokens, costs or latency) as a DataFrame; totals/summary are in frame.attrs"""
+        fallbacks = {
+            "tokens": self._mock_metrics_tokens,
+            "costs": self._mock_metrics_costs,
+            "latency": self._mock_metrics_latency,
+        }
+        return self._get(f"/api/v1/metrics/{kind}", f"/api/v1/metrics/{kind}",
+                         params={"period": period},
+                         fallback=lambda: wire_format.records_frame(fallbacks[kind](period), "data"),
+                         accept=wire_format.ACCEPT_FRAME,
+                         decode=lambda content, content_type: wire_format.decode_frame(content, content_type, "data"))
 
     def get_orchestrator_status(self) -> Dict[str, Any]:
         """Get orchestrator status"""
-        try:
-            response = self.session.get(f"{self.base_url}/api/v1/orchestrator/status")
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            return self._mock_orchestrator_status()
+        return self._get("/api/v1/orchestrator/status", "/api/v1/orchestrator/status",
+                         fallback=self._mock_orchestrator_status)
 
     def get_health(self) -> Dict[str, Any]:
         """Get system health"""
-        try:
-            response = self.session.get(f"{self.base_url}/api/v1/health")
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            return {"status": "unhealthy", "version": "unknown"}
+        return self._get("/api/v1/health", "/api/v1/health",
+                         fallback=lambda: {"status": "unhealthy", "version": "unknown"})
 
-    # Mock data methods for development
+    # Mock data for development, served from the shared synthetic dataset (see lib/datagen.py)
     @staticmethod
     def _mock_overview_stats() -> Dict[str, Any]:
-        return {
-            "totalAgents": 8,
-            "activeAgents": 6,
-            "totalRequests": 15847,
-            "successRate": 98.5,
-            "totalTokens": 2458900,
-            "totalCost": 45.67,
-            "avgLatency": 245,
-            "activeTraces": 23
-        }
+        return datagen.mock_dataset().overview_stats()
 
     @staticmethod
-    def _mock_activity_data() -> Dict[str, Any]:
-        import random
-        hours = [f"{i:02d}:00" for i in range(24)]
-        return {
-            "data": [
-                {
-                    "time": h,
-                    "requests": random.randint(50, 200),
-                    "tokens": random.randint(5000, 15000),
-                    "cost": round(random.uniform(0.1, 0.5), 3)
-                }
-                for h in hours
-            ]
-        }
+    def _mock_activity_data(period: str = "24h") -> Dict[str, Any]:
+        return datagen.mock_dataset().activity(period)
 
     @staticmethod
-    def _mock_agents() -> Dict[str, Any]:
-        agents = [
-            {"id": "agent-001", "name": "Research Agent", "type": "researcher", "status": "active",
-             "description": "Handles web research", "model": "gpt-4", "lastActive": "2024-01-15T10:30:00Z",
-             "totalRequests": 1250, "successRate": 99.2, "avgLatency": 320, "totalTokens": 450000,
-             "totalCost": 12.50, "isConnectedToOrchestrator": True, "currentTask": "Analyzing trends"},
-            {"id": "agent-002", "name": "Analysis Agent", "type": "analyzer", "status": "active",
-             "description": "Data analysis", "model": "gpt-4", "lastActive": "2024-01-15T10:25:00Z",
-             "totalRequests": 850, "successRate": 98.9, "avgLatency": 280, "totalTokens": 320000,
-             "totalCost": 9.80, "isConnectedToOrchestrator": True, "currentTask": "Processing dataset"},
-            {"id": "agent-003", "name": "Writer Agent", "type": "writer", "status": "idle",
-             "description": "Content writing", "model": "gpt-3.5-turbo", "lastActive": "2024-01-15T10:00:00Z",
-             "totalRequests": 650, "successRate": 97.5, "avgLatency": 200, "totalTokens": 250000,
-             "totalCost": 5.20, "isConnectedToOrchestrator": False, "currentTask": None},
-        ]
-        return {"agents": agents, "total": len(agents), "active": 2}
+    def _mock_agents(status: str = "all", search: str = "") -> Dict[str, Any]:
+        return datagen.mock_dataset().agents(status, search)
 
     @staticmethod
     def _mock_agent_detail(agent_id: str) -> Dict[str, Any]:
-        return {
-            "id": agent_id,
-            "name": "Research Agent",
-            "type": "researcher",
-            "status": "active",
-            "description": "Handles web research and data gathering",
-            "model": "gpt-4",
-            "lastActive": "2024-01-15T10:30:00Z",
-            "createdAt": "2024-01-01T00:00:00Z",
-            "metrics": {
-                "totalRequests": 1250,
-                "successRate": 99.2,
-                "avgLatency": 320,
-                "totalTokens": 450000,
-                "inputTokens": 200000,
-                "outputTokens": 250000,
-                "totalCost": 12.50,
-                "errorCount": 10
-            },
-            "recentActivity": [{"time": f"{i:02d}:00", "requests": 45, "tokens": 5600}
-                              for i in range(24)]
-        }
+        data = datagen.mock_dataset()
+        index = data.agent_index(agent_id)
+        if index is None:
+            return dict(data.agent_detail(0), id=agent_id)
+        return data.agent_detail(index)
 
     @staticmethod
-    def _mock_logs() -> Dict[str, Any]:
-        import random
-        logs = [
-            {
-                "id": f"log-{i:03d}",
-                "timestamp": f"2024-01-15T{random.randint(0,23):02d}:{random.randint(0,59):02d}:00Z",
-                "level": random.choice(["info", "warning", "error"]),
-                "message": f"Task execution completed",
-                "agentId": f"agent-{random.randint(1,3):03d}",
-                "agentName": random.choice(["Research", "Analysis", "Writer"]),
-                "traceId": f"trace-{random.randint(1,100):03d}",
-                "inputTokens": random.randint(50, 500),
-                "outputTokens": random.randint(100, 1000),
-                "totalTokens": random.randint(200, 1500),
-                "latency": random.randint(100, 5000),
-                "cost": round(random.uniform(0.001, 0.1), 4),
-                "status": random.choice(["success", "error"]),
-                "metadata": {"taskType": "research", "sources": random.randint(1, 10)}
-            }
-            for i in range(50)
-        ]
-        return {"logs": logs, "total": 15847, "hasMore": True}
+    def _mock_logs(limit: int = 50, offset: int = 0, level: str = "all", status: str = "all",
+                   agent_id: str = "", search: str = "", trace_id: str = "") -> Dict[str, Any]:
+        return datagen.mock_dataset().logs(limit, offset, level, status, agent_id, search, trace_id)
 
     @staticmethod
-    def _mock_traces() -> Dict[str, Any]:
-        import random
-        traces = [
-            {
-                "id": f"trace-{i:03d}",
-                "name": f"User Query Session {i}",
-                "startTime": f"2024-01-15T{random.randint(0,23):02d}:{random.randint(0,59):02d}:00Z",
-                "duration": random.randint(1000, 300000),
-                "status": random.choice(["completed", "error"]),
-                "totalSpans": random.randint(1, 10),
-                "totalTokens": random.randint(500, 5000),
-                "totalCost": round(random.uniform(0.01, 0.5), 3),
-                "agents": random.sample(["agent-001", "agent-002", "agent-003"], k=random.randint(1, 2))
-            }
-            for i in range(20)
-        ]
-        return {"traces": traces, "total": 500, "hasMore": True}
+    def _mock_log_detail(log_id: str) -> Dict[str, Any]:
+        data = datagen.mock_dataset()
+        index = data.log_index(log_id)
+        return {} if index is None else data.log(index, detail=True)
 
     @staticmethod
-    def _mock_metrics_tokens() -> Dict[str, Any]:
-        import random
-        return {
-            "data": [
-                {
-                    "time": f"2024-01-15T{i:02d}:00:00Z",
-                    "inputTokens": random.randint(5000, 50000),
-                    "outputTokens": random.randint(10000, 80000),
-                    "totalTokens": random.randint(20000, 100000)
-                }
-                for i in range(24)
-            ]
-        }
+    def _mock_traces(limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        return datagen.mock_dataset().traces(limit, offset)
 
     @staticmethod
-    def _mock_metrics_costs() -> Dict[str, Any]:
-        import random
-        return {
-            "data": [
-                {
-                    "time": f"2024-01-15T{i:02d}:00:00Z",
-                    "cost": round(random.uniform(0.5, 5), 2),
-                    "requests": random.randint(50, 500)
-                }
-                for i in range(24)
-            ]
-        }
+    def _mock_trace_detail(trace_id: str) -> Dict[str, Any]:
+        data = datagen.mock_dataset()
+        index = data.trace_index(trace_id)
+        return {} if index is None else data.trace_detail(index)
 
     @staticmethod
-    def _mock_metrics_latency() -> Dict[str, Any]:
-        import random
-        return {
-            "data": [
-                {
-                    "time": f"2024-01-15T{i:02d}:00:00Z",
-                    "avg": random.randint(200, 400),
-                    "p50": random.randint(150, 300),
-                    "p95": random.randint(400, 800),
-                    "p99": random.randint(800, 1500)
-                }
-                for i in range(24)
-            ]
-        }
+    def _mock_metrics_tokens(period: str = "24h") -> Dict[str, Any]:
+        return datagen.mock_dataset().metrics_tokens(period)
+
+    @staticmethod
+    def _mock_metrics_costs(period: str = "24h") -> Dict[str, Any]:
+        return datagen.mock_dataset().metrics_costs(period)
+
+    @staticmethod
+    def _mock_metrics_latency(period: str = "24h") -> Dict[str, Any]:
+        return datagen.mock_dataset().metrics_latency(period)
 
     @staticmethod
     def _mock_orchestrator_status() -> Dict[str, Any]:
-        return {
-            "status": "active",
-            "uptime": 86400000,
-            "connectedAgents": ["agent-001", "agent-002"],
-            "pendingTasks": 3,
-            "activeTasks": 2,
-            "completedTasks": 1547,
-            "queueLength": 5
-        }
+        return datagen.mock_dataset().orchestrator_status()
 
-api_client = APIClient()
+if len(config.API_BASE_URLS) > 1:
+    from lib.federation import FederatedAPIClient
+    api_client = FederatedAPIClient(config.API_BASE_URLS)
+else:
+    api_client = APIClient()
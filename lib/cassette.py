@@ -0,0 +1,179 @@
+import atexit
+import gzip
+import hashlib
+import io
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+from urllib3._collections import HTTPHeaderDict
+import config
+
+RECORD = "record"
+REPLAY = "replay"
+# Request headers that select a different response for the same URL
+KEY_HEADERS = ("Accept", "If-None-Match", "If-Modified-Since")
+
+
+def request_key(request: requests.PreparedRequest, conditional: bool = True) -> str:
+    """Host-independent identity of a request: method, path and query, body and selecting headers
+
+    With `conditional` off, validators are left out, so a recorded full response can
+    answer a conditional request the recording never made.
+    """
+    body = request.body or b""
+    if isinstance(body, str):
+        body = body.encode()
+    headers = [(name, request.headers.get(name, "")) for name in KEY_HEADERS
+               if conditional or not name.startswith("If-")]
+    digest = hashlib.sha1(body).hexdigest()[:16] if body else ""
+    return json.dumps([request.method, request.path_url, digest, headers], separators=(",", ":"))
+
+
+class Cassette:
+    """Recorded HTTP exchanges: status, headers, raw (still encoded) body and time to last byte
+
+    The file is a gzip stream of JSON header lines; each distinct body is written once,
+    right after its first header line, as raw bytes. Replays of one request are served
+    in recorded order, repeating the last once they run out.
+    """
+
+    def __init__(self, path: str, mode: str):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode {mode!r}; expected {RECORD!r} or {REPLAY!r}")
+        self.path = path
+        self.mode = mode
+        self.exchanges = 0
+        self.hits = 0
+        self.misses = 0
+        self._exchanges: Dict[str, List[Dict[str, Any]]] = {}
+        self._bodies: Dict[str, bytes] = {}
+        self._cursors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._file = None
+        if mode == RECORD:
+            self._file = gzip.open(path, "wb")
+            atexit.register(self.close)
+        else:
+            self._load()
+
+    def _load(self):
+        with gzip.open(self.path, "rb") as f:
+            try:
+                for line in f:
+                    exchange = json.loads(line)
+                    if "size" in exchange:
+                        self._bodies[exchange["body"]] = f.read(exchange.pop("size"))
+                    self._exchanges.setdefault(exchange["key"], []).append(exchange)
+                    if exchange["fullKey"] != exchange["key"] and exchange["status"] != 304:
+                        self._exchanges.setdefault(exchange["fullKey"], []).append(exchange)
+                    self.exchanges += 1
+            except EOFError:
+                pass  # Recording was cut short; keep every complete exchange
+
+    def record(self, key: str, full_key: str, status: int, reason: str, headers: Dict[str, str], body: bytes,
+               elapsed: float):
+        digest = hashlib.sha1(body).hexdigest() if body else ""
+        exchange = {"key": key, "fullKey": full_key, "status": status, "reason": reason, "headers": headers,
+                    "body": digest, "elapsed": round(elapsed, 6)}
+        with self._lock:
+            if digest and digest not in self._bodies:
+                self._bodies[digest] = b""  # Only the digest is needed to skip later copies
+                exchange["size"] = len(body)
+                self._file.write(json.dumps(exchange, separators=(",", ":")).encode() + b"\n" + body)
+            else:
+                self._file.write(json.dumps(exchange, separators=(",", ":")).encode() + b"\n")
+            self._file.flush()
+            self.exchanges += 1
+
+    def play(self, key: str, full_key: str) -> Optional[Dict[str, Any]]:
+        """The next recorded exchange for `key`, else a full response recorded without validators"""
+        with self._lock:
+            for candidate in (key, full_key):
+                exchanges = self._exchanges.get(candidate)
+                if exchanges:
+                    cursor = self._cursors.get(candidate, 0)
+                    self._cursors[candidate] = cursor + 1
+                    self.hits += 1
+                    return exchanges[min(cursor, len(exchanges) - 1)]
+            self.misses += 1
+            return None
+
+    def body(self, exchange: Dict[str, Any]) -> bytes:
+        return self._bodies.get(exchange["body"], b"")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"mode": self.mode, "path": self.path, "exchanges": self.exchanges, "bodies": len(self._bodies),
+                    "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class CassetteAdapter(HTTPAdapter):
+    """Transport adapter that records every exchange through `inner`, or replays them with no network
+
+    Replayed responses carry the recorded headers and undecoded body, so requests decodes
+    them exactly as it did the originals; each waits its recorded time to last byte times
+    `latency_scale` (0 serves instantly). A request with no recording fails like an
+    unreachable backend.
+    """
+
+    def __init__(self, cassette: Cassette, inner: Optional[HTTPAdapter] = None,
+                 latency_scale: float = config.API_CASSETTE_LATENCY_SCALE):
+        super().__init__()
+        self.cassette = cassette
+        self.inner = inner or HTTPAdapter()
+        self.latency_scale = latency_scale
+
+    def send(self, request: requests.PreparedRequest, stream: bool = False, **kwargs) -> requests.Response:
+        key, full_key = request_key(request), request_key(request, conditional=False)
+        if self.cassette.mode == REPLAY:
+            exchange = self.cassette.play(key, full_key)
+            if exchange is None:
+                raise requests.ConnectionError(f"No recorded response for {request.method} {request.path_url}",
+                                               request=request)
+            if self.latency_scale > 0:
+                time.sleep(exchange["elapsed"] * self.latency_scale)
+            return self._response(request, exchange["status"], exchange["reason"], exchange["headers"],
+                                  self.cassette.body(exchange))
+        start = time.perf_counter()
+        live = self.inner.send(request, stream=True, **kwargs)
+        body = live.raw.read(decode_content=False)
+        elapsed = time.perf_counter() - start
+        headers = dict(live.raw.headers.items())
+        self.cassette.record(key, full_key, live.status_code, live.reason or "", headers, body, elapsed)
+        response = self._response(request, live.status_code, live.reason or "", headers, body)
+        response.raw.retries = live.raw.retries
+        live.close()
+        return response
+
+    def _response(self, request: requests.PreparedRequest, status: int, reason: str, headers: Dict[str, str],
+                  body: bytes) -> requests.Response:
+        raw = HTTPResponse(body=io.BytesIO(body), headers=HTTPHeaderDict(headers), status=status, reason=reason,
+                           preload_content=False, decode_content=True, request_url=request.url)
+        return self.build_response(request, raw)
+
+    def close(self):
+        self.inner.close()
+        super().close()
+
+
+_cassettes: Dict[str, Cassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def open_cassette(path: str = config.API_CASSETTE, mode: str = config.API_CASSETTE_MODE) -> Cassette:
+    """The process-wide cassette at `path`, shared by every client so one file holds a whole session"""
+    with _cassettes_lock:
+        cassette = _cassettes.get(path)
+        if cassette is None:
+            cassette = _cassettes[path] = Cassette(path, mode)
+        return cassette
@@ -0,0 +1,82 @@
+import threading
+import time
+from typing import Dict, Optional
+import streamlit as st
+import config
+from lib import aggregates
+from lib.api_client import APIClient, api_client
+
+def normalize_base_url(base_url: str) -> str:
+    return ",".join(url.strip().rstrip("/") for url in base_url.split(",") if url.strip())
+
+
+DEFAULT_BASE_URL = normalize_base_url(",".join(config.API_BASE_URLS))
+
+
+def create_client(base_url: str):
+    """Build a client for one backend, or a federated client for a comma-separated list"""
+    urls = [url.strip() for url in base_url.split(",") if url.strip()]
+    if len(urls) > 1:
+        from lib.federation import FederatedAPIClient
+        return FederatedAPIClient(urls)
+    return APIClient(urls[0])
+
+
+class ClientRegistry:
+    """Process-wide clients keyed by base URL, each with its own connection pool and caches
+
+    Sessions pointing at the same backend share one client (and so one rate limiter and
+    response cache). Clients unused for `idle_ttl` seconds are closed, except the default.
+    """
+
+    def __init__(self, idle_ttl: float = config.CLIENT_IDLE_TTL):
+        self.idle_ttl = idle_ttl
+        self._clients: Dict[str, object] = {DEFAULT_BASE_URL: api_client}
+        self._last_used: Dict[str, float] = {DEFAULT_BASE_URL: time.monotonic()}
+        self._lock = threading.Lock()
+
+    def get(self, base_url: Optional[str] = None):
+        """Return the client for `base_url`, creating and pre-warming it on first use"""
+        key = normalize_base_url(base_url or "") or DEFAULT_BASE_URL
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            client = self._clients.get(key)
+            created = client is None
+            if created:
+                client = create_client(key)
+                self._clients[key] = client
+            self._last_used[key] = now
+        if created:
+            # Aggregates outlive evicted clients; resubscribe them before any response arrives
+            aggregates.attach(client)
+            client.warm()
+        return client
+
+    def _evict_idle(self, now: float):
+        for key, last_used in list(self._last_used.items()):
+            if key != DEFAULT_BASE_URL and now - last_used > self.idle_ttl:
+                self._clients.pop(key).close()
+                del self._last_used[key]
+
+    def cache_bytes(self) -> int:
+        """Estimated memory of every backend's response cache, which all sessions share"""
+        from lib.session_memory import estimate_size
+        with self._lock:
+            clients = list(self._clients.values())
+        caches = [c.cache for client in clients for c in getattr(client, "clients", [client])]
+        return estimate_size([cache.values() for cache in caches])
+
+    def stats(self) -> Dict[str, float]:
+        """Seconds since each registered backend was last used"""
+        now = time.monotonic()
+        with self._lock:
+            return {key: round(now - last_used, 1) for key, last_used in self._last_used.items()}
+
+
+registry = ClientRegistry()
+
+
+def get_client():
+    """Client for the backend selected in this session's settings"""
+    return registry.get(st.session_state.get("api_base_url"))
@@ -0,0 +1,191 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional, Tuple
+import pandas as pd
+from lib.aggregates import shared
+import config
+
+DIMENSIONS = ("agent", "model", "trace")
+MEASURES = ("cost", "inputTokens", "outputTokens", "requests")
+OTHER = "Other"
+PERIOD_HOURS = {"1h": 1, "6h": 6, "24h": 24, "7d": 168, "30d": 720}
+
+
+class CostCube:
+    """Cost and token sums per hour and (agent, model, trace), built incrementally from logs
+
+    Each log is folded in once (ids are remembered in a bounded LRU), so feeding the
+    same page again is free. Hour buckets come from the ISO timestamp prefix, without
+    parsing. Each dimension keeps at most `top_k` values: once it holds twice that
+    many, the lowest-cost ones are folded into OTHER. Cost a value accrued before it
+    was folded stays in OTHER if it later climbs back.
+    """
+
+    def __init__(self, top_k: Optional[Dict[str, int]] = None, retention_hours: int = config.CUBE_RETENTION_HOURS,
+                 seen_ids: int = config.CUBE_SEEN_IDS):
+        self.top_k = dict(config.CUBE_TOP_K, **(top_k or {}))
+        self.retention_hours = retention_hours
+        self.max_seen = seen_ids
+        # bucket ("YYYY-MM-DDTHH") -> (agent, model, trace) -> [cost, inputTokens, outputTokens, requests]
+        self._cells: Dict[str, Dict[tuple, list]] = {}
+        self._totals = {dim: {} for dim in DIMENSIONS}  # value -> cost, over retained buckets
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self.agent_names: Dict[str, str] = {}
+        self.logs = 0
+        self.version = 0
+        self._frame = None
+        self.synced_at = float("-inf")
+        self.synced_until = ""  # Newest log timestamp reached by sync()
+        self._resume: Optional[Tuple[str, int]] = None  # (newest seen, next offset) of an unfinished catch-up
+        self._lock = threading.Lock()
+
+    def ingest(self, logs: Iterable[Any]) -> int:
+        """Fold in Log records not seen before; returns how many were new"""
+        added = 0
+        with self._lock:
+            for log in logs:
+                if not log.id or log.id in self._seen or not log.timestamp:
+                    continue
+                self._seen[log.id] = None
+                bucket = log.timestamp[:13]
+                key = (log.agent_id or OTHER, log.model or OTHER, log.trace_id or OTHER)
+                cell = self._cells.setdefault(bucket, {}).get(key)
+                if cell is None:
+                    cell = self._cells[bucket][key] = [0.0, 0, 0, 0]
+                cell[0] += log.cost
+                cell[1] += log.input_tokens
+                cell[2] += log.output_tokens
+                cell[3] += 1
+                for dim, value in zip(DIMENSIONS, key):
+                    totals = self._totals[dim]
+                    totals[value] = totals.get(value, 0.0) + log.cost
+                if log.agent_id and log.agent_name:
+                    self.agent_names[log.agent_id] = log.agent_name
+                added += 1
+            if added:
+                while len(self._seen) > self.max_seen:
+                    self._seen.popitem(last=False)
+                for dim in DIMENSIONS:
+                    if len(self._totals[dim]) > 2 * self.top_k[dim]:
+                        self._compact(dim)
+                self._expire()
+                self.logs += added
+                self.version += 1
+                self._frame = None
+        return added
+
+    def _compact(self, dim: str):
+        """Keep the top_k values of `dim` by cost and fold the rest into OTHER"""
+        totals = self._totals[dim]
+        ranked = sorted((v for v in totals if v != OTHER), key=totals.get, reverse=True)
+        folded = set(ranked[self.top_k[dim]:])
+        position = DIMENSIONS.index(dim)
+        for bucket, cells in self._cells.items():
+            for key in [k for k in cells if k[position] in folded]:
+                cell = cells.pop(key)
+                merged = key[:position] + (OTHER,) + key[position + 1:]
+                target = cells.get(merged)
+                if target is None:
+                    cells[merged] = cell
+                else:
+                    for i, value in enumerate(cell):
+                        target[i] += value
+        totals[OTHER] = totals.get(OTHER, 0.0) + sum(totals.pop(v) for v in folded)
+
+    def _expire(self):
+        """Drop buckets older than the retention window, counted back from the newest bucket"""
+        if len(self._cells) <= self.retention_hours:
+            return
+        cutoff = sorted(self._cells)[-self.retention_hours]
+        for bucket in [b for b in self._cells if b < cutoff]:
+            for key, cell in self._cells.pop(bucket).items():
+                for dim, value in zip(DIMENSIONS, key):
+                    totals = self._totals[dim]
+                    totals[value] = totals.get(value, 0.0) - cell[0]
+                    if totals[value] <= 1e-12 and value != OTHER:
+                        del totals[value]
+
+    def frame(self) -> pd.DataFrame:
+        """One row per non-empty cell (bucket, agent, model, trace, measures), rebuilt only after ingest"""
+        with self._lock:
+            if self._frame is None:
+                rows = [(bucket,) + key + tuple(cell) for bucket, cells in self._cells.items()
+                        for key, cell in cells.items()]
+                self._frame = pd.DataFrame(rows, columns=("bucket",) + DIMENSIONS + MEASURES)
+            return self._frame
+
+    def pivot(self, rows: str, columns: Optional[str] = None, measure: str = "cost", period: str = "30d",
+              filters: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+        """Sum of `measure` by `rows` (and `columns`), largest rows first, over the last `period`"""
+        df = self._window(period)
+        for dim, value in (filters or {}).items():
+            df = df[df[dim] == value]
+        if columns and columns != rows:
+            table = df.pivot_table(index=rows, columns=columns, values=measure, aggfunc="sum", fill_value=0)
+            return table.loc[table.sum(axis=1).sort_values(ascending=False).index]
+        return df.groupby(rows)[measure].sum().sort_values(ascending=False).to_frame()
+
+    def series(self, by: str, measure: str = "cost", period: str = "30d",
+               filters: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+        """Hourly `measure` per value of `by` (long format: time, value, measure)"""
+        df = self._window(period)
+        for dim, value in (filters or {}).items():
+            df = df[df[dim] == value]
+        out = df.groupby(["bucket", by])[measure].sum().reset_index()
+        out["time"] = pd.to_datetime(out["bucket"] + ":00:00Z", utc=True)
+        return out
+
+    def _window(self, period: str) -> pd.DataFrame:
+        df = self.frame()
+        if df.empty:
+            return df
+        newest = datetime.strptime(df["bucket"].max(), "%Y-%m-%dT%H")
+        cutoff = (newest - timedelta(hours=PERIOD_HOURS.get(period, 720) - 1)).strftime("%Y-%m-%dT%H")
+        return df[df["bucket"] >= cutoff]
+
+    def on_response(self, endpoint: str, data: Any):
+        """APIClient listener: fold in every log page any page fetches"""
+        if endpoint == "/api/v1/logs" and isinstance(data, dict):
+            self.ingest(data.get("logs") or [])
+
+    def sync(self, client, page_size: int = config.CUBE_PAGE_SIZE, backfill: int = config.CUBE_BACKFILL,
+             interval: float = config.CUBE_SYNC_INTERVAL) -> int:
+        """Pull the newest logs page by page back to the previous sync (or `backfill` rows)
+
+        Pages arrive newest first and this client's listener may fold them in before this
+        method sees them, so the stop condition is the newest timestamp an earlier sync
+        reached, not whether a page was new. Runs at most once per `interval` seconds.
+
+        Pages are fetched without mock fallback, so synthetic logs never reach the cube. The
+        first refused or failed page ends the pass and the next one resumes at its offset;
+        newer logs only push older ones to higher offsets, so resuming skips nothing.
+        """
+        now = time.monotonic()
+        if now - self.synced_at < interval:
+            return 0
+        self.synced_at = now
+        before = self.logs
+        newest, start = self._resume or (self.synced_until, 0)
+        for offset in range(start, backfill, page_size):
+            page = client.get_logs(limit=page_size, offset=offset, mock_fallback=False)
+            if page is None:
+                self._resume = (newest, offset)
+                return self.logs - before
+            logs = page.get("logs", [])
+            self.ingest(logs)
+            stamps = [log.timestamp for log in logs if log.timestamp]
+            if stamps:
+                newest = max(newest, max(stamps))
+            if (self.synced_until and stamps and min(stamps) <= self.synced_until) \
+                    or not page.get("hasMore", len(logs) == page_size):
+                break
+        self.synced_until = newest
+        self._resume = None
+        return self.logs - before
+
+
+def cube_for(client) -> CostCube:
+    """The process-wide cube for a backend, subscribed to its clients' responses"""
+    return shared(client, CostCube)
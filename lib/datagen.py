@@ -0,0 +1,399 @@
+import time
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+import config
+
+END = 1705320000  # 2024-01-15T12:00:00Z; every timestamp is relative to this so runs are identical
+LEVELS = ["info", "warning", "error", "debug"]
+LEVEL_WEIGHTS = [0.80, 0.12, 0.06, 0.02]
+LOG_STATUSES = ["success", "error", "pending"]
+MODELS = ["gpt-4", "gpt-4o-mini", "gpt-3.5-turbo", "claude-3-sonnet"]
+MODEL_PRICE = np.array([0.03, 0.0006, 0.002, 0.015])  # $ per 1k tokens
+MODEL_LATENCY = np.array([900, 350, 300, 700])  # median ms per call
+AGENT_TYPES = ["researcher", "analyzer", "writer", "planner", "coder", "reviewer"]
+AGENT_STATUSES = ["active", "idle", "error"]
+AGENT_STATUS_WEIGHTS = [0.7, 0.2, 0.1]
+MESSAGES = [
+    "Task execution completed",
+    "Fetched {n} documents from search",
+    "Tool call web_search returned {n} results",
+    "Generated response with {n} tokens",
+    "Parsed {n} rows from dataset",
+    "Handed off subtask {n} to orchestrator",
+    "Retrying request after {n}ms backoff",
+    "Rate limited by provider, waiting {n}s",
+    "Validation failed on field {n}",
+    "Timeout after {n}ms waiting for model",
+]
+# Message templates each level draws from
+LEVEL_MESSAGES = {0: [0, 1, 2, 3, 4, 5], 1: [6, 7], 2: [8, 9], 3: [2, 4]}
+# period: (span seconds, bucket seconds)
+PERIODS = {"1h": (3600, 60), "6h": (21600, 900), "24h": (86400, 3600), "7d": (604800, 21600),
+           "30d": (2592000, 86400)}
+
+
+def iso(ts: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts))
+
+
+class Dataset:
+    """Deterministic synthetic backend data held column-wise in NumPy arrays
+
+    Logs belong to traces and agents; trace, agent and overview totals are aggregated
+    from the logs, so every endpoint agrees with every other. Logs are sorted newest first.
+    """
+
+    def __init__(self, logs: int = 20_000, agents: int = 20, traces: int = 1_000, seed: int = 0,
+                 days: int = 30):
+        rng = np.random.default_rng(seed)
+        traces = max(1, min(traces, logs))
+        self.n_logs, self.n_agents, self.n_traces = logs, agents, traces
+
+        self.agent_type = rng.integers(len(AGENT_TYPES), size=agents)
+        self.agent_model = rng.integers(len(MODELS), size=agents)
+        self.agent_status = rng.choice(len(AGENT_STATUSES), size=agents, p=AGENT_STATUS_WEIGHTS)
+        self.agent_connected = (rng.random(agents) < 0.8) & (self.agent_status != 2)
+        self.agent_names = [f"{AGENT_TYPES[t].capitalize()} Agent {i + 1}" for i, t in enumerate(self.agent_type)]
+
+        # Every trace gets at least one log; logs are laid out trace by trace, then re-sorted by time
+        counts = 1 + rng.multinomial(logs - traces, np.full(traces, 1 / traces))
+        firsts = np.cumsum(counts) - counts
+        log_trace = np.repeat(np.arange(traces), counts)
+        trace_agents = rng.integers(agents, size=(traces, 3))
+        trace_agent_count = rng.integers(1, 4, size=traces)
+        pick = (rng.random(logs) * trace_agent_count[log_trace]).astype(np.int64)
+        log_agent = trace_agents[log_trace, pick]
+        model = self.agent_model[log_agent]
+
+        level = rng.choice(len(LEVELS), size=logs, p=LEVEL_WEIGHTS)
+        message = np.empty(logs, dtype=np.int8)
+        for code, pool in LEVEL_MESSAGES.items():
+            mask = level == code
+            message[mask] = rng.choice(pool, size=int(mask.sum()))
+        input_tokens = (rng.lognormal(5.5, 0.6, logs) + 10).astype(np.int32)
+        output_tokens = (rng.lognormal(6.0, 0.7, logs) + 10).astype(np.int32)
+        latency = (MODEL_LATENCY[model] * rng.lognormal(0, 0.5, logs)).astype(np.int32) + 20
+        cost = np.round((input_tokens + output_tokens) / 1000 * MODEL_PRICE[model], 6)
+
+        # Calls within a trace run back to back with small gaps; the trace ends before END
+        steps = latency + rng.integers(0, 2000, logs)
+        cumulative = np.cumsum(steps)
+        trace_base = cumulative[firsts] - steps[firsts]
+        offset_ms = cumulative - np.repeat(trace_base, counts)
+        duration_ms = np.add.reduceat(steps, firsts)
+        trace_start = END - duration_ms / 1000 - rng.random(traces) * (days * 86400 - duration_ms / 1000)
+        timestamp = trace_start[log_trace] + offset_ms / 1000
+
+        # The newest traces are still running: their last call is pending
+        trace_end = trace_start + duration_ms / 1000
+        running = trace_end > END - 300
+        status = np.where(level == 2, 1, 0).astype(np.int8)
+        last = firsts + counts - 1
+        status[last[running]] = 2
+
+        order = np.argsort(-timestamp, kind="stable")
+        self.timestamp = timestamp[order]
+        self.level = level[order].astype(np.int8)
+        self.message = message[order]
+        self.param = rng.integers(1, 100, size=logs).astype(np.int16)
+        self.agent = log_agent[order].astype(np.int32)
+        self.trace = log_trace[order].astype(np.int32)
+        self.model = model[order].astype(np.int8)
+        self.input_tokens = input_tokens[order]
+        self.output_tokens = output_tokens[order]
+        self.latency = latency[order]
+        self.cost = cost[order]
+        self.status = status[order]
+
+        # Trace aggregates, computed from their logs
+        self.trace_start = trace_start
+        self.trace_duration = duration_ms
+        self.trace_spans = counts
+        self.trace_tokens = np.bincount(self.trace, self.input_tokens + self.output_tokens, traces).astype(np.int64)
+        self.trace_cost = np.bincount(self.trace, self.cost, traces)
+        self.trace_errors = np.bincount(self.trace, self.status == 1, traces)
+        self.trace_running = running
+        self.trace_order = np.argsort(-trace_start, kind="stable")
+        # Log indices grouped by trace (newest first within each trace)
+        self.logs_by_trace = np.argsort(self.trace, kind="stable")
+        self.trace_log_starts = np.concatenate(([0], np.cumsum(counts)))
+
+        # Agent aggregates
+        self.agent_requests = np.bincount(self.agent, minlength=agents)
+        self.agent_errors = np.bincount(self.agent, self.status == 1, agents)
+        self.agent_tokens = np.bincount(self.agent, self.input_tokens + self.output_tokens, agents).astype(np.int64)
+        self.agent_cost = np.bincount(self.agent, self.cost, agents)
+        self.agent_latency = np.bincount(self.agent, self.latency, agents)
+        first_seen = np.full(agents, -1)
+        seen, index = np.unique(self.agent, return_index=True)
+        first_seen[seen] = index
+        self.agent_first_log = first_seen
+        self.agent_last_active = np.where(first_seen >= 0, self.timestamp[np.maximum(first_seen, 0)], END - days * 86400)
+
+    # Lookups
+
+    @staticmethod
+    def _index(prefix: str, identifier: str, size: int) -> Optional[int]:
+        if not identifier.startswith(prefix):
+            return None
+        try:
+            index = int(identifier[len(prefix):])
+        except ValueError:
+            return None
+        return index if 0 <= index < size else None
+
+    def agent_index(self, agent_id: str) -> Optional[int]:
+        return self._index("agent-", agent_id, self.n_agents)
+
+    def trace_index(self, trace_id: str) -> Optional[int]:
+        return self._index("trace-", trace_id, self.n_traces)
+
+    def log_index(self, log_id: str) -> Optional[int]:
+        return self._index("log-", log_id, self.n_logs)
+
+    # Rows
+
+    def log(self, i: int, detail: bool = False) -> Dict[str, Any]:
+        agent = int(self.agent[i])
+        row = {
+            "id": f"log-{i:08d}",
+            "timestamp": iso(self.timestamp[i]),
+            "level": LEVELS[self.level[i]],
+            "message": MESSAGES[self.message[i]].format(n=int(self.param[i])),
+            "agentId": f"agent-{agent:04d}",
+            "agentName": self.agent_names[agent],
+            "traceId": f"trace-{int(self.trace[i]):06d}",
+            "model": MODELS[self.model[i]],
+            "inputTokens": int(self.input_tokens[i]),
+            "outputTokens": int(self.output_tokens[i]),
+            "totalTokens": int(self.input_tokens[i] + self.output_tokens[i]),
+            "latency": int(self.latency[i]),
+            "cost": float(self.cost[i]),
+            "status": LOG_STATUSES[self.status[i]],
+            "metadata": {"taskType": AGENT_TYPES[self.agent_type[agent]], "sources": int(self.param[i]) % 10 + 1},
+        }
+        if detail:
+            row["input"] = f"Step {int(self.param[i])} of trace {row['traceId']}"
+            row["output"] = row["message"]
+        return row
+
+    def trace_row(self, t: int) -> Dict[str, Any]:
+        logs = self.logs_by_trace[self.trace_log_starts[t]:self.trace_log_starts[t + 1]]
+        agents = sorted({f"agent-{a:04d}" for a in self.agent[logs].tolist()})
+        status = "running" if self.trace_running[t] else "error" if self.trace_errors[t] else "completed"
+        return {
+            "id": f"trace-{t:06d}",
+            "name": f"User Query Session {t}",
+            "startTime": iso(self.trace_start[t]),
+            "duration": int(self.trace_duration[t]),
+            "status": status,
+            "totalSpans": int(self.trace_spans[t]),
+            "totalTokens": int(self.trace_tokens[t]),
+            "totalCost": round(float(self.trace_cost[t]), 6),
+            "agents": agents,
+        }
+
+    def agent_row(self, a: int) -> Dict[str, Any]:
+        requests = int(self.agent_requests[a])
+        return {
+            "id": f"agent-{a:04d}",
+            "name": self.agent_names[a],
+            "type": AGENT_TYPES[self.agent_type[a]],
+            "status": AGENT_STATUSES[self.agent_status[a]],
+            "description": f"{AGENT_TYPES[self.agent_type[a]].capitalize()} agent",
+            "model": MODELS[self.agent_model[a]],
+            "lastActive": iso(self.agent_last_active[a]),
+            "totalRequests": requests,
+            "successRate": round(100 * (1 - float(self.agent_errors[a]) / requests), 1) if requests else 100.0,
+            "avgLatency": round(float(self.agent_latency[a] / requests), 1) if requests else 0.0,
+            "totalTokens": int(self.agent_tokens[a]),
+            "totalCost": round(float(self.agent_cost[a]), 4),
+            "isConnectedToOrchestrator": bool(self.agent_connected[a]),
+            "currentTask": f"Running trace-{int(self.trace[self.agent_first_log[a]]):06d}"
+                           if self.agent_status[a] == 0 and self.agent_first_log[a] >= 0 else None,
+        }
+
+    # Queries
+
+    @lru_cache(maxsize=64)
+    def _log_matches(self, level: str, status: str, agent_id: str, search: str,
+                     trace_id: str = "") -> Optional[np.ndarray]:
+        """Indices of logs passing the filters, or None when nothing is filtered"""
+        mask = None
+
+        def both(current, condition):
+            return condition if current is None else current & condition
+
+        if level and level != "all":
+            mask = both(mask, self.level == (LEVELS.index(level) if level in LEVELS else -1))
+        if status and status != "all":
+            mask = both(mask, self.status == (LOG_STATUSES.index(status) if status in LOG_STATUSES else -1))
+        if agent_id:
+            index = self.agent_index(agent_id)
+            mask = both(mask, self.agent == (-1 if index is None else index))
+        if trace_id:
+            index = self.trace_index(trace_id)
+            mask = both(mask, self.trace == (-1 if index is None else index))
+        if search:
+            # Match message templates and agent names; template placeholders are not searchable
+            needle = search.lower()
+            messages = [i for i, m in enumerate(MESSAGES) if needle in m.lower()]
+            agents = [i for i, n in enumerate(self.agent_names) if needle in n.lower()]
+            mask = both(mask, np.isin(self.message, messages) | np.isin(self.agent, agents))
+        return None if mask is None else np.flatnonzero(mask)
+
+    def logs(self, limit: int = 50, offset: int = 0, level: str = "all", status: str = "all",
+             agent_id: str = "", search: str = "", trace_id: str = "") -> Dict[str, Any]:
+        matches = self._log_matches(level, status, agent_id, search, trace_id)
+        total = self.n_logs if matches is None else len(matches)
+        page = range(offset, min(offset + limit, total))
+        if matches is not None:
+            page = matches[offset:offset + limit].tolist()
+        logs = [self.log(i) for i in page]
+        return {"logs": logs, "total": total, "hasMore": offset + len(logs) < total}
+
+    def traces(self, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        page = self.trace_order[offset:offset + limit].tolist()
+        return {"traces": [self.trace_row(t) for t in page], "total": self.n_traces,
+                "hasMore": offset + len(page) < self.n_traces}
+
+    def trace_detail(self, t: int) -> Dict[str, Any]:
+        logs = self.logs_by_trace[self.trace_log_starts[t]:self.trace_log_starts[t + 1]]
+        # Spans in start order
+        spans = [self.log(int(i)) for i in logs[::-1].tolist()]
+        return {**self.trace_row(t), "spans": spans}
+
+    def agents(self, status: str = "all", search: str = "") -> Dict[str, Any]:
+        rows = [self.agent_row(a) for a in range(self.n_agents)]
+        if status and status != "all":
+            rows = [r for r in rows if r["status"] == status]
+        if search:
+            rows = [r for r in rows if search.lower() in r["name"].lower()]
+        return {"agents": rows, "total": len(rows), "active": sum(r["status"] == "active" for r in rows)}
+
+    def agent_detail(self, a: int) -> Dict[str, Any]:
+        row = self.agent_row(a)
+        mask = self.agent == a
+        buckets = self._buckets("24h", mask)
+        return {
+            **{k: row[k] for k in ("id", "name", "type", "status", "description", "model", "lastActive")},
+            "createdAt": iso(END - 90 * 86400),
+            "metrics": {
+                "totalRequests": row["totalRequests"],
+                "successRate": row["successRate"],
+                "avgLatency": row["avgLatency"],
+                "totalTokens": row["totalTokens"],
+                "inputTokens": int(self.input_tokens[mask].sum()),
+                "outputTokens": int(self.output_tokens[mask].sum()),
+                "totalCost": row["totalCost"],
+                "errorCount": int(self.agent_errors[a]),
+            },
+            "recentActivity": [{"time": time.strftime("%H:%M", time.gmtime(t)), "requests": int(r), "tokens": int(k)}
+                               for t, r, k in zip(buckets["time"], buckets["requests"], buckets["tokens"])],
+        }
+
+    def _window(self, period: str, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, float, int, int]:
+        span, step = PERIODS.get(period, PERIODS["24h"])
+        start = END - span
+        # Timestamps are sorted descending, so the window is a prefix
+        end = int(np.searchsorted(-self.timestamp, -start, side="right"))
+        index = np.arange(end)
+        if mask is not None:
+            index = index[mask[:end]]
+        return index, start, step, span // step
+
+    def _buckets(self, period: str, mask: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        index, start, step, n = self._window(period, mask)
+        bucket = np.minimum(((self.timestamp[index] - start) // step).astype(np.int64), n - 1)
+        tokens = self.input_tokens[index] + self.output_tokens[index]
+        return {
+            "time": start + np.arange(n) * step,
+            "bucket": bucket,
+            "index": index,
+            "requests": np.bincount(bucket, minlength=n),
+            "inputTokens": np.bincount(bucket, self.input_tokens[index], n).astype(np.int64),
+            "outputTokens": np.bincount(bucket, self.output_tokens[index], n).astype(np.int64),
+            "tokens": np.bincount(bucket, tokens, n).astype(np.int64),
+            "cost": np.bincount(bucket, self.cost[index], n),
+        }
+
+    @lru_cache(maxsize=32)
+    def activity(self, period: str = "24h") -> Dict[str, Any]:
+        b = self._buckets(period)
+        return {"data": [{"time": iso(t), "requests": int(r), "tokens": int(k), "cost": round(float(c), 4)}
+                         for t, r, k, c in zip(b["time"], b["requests"], b["tokens"], b["cost"])]}
+
+    @lru_cache(maxsize=32)
+    def metrics_tokens(self, period: str = "24h") -> Dict[str, Any]:
+        b = self._buckets(period)
+        data = [{"time": iso(t), "inputTokens": int(i), "outputTokens": int(o), "totalTokens": int(i + o)}
+                for t, i, o in zip(b["time"], b["inputTokens"], b["outputTokens"])]
+        totals = {"inputTokens": int(b["inputTokens"].sum()), "outputTokens": int(b["outputTokens"].sum()),
+                  "totalTokens": int(b["tokens"].sum())}
+        return {"data": data, "totals": totals}
+
+    @lru_cache(maxsize=32)
+    def metrics_costs(self, period: str = "24h") -> Dict[str, Any]:
+        b = self._buckets(period)
+        data = [{"time": iso(t), "cost": round(float(c), 4), "requests": int(r)}
+                for t, c, r in zip(b["time"], b["cost"], b["requests"])]
+        return {"data": data, "totals": {"cost": round(float(b["cost"].sum()), 4), "requests": int(b["requests"].sum())}}
+
+    @lru_cache(maxsize=32)
+    def metrics_latency(self, period: str = "24h") -> Dict[str, Any]:
+        b = self._buckets(period)
+        latency = self.latency[b["index"]]
+        counts = b["requests"]
+        # Sort by (bucket, latency) once and read each bucket's percentiles by position
+        ordered = latency[np.lexsort((latency, b["bucket"]))]
+        starts = np.cumsum(counts) - counts
+        sums = np.bincount(b["bucket"], latency, len(counts))
+
+        def percentile(q):
+            if not len(ordered):
+                return np.zeros(len(counts), dtype=np.int64)
+            positions = starts + np.floor(q * np.maximum(counts - 1, 0)).astype(np.int64)
+            return np.where(counts > 0, ordered[np.minimum(positions, len(ordered) - 1)], 0)
+
+        p50, p95, p99 = percentile(0.5), percentile(0.95), percentile(0.99)
+        avg = np.divide(sums, counts, out=np.zeros(len(counts)), where=counts > 0)
+        data = [{"time": iso(t), "avg": int(a), "p50": int(x), "p95": int(y), "p99": int(z)}
+                for t, a, x, y, z in zip(b["time"], avg, p50, p95, p99)]
+        summary = {"avg": int(latency.mean()) if len(latency) else 0,
+                   "p95": int(np.percentile(latency, 95)) if len(latency) else 0,
+                   "p99": int(np.percentile(latency, 99)) if len(latency) else 0,
+                   "max": int(latency.max()) if len(latency) else 0}
+        return {"data": data, "summary": summary}
+
+    @lru_cache(maxsize=1)
+    def overview_stats(self) -> Dict[str, Any]:
+        tokens = int((self.input_tokens.astype(np.int64) + self.output_tokens).sum())
+        return {
+            "totalAgents": self.n_agents,
+            "activeAgents": int((self.agent_status == 0).sum()),
+            "totalRequests": self.n_logs,
+            "successRate": round(100 * float((self.status != 1).mean()), 1),
+            "totalTokens": tokens,
+            "totalCost": round(float(self.cost.sum()), 2),
+            "avgLatency": int(self.latency.mean()),
+            "activeTraces": int(self.trace_running.sum()),
+        }
+
+    def orchestrator_status(self) -> Dict[str, Any]:
+        running = int(self.trace_running.sum())
+        return {
+            "status": "active",
+            "uptime": 86400000,
+            "connectedAgents": [f"agent-{a:04d}" for a in np.flatnonzero(self.agent_connected).tolist()],
+            "pendingTasks": running // 2,
+            "activeTasks": running - running // 2,
+            "completedTasks": int(self.n_traces - running),
+            "queueLength": running // 2,
+        }
+
+
+@lru_cache(maxsize=1)
+def mock_dataset() -> Dataset:
+    """The dataset behind mock mode, generated once per process"""
+    return Dataset(**config.MOCK_DATASET)
@@ -0,0 +1,261 @@
+import csv
+import io
+import json
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, get_type_hints
+from lib.models import Log, Trace
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+FORMATS = ["csv", "jsonl", "parquet"]
+MIME_TYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson", "parquet": "application/vnd.apache.parquet"}
+# CSV rows held in memory before the spool moves to a temporary file
+_SPOOL_BYTES = 8 * 1024 * 1024
+
+
+class ExportProgress:
+    def __init__(self):
+        self.rows = 0
+        self.pages = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+        self.total = None
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        of_total = f"/{self.total:,}" if self.total else ""
+        return (f"{self.rows:,}{of_total} rows, {self.pages} pages, {self.bytes / 1e6:.1f} MB "
+                f"in {self.elapsed:.1f}s ({self.rows_per_second:,.0f} rows/s)")
+
+
+def iter_pages(open_page: Callable[[int, int], Any], page_size: int = 1000, max_rows: Optional[int] = None,
+               prefetch: bool = True, progress: Optional[ExportProgress] = None) -> Iterator[List[Any]]:
+    """Walk an offset-paginated stream endpoint page by page
+
+    `open_page(limit, offset)` returns a RecordStream. With `prefetch`, the next page is
+    fetched on a worker thread while the caller processes the current one, so at most two
+    pages are held in memory.
+    """
+    def load(offset: int):
+        limit = page_size if max_rows is None else min(page_size, max_rows - offset)
+        stream = open_page(limit, offset)
+        return list(stream), stream.metadata
+
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        offset = 0
+        pending = executor.submit(load, offset) if executor else None
+        while max_rows is None or offset < max_rows:
+            records, metadata = pending.result() if executor else load(offset)
+            if not records:
+                return
+            offset += len(records)
+            total = metadata.get("total")
+            if progress is not None and total is not None:
+                progress.total = total if max_rows is None else min(total, max_rows)
+            done = (metadata.get("hasMore") is False or (total is not None and offset >= total)
+                    or (max_rows is not None and offset >= max_rows))
+            if executor and not done:
+                pending = executor.submit(load, offset)
+            yield records
+            if done:
+                return
+    finally:
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _flatten(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Serialize nested values so every format sees a flat, stable set of columns"""
+    return {k: json.dumps(v) if isinstance(v, (dict, list, tuple)) else v for k, v in row.items()}
+
+
+class CsvWriter:
+    """Writes one header covering every key seen on any page, in first-seen order
+
+    The record type's own keys come first. Others can first appear on a later page (extra
+    fields, `source`), so rows are spooled (to disk past `_SPOOL_BYTES`) and the header is
+    written on close. Rows written before a new key appeared are padded with empty cells for it.
+    """
+
+    def __init__(self, out: BinaryIO, record_cls):
+        self.out = out
+        self.fieldnames: List[str] = [key for attr, key, convert in record_cls._fields]
+        self._known = set(self.fieldnames)
+        self._rows = 0
+        self._full_width_rows = 0  # Rows written after the last new key; they need no padding
+        self._body = tempfile.SpooledTemporaryFile(max_size=_SPOOL_BYTES)
+
+    def write(self, rows: List[Dict[str, Any]]) -> int:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            row = _flatten(row)
+            new = [key for key in row if key not in self._known]
+            if new:
+                self.fieldnames.extend(new)
+                self._known.update(new)
+                self._full_width_rows = 0
+            writer.writerow([row.get(key) for key in self.fieldnames])
+            self._rows += 1
+            self._full_width_rows += 1
+        data = buffer.getvalue().encode()
+        self._body.write(data)
+        return len(data)
+
+    def close(self):
+        if not self._rows:
+            self._body.close()
+            return
+        header = io.StringIO()
+        csv.writer(header).writerow(self.fieldnames)
+        self.out.write(header.getvalue().encode())
+        self._body.seek(0)
+        if self._full_width_rows == self._rows:
+            shutil.copyfileobj(self._body, self.out)
+        else:
+            # Re-parse rather than split on newlines: quoted fields may contain them
+            text = io.TextIOWrapper(self._body, encoding="utf-8", newline="")
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            width = len(self.fieldnames)
+            for row in csv.reader(text):
+                writer.writerow(row + [""] * (width - len(row)))
+                if buffer.tell() >= _SPOOL_BYTES:
+                    self.out.write(buffer.getvalue().encode())
+                    buffer.seek(0)
+                    buffer.truncate()
+            self.out.write(buffer.getvalue().encode())
+        self._body.close()
+
+
+class JsonlWriter:
+    def __init__(self, out: BinaryIO, record_cls):
+        self.out = out
+
+    def write(self, rows: List[Dict[str, Any]]) -> int:
+        data = "".join(json.dumps(row) + "\n" for row in rows).encode()
+        self.out.write(data)
+        return len(data)
+
+    def close(self):
+        pass
+
+
+def parquet_schema(record_cls) -> "pa.Schema":
+    """Arrow schema for a record type, declared up front so no page can contradict it
+
+    Columns follow the record's fields, typed by their converters' return types; anything
+    else (passthrough values, tuples, metadata) is a string, JSON-encoded when nested.
+    `source` and `extra` (unknown keys as a JSON object) are always present.
+    """
+    types = {str: pa.string(), int: pa.int64(), float: pa.float64(), bool: pa.bool_(),
+             Optional[int]: pa.int64(), Optional[float]: pa.float64()}
+    fields = [pa.field(key, types.get(get_type_hints(convert).get("return"), pa.string()))
+              for attr, key, convert in record_cls._fields]
+    return pa.schema(fields + [pa.field("source", pa.string()), pa.field("extra", pa.string())])
+
+
+class ParquetWriter:
+    """Writes one row group per page under the record type's declared schema"""
+
+    def __init__(self, out: BinaryIO, record_cls):
+        if pa is None:
+            raise RuntimeError("Parquet export requires pyarrow")
+        self.out = out
+        self.schema = parquet_schema(record_cls)
+        self._strings = {field.name for field in self.schema if pa.types.is_string(field.type)}
+        self.writer = pq.ParquetWriter(self.out, self.schema)
+
+    def write(self, rows: List[Dict[str, Any]]) -> int:
+        start = self.out.tell()
+        columns = {name: [] for name in self.schema.names}
+        for row in rows:
+            extra = {k: v for k, v in row.items() if k not in columns}
+            row = _flatten(row)
+            row["extra"] = json.dumps(extra) if extra else None
+            for name, values in columns.items():
+                value = row.get(name)
+                values.append(str(value) if value is not None and name in self._strings else value)
+        self.writer.write_table(pa.Table.from_pydict(columns, schema=self.schema))
+        return self.out.tell() - start
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {"csv": CsvWriter, "jsonl": JsonlWriter, "parquet": ParquetWriter}
+RECORD_TYPES = {"logs": Log, "traces": Trace}
+
+
+def export(client, kind: str, fmt: str, out: BinaryIO, page_size: int = 1000, max_rows: Optional[int] = None,
+           filters: Optional[Dict[str, Any]] = None, prefetch: bool = True,
+           on_progress: Optional[Callable[[ExportProgress], None]] = None) -> ExportProgress:
+    """Export logs or traces to `out` incrementally; memory is bounded by two pages"""
+    filters = filters or {}
+    if kind == "logs":
+        open_page = lambda limit, offset: client.stream_logs(limit=limit, offset=offset, strict=True, **filters)
+    elif kind == "traces":
+        open_page = lambda limit, offset: client.stream_traces(limit=limit, offset=offset, strict=True)
+    else:
+        raise ValueError(f"Unknown export kind: {kind}")
+    writer = WRITERS[fmt](out, RECORD_TYPES[kind])
+    progress = ExportProgress()
+    try:
+        for records in iter_pages(open_page, page_size, max_rows, prefetch, progress):
+            progress.bytes += writer.write([record.to_dict() for record in records])
+            progress.rows += len(records)
+            progress.pages += 1
+            if on_progress is not None:
+                on_progress(progress)
+    finally:
+        writer.close()
+    return progress
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+    import config
+    from lib.api_client import APIClient
+
+    parser = argparse.ArgumentParser(description="Export logs or traces from the monitoring backend")
+    parser.add_argument("kind", choices=["logs", "traces"])
+    parser.add_argument("--format", choices=FORMATS, default="jsonl")
+    parser.add_argument("--output", "-o", required=True)
+    parser.add_argument("--base-url", default=config.API_BASE_URL)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--max-rows", type=int)
+    parser.add_argument("--no-prefetch", action="store_true")
+    parser.add_argument("--level", default="all")
+    parser.add_argument("--status", default="all")
+    parser.add_argument("--agent-id", default="")
+    parser.add_argument("--search", default="")
+    args = parser.parse_args(argv)
+
+    filters = {}
+    if args.kind == "logs":
+        filters = {"level": args.level, "status": args.status, "agent_id": args.agent_id, "search": args.search}
+    with open(args.output, "wb") as out:
+        progress = export(APIClient(args.base_url), args.kind, args.format, out, args.page_size, args.max_rows,
+                          filters, not args.no_prefetch,
+                          on_progress=lambda p: print(f"\r{p}", end="", file=sys.stderr))
+    print(f"\rExported {progress}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
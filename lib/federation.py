@@ -0,0 +1,438 @@
+import heapq
+import itertools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import pandas as pd
+import config
+from lib.api_client import APIClient
+from lib.json_stream import RecordStream
+from lib import wire_format
+from lib.models import Log, Trace, Agent, MetricPoint, parse_page
+from lib.rate_limit import INTERACTIVE, BACKGROUND
+
+# Metric fields summed across backends per time bucket
+_SUMMED = ("requests", "tokens", "input_tokens", "output_tokens", "total_tokens", "cost")
+# Percentiles cannot be merged exactly without the underlying distributions; the worst
+# backend's value is an upper bound for the fleet. Averages and medians are weighted by
+# request count when every point in the bucket carries one; latency points do not, so
+# there they are a plain mean across backends, and the merged p50 is an approximation.
+_MAXED = ("p95", "p99")
+_AVERAGED = ("avg", "p50")
+
+
+def _merge_sorted(lists: List[List[Any]], key: Callable[[Any], Any]) -> Iterable[Any]:
+    """k-way merge of per-backend lists, newest first; lists that arrive unsorted are sorted first"""
+    ordered = []
+    for items in lists:
+        keys = [key(item) for item in items]
+        if any(a < b for a, b in zip(keys, keys[1:])):
+            items = sorted(items, key=key, reverse=True)
+        ordered.append(items)
+    return heapq.merge(*ordered, key=key, reverse=True)
+
+
+def _tag(records: List[Any], source: str) -> List[Any]:
+    for record in records:
+        record.source = source
+    return records
+
+
+def _close_late(future):
+    """Done callback for a backend call that missed the deadline: release a stream nobody will read"""
+    if not future.cancelled() and future.exception() is None:
+        close = getattr(future.result(), "close", None)
+        if callable(close):
+            close()
+
+
+def _weighted(pairs: List[Tuple[float, float]]) -> float:
+    total_weight = sum(w for v, w in pairs)
+    if total_weight <= 0:
+        return sum(v for v, w in pairs) / len(pairs) if pairs else 0
+    return sum(v * w for v, w in pairs) / total_weight
+
+
+class FederatedAPIClient:
+    """Fans each APIClient call out to several backends and merges the results
+
+    Backends are queried concurrently; any backend that has not answered within
+    `deadline` seconds (or that failed) is left out of that result. Each backend has its
+    own small worker pool and a request timeout of `deadline`, so a hung backend cannot
+    hold the workers the others need. Records are tagged with the base URL they came
+    from in `source`, and list pages report the backends left out under `missing`.
+
+    Paging through a merged list keeps a cursor per backend: a page that ends at global
+    offset N remembers how many of each backend's rows it consumed, so the page starting
+    at N asks every backend for only `limit` rows from there. Without a cursor (a jump to
+    an arbitrary offset), each backend has to supply its first offset + limit rows.
+    """
+
+    def __init__(self, base_urls: List[str], deadline: float = config.FEDERATION_DEADLINE,
+                 workers: int = config.FEDERATION_WORKERS):
+        self.clients = [APIClient(url, use_mock=False, timeout=deadline) for url in base_urls]
+        self.base_url = ",".join(base_urls)
+        self.deadline = deadline
+        self._executors = {client.base_url: ThreadPoolExecutor(max_workers=workers,
+                                                               thread_name_prefix="federation")
+                           for client in self.clients}
+        self._agent_sources: "OrderedDict[str, APIClient]" = OrderedDict()
+        self._cursors: "OrderedDict[tuple, Dict[str, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def warm(self, connections: int = config.HTTP_PREWARM_CONNECTIONS):
+        for client in self.clients:
+            client.warm(connections)
+
+    def close(self):
+        for client in self.clients:
+            client.close()
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def add_listener(self, callback: Callable[[str, Any], None]):
+        """Same contract as APIClient.add_listener, for every backend's responses"""
+        for client in self.clients:
+            client.add_listener(callback)
+
+    def batch(self, *calls: Callable[[Any], Any]) -> List[Any]:
+        """Same contract as APIClient.batch; each call already fans out to every backend concurrently"""
+        return [call(self) for call in calls]
+
+    def _fan_out(self, call: Callable[[APIClient], Any], clients: Optional[List[APIClient]] = None,
+                 strict: bool = False) -> Tuple[List[Tuple[APIClient, Any]], List[str]]:
+        """Run `call` on every backend concurrently
+
+        Returns (client, result) for the backends that answered in time, and the base
+        URLs of those that did not or failed. In `strict` mode a missing backend is an
+        error instead: the results that did arrive are closed and RuntimeError is raised.
+        """
+        clients = clients or self.clients
+        futures = {self._executors[client.base_url].submit(call, client): client for client in clients}
+        done, not_done = wait(futures, timeout=self.deadline)
+        results, missing, error = [], [futures[f].base_url for f in not_done], None
+        for future in not_done:
+            future.add_done_callback(_close_late)
+        for future in done:
+            client = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result, error = None, error or e
+            if result is None:
+                missing.append(client.base_url)
+            else:
+                results.append((client, result))
+        if strict and missing:
+            for client, result in results:
+                close = getattr(result, "close", None)
+                if callable(close):
+                    close()
+            raise RuntimeError(f"Backends failed or timed out: {', '.join(missing)}") from error
+        # Keep backend order stable regardless of completion order
+        results.sort(key=lambda pair: clients.index(pair[0]))
+        return results, missing
+
+    def _cursor(self, query: tuple, offset: int) -> Tuple[Dict[str, int], int]:
+        """Per-backend start offsets for global `offset`, and how many merged rows to skip first"""
+        with self._lock:
+            starts = self._cursors.get((query, offset))
+        if starts is not None:
+            return dict(starts), 0
+        return {client.base_url: 0 for client in self.clients}, offset
+
+    def _remember_cursor(self, query: tuple, offset: int, starts: Dict[str, int]):
+        with self._lock:
+            self._cursors[(query, offset)] = starts
+            self._cursors.move_to_end((query, offset))
+            while len(self._cursors) > config.FEDERATION_CURSORS:
+                self._cursors.popitem(last=False)
+
+    def _remember_agent(self, agent_id: str, client: APIClient):
+        with self._lock:
+            self._agent_sources[agent_id] = client
+            self._agent_sources.move_to_end(agent_id)
+            while len(self._agent_sources) > config.FEDERATION_AGENT_SOURCES:
+                self._agent_sources.popitem(last=False)
+
+    def _merge_page(self, results: List[Tuple[APIClient, Dict[str, Any]]], key: str, sort_key: Callable,
+                    limit: int, offset: int, query: tuple, starts: Dict[str, int], skip: int,
+                    missing: List[str]) -> Dict[str, Any]:
+        lists = [_tag(page.get(key, []), client.base_url) for client, page in results]
+        merged = list(itertools.islice(_merge_sorted(lists, sort_key), skip + limit))
+        if not missing:
+            for record in merged:
+                starts[record.source] += 1
+            self._remember_cursor(query, offset + len(merged) - skip, starts)
+        merged = merged[skip:]
+        total = sum(page.get("total", len(page.get(key, []))) for client, page in results)
+        return {key: merged, "total": total, "hasMore": offset + len(merged) < total, "missing": missing}
+
+    def _merge_series(self, results: List[Tuple[APIClient, Dict[str, Any]]]) -> List[MetricPoint]:
+        buckets: Dict[str, List[MetricPoint]] = {}
+        for client, page in results:
+            for point in page.get("data", []):
+                buckets.setdefault(point.time, []).append(point)
+        merged = []
+        for time, points in sorted(buckets.items()):
+            values = {"time": time}
+            counted = all(p.requests is not None for p in points)
+            weights = [p.requests if counted else 1 for p in points]
+            for field in _SUMMED:
+                present = [getattr(p, field) for p in points if getattr(p, field) is not None]
+                values[field] = sum(present) if present else None
+            for field in _MAXED:
+                present = [getattr(p, field) for p in points if getattr(p, field) is not None]
+                values[field] = max(present) if present else None
+            for field in _AVERAGED:
+                present = [(getattr(p, field), w) for p, w in zip(points, weights) if getattr(p, field) is not None]
+                values[field] = _weighted(present) if present else None
+            merged.append(MetricPoint(**values))
+        return merged
+
+    @staticmethod
+    def _sum_dicts(dicts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        merged: Dict[str, Any] = {}
+        for d in dicts:
+            for k, v in (d or {}).items():
+                if isinstance(v, (int, float)) and not isinstance(v, bool):
+                    merged[k] = merged.get(k, 0) + v
+        return merged
+
+    def get_overview_stats(self) -> Dict[str, Any]:
+        """Get overall system statistics"""
+        results = [stats for client, stats in self._fan_out(lambda c: c.get_overview_stats())[0]]
+        if not results:
+            return APIClient._mock_overview_stats()
+        merged = self._sum_dicts(results)
+        weights = [(s.get("totalRequests", 0) or 0) for s in results]
+        for field in ("successRate", "avgLatency"):
+            merged[field] = _weighted([(s.get(field, 0) or 0, w) for s, w in zip(results, weights)])
+        return merged
+
+    def get_overview_activity(self, period: str = "24h") -> Dict[str, Any]:
+        """Get activity data for charts"""
+        results, _ = self._fan_out(lambda c: c.get_overview_activity(period))
+        if not results:
+            return parse_page(APIClient._mock_activity_data(period), "data", MetricPoint)
+        return {"data": self._merge_series(results)}
+
+    def get_agents(self, status: str = "all", search: str = "", priority: int = BACKGROUND) -> Dict[str, Any]:
+        """Get list of all agents"""
+        results, _ = self._fan_out(lambda c: c.get_agents(status, search, priority))
+        if not results:
+            return parse_page(APIClient._mock_agents(status, search), "agents", Agent)
+        agents = []
+        for client, page in results:
+            for agent in _tag(page.get("agents", []), client.base_url):
+                self._remember_agent(agent.id, client)
+                agents.append(agent)
+        return {
+            "agents": agents,
+            "total": sum(page.get("total", len(page.get("agents", []))) for client, page in results),
+            "active": sum(page.get("active", 0) for client, page in results),
+        }
+
+    def _first_found(self, call: Callable[[APIClient], Dict[str, Any]],
+                     clients: Optional[List[APIClient]] = None) -> Optional[Dict[str, Any]]:
+        for client, result in self._fan_out(call, clients)[0]:
+            if result:
+                return dict(result, source=client.base_url)
+        return None
+
+    def get_agent_detail(self, agent_id: str, priority: int = INTERACTIVE,
+                         mock_fallback: bool = True) -> Optional[Dict[str, Any]]:
+        """Get detailed agent information from the backend that owns the agent"""
+        with self._lock:
+            owner = self._agent_sources.get(agent_id)
+        detail = self._first_found(lambda c: c.get_agent_detail(agent_id, priority), [owner] if owner else None)
+        if detail is None and mock_fallback:
+            return APIClient._mock_agent_detail(agent_id)
+        return detail
+
+    def get_logs(self, limit: int = 50, offset: int = 0, level: str = "all",
+                 status: str = "all", agent_id: str = "", search: str = "",
+                 priority: int = BACKGROUND, trace_id: str = "",
+                 mock_fallback: bool = True) -> Optional[Dict[str, Any]]:
+        """Get a globally paginated, timestamp-merged page of logs"""
+        query = ("logs", level, status, agent_id, search, trace_id)
+        starts, skip = self._cursor(query, offset)
+        results, missing = self._fan_out(lambda c: c.get_logs(skip + limit, starts[c.base_url], level, status,
+                                                              agent_id, search, priority, trace_id))
+        if not results:
+            if not mock_fallback:
+                return None
+            return parse_page(APIClient._mock_logs(limit, offset, level, status, agent_id, search, trace_id),
+                              "logs", Log)
+        return self._merge_page(results, "logs", lambda log: log.timestamp, limit, offset, query, starts, skip,
+                                missing)
+
+    def stream_logs(self, limit: int = 50, offset: int = 0, level: str = "all",
+                    status: str = "all", agent_id: str = "", search: str = "",
+                    priority: int = BACKGROUND, chunk_size: int = 65536, strict: bool = False) -> RecordStream:
+        """Lazily k-way merge log streams from every backend (strict: fail if any backend is missing)"""
+        query = ("logs", level, status, agent_id, search, "")
+        starts, skip = self._cursor(query, offset)
+        results, missing = self._fan_out(lambda c: c.stream_logs(skip + limit, starts[c.base_url], level, status,
+                                                                 agent_id, search, priority, chunk_size, strict),
+                                         strict=strict)
+        return self._merge_streams(results, lambda log: log.timestamp, limit, offset, query, starts, skip,
+                                   missing)
+
+    def get_logs_frame(self, limit: int = 50, offset: int = 0, level: str = "all",
+                       status: str = "all", agent_id: str = "", search: str = "") -> pd.DataFrame:
+        """Get a globally paginated page of logs as a DataFrame with a `source` column"""
+        results, _ = self._fan_out(lambda c: c.get_logs_frame(offset + limit, 0, level, status, agent_id, search))
+        if not results:
+            return wire_format.records_frame(
+                APIClient._mock_logs(limit, offset, level, status, agent_id, search), "logs")
+        frames = [frame.assign(source=client.base_url) for client, frame in results]
+        merged = pd.concat(frames, ignore_index=True)
+        if "timestamp" in merged:
+            merged = merged.sort_values("timestamp", ascending=False, kind="stable")
+        merged = merged.iloc[offset:offset + limit].reset_index(drop=True)
+        total = sum(frame.attrs.get("total", len(frame)) for client, frame in results)
+        merged.attrs = {"total": total, "hasMore": offset + len(merged) < total}
+        return merged
+
+    def get_log_detail(self, log_id: str, priority: int = INTERACTIVE) -> Dict[str, Any]:
+        """Get detailed log entry from whichever backend has it"""
+        detail = self._first_found(lambda c: c.get_log_detail(log_id, priority))
+        return detail or APIClient._mock_log_detail(log_id)
+
+    def get_traces(self, limit: int = 20, offset: int = 0, priority: int = BACKGROUND) -> Dict[str, Any]:
+        """Get a globally paginated, start-time-merged page of traces"""
+        query = ("traces",)
+        starts, skip = self._cursor(query, offset)
+        results, missing = self._fan_out(lambda c: c.get_traces(skip + limit, starts[c.base_url], priority))
+        if not results:
+            return parse_page(APIClient._mock_traces(limit, offset), "traces", Trace)
+        return self._merge_page(results, "traces", lambda trace: trace.start_time, limit, offset, query, starts,
+                                skip, missing)
+
+    def stream_traces(self, limit: int = 20, offset: int = 0, priority: int = BACKGROUND,
+                      chunk_size: int = 65536, strict: bool = False) -> RecordStream:
+        """Lazily k-way merge trace streams from every backend (strict: fail if any backend is missing)"""
+        query = ("traces",)
+        starts, skip = self._cursor(query, offset)
+        results, missing = self._fan_out(lambda c: c.stream_traces(skip + limit, starts[c.base_url], priority,
+                                                                   chunk_size, strict), strict=strict)
+        return self._merge_streams(results, lambda trace: trace.start_time, limit, offset, query, starts, skip,
+                                   missing)
+
+    def _merge_streams(self, results: List[Tuple[APIClient, RecordStream]], sort_key: Callable, limit: int,
+                       offset: int, query: tuple, starts: Dict[str, int], skip: int,
+                       missing: List[str]) -> RecordStream:
+        streams = [stream for client, stream in results]
+
+        def tagged(client: APIClient, stream: RecordStream):
+            for record in stream:
+                record.source = client.base_url
+                yield record
+
+        # Backends stream newest first, so heapq.merge holds one record per backend at a time
+        merged = heapq.merge(*(tagged(c, s) for c, s in results), key=sort_key, reverse=True)
+
+        def records():
+            emitted = 0
+            for record in itertools.islice(merged, skip + limit):
+                starts[record.source] += 1
+                if emitted >= skip:
+                    yield record
+                emitted += 1
+            # Read to the end, so the next page can start from each backend's position
+            if not missing:
+                self._remember_cursor(query, offset + emitted - skip, starts)
+
+        def close():
+            for stream in streams:
+                stream.close()
+
+        return RecordStream(records(), None, _StreamTotals(streams, offset, limit, missing), close)
+
+    def get_trace_detail(self, trace_id: str, priority: int = INTERACTIVE) -> Dict[str, Any]:
+        """Get detailed trace from whichever backend has it"""
+        detail = self._first_found(lambda c: c.get_trace_detail(trace_id, priority))
+        return detail or APIClient._mock_trace_detail(trace_id)
+
+    def _get_series(self, name: str, period: str, fallback: Callable[[str], Dict[str, Any]],
+                    summary_key: Optional[str] = None) -> Dict[str, Any]:
+        results, _ = self._fan_out(lambda c: getattr(c, name)(period))
+        if not results:
+            return parse_page(fallback(period), "data", MetricPoint)
+        merged = {"data": self._merge_series(results)}
+        if summary_key == "totals":
+            merged["totals"] = self._sum_dicts([page.get("totals") for client, page in results])
+        elif summary_key == "summary":
+            summaries = [page.get("summary") or {} for client, page in results]
+            merged["summary"] = {
+                "avg": _weighted([(s.get("avg", 0), 1) for s in summaries]),
+                **{k: max((s.get(k, 0) for s in summaries), default=0) for k in ("p95", "p99", "max")},
+            }
+        return merged
+
+    def get_metrics_tokens(self, period: str = "24h") -> Dict[str, Any]:
+        """Get token usage metrics summed across backends"""
+        return self._get_series("get_metrics_tokens", period, APIClient._mock_metrics_tokens, "totals")
+
+    def get_metrics_costs(self, period: str = "24h") -> Dict[str, Any]:
+        """Get cost metrics summed across backends"""
+        return self._get_series("get_metrics_costs", period, APIClient._mock_metrics_costs, "totals")
+
+    def get_metrics_latency(self, period: str = "24h") -> Dict[str, Any]:
+        """Get latency metrics merged across backends"""
+        return self._get_series("get_metrics_latency", period, APIClient._mock_metrics_latency, "summary")
+
+    def get_metrics_frame(self, kind: str, period: str = "24h") -> pd.DataFrame:
+        """Get a merged metric series as a DataFrame"""
+        name = {"tokens": "get_metrics_tokens", "costs": "get_metrics_costs", "latency": "get_metrics_latency"}[kind]
+        series = getattr(self, name)(period)
+        frame = pd.DataFrame.from_records([point.to_dict() for point in series["data"]])
+        frame.attrs = {k: v for k, v in series.items() if k != "data"}
+        return frame
+
+    def get_orchestrator_status(self) -> Dict[str, Any]:
+        """Get orchestrator status across backends"""
+        results = [status for client, status in self._fan_out(lambda c: c.get_orchestrator_status())[0]]
+        if not results:
+            return APIClient._mock_orchestrator_status()
+        merged = self._sum_dicts(results)
+        merged["uptime"] = min(s.get("uptime", 0) for s in results)
+        merged["status"] = "active" if any(s.get("status") == "active" for s in results) else results[0].get("status")
+        merged["connectedAgents"] = [a for s in results for a in s.get("connectedAgents", [])]
+        return merged
+
+    def get_health(self) -> Dict[str, Any]:
+        """Get system health; degraded when only some backends are healthy"""
+        results, missing = self._fan_out(lambda c: c.get_health())
+        backends = {url: "unreachable" for url in missing}
+        backends.update({client.base_url: health.get("status", "unknown") for client, health in results})
+        healthy = sum(1 for status in backends.values() if status == "healthy")
+        status = "healthy" if healthy == len(self.clients) else "degraded" if healthy else "unhealthy"
+        versions = sorted({health.get("version", "unknown") for client, health in results}) or ["unknown"]
+        return {"status": status, "version": ", ".join(versions), "backends": backends}
+
+
+class _StreamTotals(dict):
+    """Metadata view that sums total/hasMore over the merged streams once they are known"""
+
+    def __init__(self, streams: List[RecordStream], offset: int, limit: int, missing: List[str]):
+        super().__init__()
+        self._streams = streams
+        self._offset = offset
+        self._limit = limit
+        self._missing = missing
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == "missing":
+            return self._missing
+        totals = [stream.total for stream in self._streams]
+        if any(t is None for t in totals):
+            return default
+        total = sum(totals)
+        if key == "total":
+            return total
+        if key == "hasMore":
+            return self._offset + self._limit < total
+        return default
@@ -0,0 +1,73 @@
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+import threading
+
+
+class CacheEntry:
+    """A parsed response with its validators; `nbytes` is its body size on the wire (encoded)"""
+
+    __slots__ = ("data", "etag", "last_modified", "nbytes", "parse_seconds")
+
+    def __init__(self, data: Any, etag: Optional[str] = None, last_modified: Optional[str] = None,
+                 nbytes: int = 0, parse_seconds: float = 0.0):
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.nbytes = nbytes
+        self.parse_seconds = parse_seconds
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """LRU of parsed responses keyed by path + params, with revalidation counters"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.not_modified = 0
+        self.saved_bytes = 0
+        self.saved_parse_seconds = 0.0
+
+    def get(self, key: tuple) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple, entry: CacheEntry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def values(self) -> List[Any]:
+        """Snapshot of the cached (parsed) responses"""
+        with self._lock:
+            return [entry.data for entry in self._entries.values()]
+
+    def record_not_modified(self, entry: CacheEntry):
+        """Count the body download and parse a 304 saved"""
+        with self._lock:
+            self.not_modified += 1
+            self.saved_bytes += entry.nbytes
+            self.saved_parse_seconds += entry.parse_seconds
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "notModified": self.not_modified,
+                "savedBytes": self.saved_bytes,
+                "savedParseMs": round(self.saved_parse_seconds * 1000, 3),
+            }
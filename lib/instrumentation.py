@@ -0,0 +1,170 @@
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is +Inf
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Counters kept per backend + endpoint, with their Prometheus help text
+COUNTERS = {
+    "requests": "HTTP requests sent",
+    "errors": "Requests that raised or returned an error status",
+    "bytes": "Response body bytes received",
+    "cache_hits": "Responses revalidated with 304 Not Modified",
+    "cache_misses": "Responses downloaded and decoded",
+    "degraded": "Calls served from cache because the rate limiter or breaker refused them",
+    "rate_limited": "Calls refused by the rate limiter",
+    "breaker_rejected": "Calls refused by an open circuit breaker",
+    "retries": "Transport-level retries",
+    "fallbacks": "Calls answered with mock data",
+}
+
+
+class EndpointMetrics:
+    __slots__ = ("counts", "latency_buckets", "latency_sum", "decode_sum")
+
+    def __init__(self):
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.latency_sum = 0.0
+        self.decode_sum = 0.0
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a latency quantile (ms) by interpolating inside the histogram bucket"""
+        total = sum(self.latency_buckets)
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(self.latency_buckets):
+            if seen + count >= rank and count:
+                lower = LATENCY_BUCKETS_MS[i - 1] if i else 0
+                upper = LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else LATENCY_BUCKETS_MS[-1] * 2
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return float(LATENCY_BUCKETS_MS[-1])
+
+
+class Instrumentation:
+    """Process-wide per-endpoint client metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[Tuple[str, str], EndpointMetrics] = {}
+        self._breakers: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._exporter = None
+
+    def _get(self, backend: str, endpoint: str) -> EndpointMetrics:
+        key = (backend, endpoint)
+        metrics = self._metrics.get(key)
+        if metrics is None:
+            metrics = self._metrics[key] = EndpointMetrics()
+        return metrics
+
+    def record_request(self, backend: str, endpoint: str, seconds: float, nbytes: int = 0,
+                       decode_seconds: float = 0.0, error: bool = False, retries: int = 0):
+        with self._lock:
+            metrics = self._get(backend, endpoint)
+            metrics.counts["requests"] += 1
+            metrics.counts["bytes"] += nbytes
+            metrics.counts["retries"] += retries
+            if error:
+                metrics.counts["errors"] += 1
+            metrics.latency_buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+            metrics.latency_sum += seconds
+            metrics.decode_sum += decode_seconds
+
+    def count(self, backend: str, endpoint: str, counter: str, n: int = 1):
+        with self._lock:
+            self._get(backend, endpoint).counts[counter] += n
+
+    def set_breaker(self, backend: str, state: str):
+        with self._lock:
+            self._breakers[backend] = state
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """One row per backend + endpoint, suitable for a table"""
+        with self._lock:
+            rows = []
+            for (backend, endpoint), metrics in sorted(self._metrics.items()):
+                requests = metrics.counts["requests"]
+                rows.append({
+                    "backend": backend,
+                    "endpoint": endpoint,
+                    **metrics.counts,
+                    "avgMs": round(metrics.latency_sum * 1000 / requests, 1) if requests else None,
+                    "p50Ms": metrics.quantile(0.5),
+                    "p95Ms": metrics.quantile(0.95),
+                    "decodeMs": round(metrics.decode_sum * 1000, 1),
+                    "breaker": self._breakers.get(backend, "closed"),
+                })
+            return rows
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            items = sorted(self._metrics.items())
+            lines = []
+            for counter, help_text in COUNTERS.items():
+                name = f"dashboard_client_{counter}_total"
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                for (backend, endpoint), metrics in items:
+                    lines.append(f'{name}{{backend="{backend}",endpoint="{endpoint}"}} {metrics.counts[counter]}')
+            name = "dashboard_client_request_duration_seconds"
+            lines += [f"# HELP {name} Request latency", f"# TYPE {name} histogram"]
+            for (backend, endpoint), metrics in items:
+                labels = f'backend="{backend}",endpoint="{endpoint}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS_MS + (None,), metrics.latency_buckets):
+                    cumulative += count
+                    le = "+Inf" if bound is None else f"{bound / 1000:g}"
+                    lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{labels}}} {metrics.latency_sum:.6f}")
+                lines.append(f"{name}_count{{{labels}}} {cumulative}")
+            name = "dashboard_client_decode_seconds_total"
+            lines += [f"# HELP {name} Time spent decoding response bodies", f"# TYPE {name} counter"]
+            for (backend, endpoint), metrics in items:
+                lines.append(f'{name}{{backend="{backend}",endpoint="{endpoint}"}} {metrics.decode_sum:.6f}')
+            name = "dashboard_client_breaker_open"
+            lines += [f"# HELP {name} 1 when the backend circuit breaker is open", f"# TYPE {name} gauge"]
+            for backend, state in sorted(self._breakers.items()):
+                lines.append(f'{name}{{backend="{backend}"}} {int(state == "open")}')
+            return "\n".join(lines) + "\n"
+
+    def start_exporter(self, port: int, host: str = "127.0.0.1") -> Optional[ThreadingHTTPServer]:
+        """Serve /metrics on `host` from a daemon thread; idempotent, port 0 disables the exporter"""
+        if not port:
+            return None
+        with self._lock:
+            if self._exporter is not None:
+                return self._exporter
+            instrumentation = self
+
+            class MetricsHandler(BaseHTTPRequestHandler):
+                def log_message(self, format, *args):
+                    pass
+
+                def do_GET(self):
+                    if self.path.split("?")[0] != "/metrics":
+                        self.send_error(404)
+                        return
+                    body = instrumentation.to_prometheus().encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+            try:
+                server = ThreadingHTTPServer((host, port), MetricsHandler)
+            except OSError:
+                # Another process (or a previous Streamlit worker) already owns the port
+                return None
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, daemon=True, name="metrics-exporter").start()
+            self._exporter = server
+            return server
+
+
+instrumentation = Instrumentation()
@@ -0,0 +1,122 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+
+class IntervalIndex:
+    """Static index over half-open intervals [start, end), e.g. trace start + duration
+
+    Point and range counts are two binary searches over the sorted endpoints. Listing
+    the intervals that overlap a range scans only the starts within one maximum
+    interval length of it, so it stays output-sensitive while lengths are bounded.
+    """
+
+    def __init__(self, starts: Any, ends: Any, items: Optional[Sequence[Any]] = None):
+        self.items = items
+        starts = np.asarray(starts, dtype=np.float64)
+        ends = np.maximum(np.asarray(ends, dtype=np.float64), starts)
+        self.order = np.argsort(starts, kind="stable")
+        self.starts = starts[self.order]
+        self.ends_by_start = ends[self.order]
+        self.ends = np.sort(ends)
+        self.max_length = float((ends - starts).max()) if len(starts) else 0.0
+        self._events = None
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def count_overlapping(self, a: float, b: float) -> int:
+        """Number of intervals overlapping the closed range [a, b] (a point when a == b)"""
+        # Every interval that ends by `a` also starts by `b`, so the difference counts the overlaps
+        return int(np.searchsorted(self.starts, b, side="right") - np.searchsorted(self.ends, a, side="right"))
+
+    def active_at(self, t: float) -> int:
+        """Number of intervals in flight at time t"""
+        return self.count_overlapping(t, t)
+
+    def overlapping(self, a: float, b: float) -> np.ndarray:
+        """Positions (in the caller's original order) of intervals overlapping [a, b]"""
+        lo = np.searchsorted(self.starts, a - self.max_length, side="left")
+        hi = np.searchsorted(self.starts, b, side="right")
+        hits = np.flatnonzero(self.ends_by_start[lo:hi] > a) + lo
+        return self.order[hits]
+
+    def items_overlapping(self, a: float, b: float) -> List[Any]:
+        """The indexed items (as passed in `items`) overlapping [a, b], in start order"""
+        return [self.items[i] for i in self.overlapping(a, b).tolist()]
+
+    def _sweep(self):
+        """Event times with the concurrency right after each; ends sort before starts at equal times"""
+        if self._events is None:
+            times = np.concatenate([self.ends, self.starts])
+            deltas = np.concatenate([np.full(len(self.ends), -1, np.int64), np.ones(len(self.starts), np.int64)])
+            order = np.lexsort((deltas, times))
+            self._events = (times[order], np.cumsum(deltas[order]))
+        return self._events
+
+    def timeline(self, start: float, end: float, buckets: int = 500) -> Dict[str, np.ndarray]:
+        """Peak concurrency per bucket over [start, end), plus the exact time of each peak
+
+        Each bucket reports the highest level reached inside it (not a sample), so short
+        spikes survive downsampling.
+        """
+        times, levels = self._sweep()
+        edges = np.linspace(start, end, buckets + 1)
+        first = np.searchsorted(times, edges, side="right")
+        # Level carried into each bucket from the last event before its left edge
+        carried = np.where(first[:-1] > 0, levels[np.maximum(first[:-1] - 1, 0)], 0)
+        peak, peak_time = carried.astype(np.int64), edges[:-1].copy()
+        occupied = np.flatnonzero(first[1:] > first[:-1])
+        if len(occupied) and len(levels):
+            inside = np.maximum.reduceat(levels, first[:-1][occupied])
+            better = inside > peak[occupied]
+            peak[occupied[better]] = inside[better]
+            for b in occupied[better]:
+                peak_time[b] = times[first[b] + int(np.argmax(levels[first[b]:first[b + 1]]))]
+        return {"time": edges[:-1], "concurrency": peak, "peakTime": peak_time}
+
+    def peaks(self, timeline: Dict[str, np.ndarray], k: int = 5, separation: int = 10) -> List[Dict[str, float]]:
+        """The k highest bucket peaks at least `separation` buckets apart, highest first"""
+        concurrency = timeline["concurrency"]
+        chosen: List[int] = []
+        for b in np.argsort(-concurrency, kind="stable"):
+            if concurrency[b] <= 0 or len(chosen) == k:
+                break
+            if all(abs(int(b) - c) >= separation for c in chosen):
+                chosen.append(int(b))
+        return [{"time": float(timeline["peakTime"][b]), "concurrency": int(concurrency[b])} for b in chosen]
+
+
+# Cached responses are returned as the same list object until the backend changes them,
+# so indexes are memoized by list identity (holding the list keeps its id from being reused)
+_indexes: "OrderedDict[int, tuple]" = OrderedDict()
+_indexes_lock = threading.Lock()
+INDEX_CACHE_SIZE = 4
+
+
+def trace_index(traces: List[Any]) -> Optional[IntervalIndex]:
+    """Index Trace records by startTime and duration (ms), skipping unparseable start times"""
+    with _indexes_lock:
+        cached = _indexes.get(id(traces))
+        if cached is not None and cached[0] is traces:
+            _indexes.move_to_end(id(traces))
+            return cached[1]
+    index = _build_trace_index(traces)
+    with _indexes_lock:
+        _indexes[id(traces)] = (traces, index)
+        while len(_indexes) > INDEX_CACHE_SIZE:
+            _indexes.popitem(last=False)
+    return index
+
+
+def _build_trace_index(traces: List[Any]) -> Optional[IntervalIndex]:
+    starts = pd.to_datetime(pd.Series([t.start_time for t in traces], dtype=object), utc=True,
+                            errors="coerce", format="ISO8601")
+    seconds = (starts - pd.Timestamp(0, tz="UTC")).dt.total_seconds().to_numpy()
+    valid = np.flatnonzero(~np.isnan(seconds))
+    if not len(valid):
+        return None
+    durations = np.fromiter((traces[i].duration or 0 for i in valid.tolist()), dtype=np.float64, count=len(valid))
+    return IntervalIndex(seconds[valid], seconds[valid] + durations / 1000, [traces[i] for i in valid.tolist()])
@@ -0,0 +1,165 @@
+import codecs
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+WHITESPACE = " \t\n\r"
+
+
+class ObjectStream:
+    """Incrementally parse a top-level JSON object, yielding the items of one array member
+
+    Only the current item and the unread tail of the buffer are held in memory. Other
+    top-level members (e.g. `total`, `hasMore`) are collected into `metadata` as soon as
+    they have been parsed, whether they come before or after the array.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], array_key: str, on_close: Optional[Callable[[], None]] = None):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._on_close = on_close
+        self.array_key = array_key
+        self.metadata: Dict[str, Any] = {}
+        self.count = 0
+
+    def _fill(self, min_chars: int = 1) -> bool:
+        """Append at least `min_chars` of input to the unread tail; False once input is exhausted"""
+        if self._eof:
+            return False
+        parts = []
+        received = 0
+        while received < min_chars:
+            try:
+                chunk = next(self._chunks)
+            except StopIteration:
+                self._eof = True
+                parts.append(self._decoder.decode(b"", final=True))
+                break
+            text = self._decoder.decode(chunk)
+            parts.append(text)
+            received += len(text)
+        # Dropping the consumed prefix here keeps the buffer proportional to one item
+        self._buf = self._buf[self._pos:] + "".join(parts)
+        self._pos = 0
+        return received > 0 or not self._eof
+
+    def _peek(self) -> str:
+        """Next non-whitespace character, reading more input as needed"""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON stream")
+
+    def _expect(self, chars: str) -> str:
+        char = self._peek()
+        if char not in chars:
+            raise ValueError(f"Expected one of {chars!r} at offset {self._pos}, got {char!r}")
+        self._pos += 1
+        return char
+
+    def _value(self) -> Any:
+        """Decode one complete JSON value starting at the current position"""
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                # Grow geometrically so a large value is re-scanned O(log n) times, not once per chunk
+                if not self._fill(max(len(self._buf) - self._pos, 4096)):
+                    raise
+                continue
+            # A number or literal that touches the end of the buffer may be cut short
+            if end == len(self._buf) and not self._eof and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def __iter__(self) -> Iterator[Any]:
+        try:
+            self._expect("{")
+            if self._peek() == "}":
+                return
+            while True:
+                key = self._value()
+                self._expect(":")
+                if key == self.array_key and self._peek() == "[":
+                    self._pos += 1
+                    if self._peek() != "]":
+                        while True:
+                            item = self._value()
+                            self.count += 1
+                            yield item
+                            if self._expect(",]") == "]":
+                                break
+                    else:
+                        self._pos += 1
+                else:
+                    self.metadata[key] = self._value()
+                if self._expect(",}") == "}":
+                    return
+        finally:
+            self.close()
+
+    def close(self):
+        if self._on_close is not None:
+            self._on_close()
+            self._on_close = None
+
+
+class RecordStream:
+    """Iterator of typed records with the page metadata (`total`, `hasMore`) exposed once parsed
+
+    Items are converted with `record_cls.from_dict`; pass `record_cls=None` when they are
+    already records (e.g. a merge of other streams).
+    """
+
+    def __init__(self, items: Iterable[Dict[str, Any]], record_cls, metadata: Optional[Dict[str, Any]] = None,
+                 close: Optional[Callable[[], None]] = None):
+        self._items = items
+        self._record_cls = record_cls
+        self._close = close
+        self.metadata = {} if metadata is None else metadata
+
+    @classmethod
+    def from_json(cls, chunks: Iterable[bytes], array_key: str, record_cls,
+                  close: Optional[Callable[[], None]] = None) -> "RecordStream":
+        stream = ObjectStream(chunks, array_key, on_close=close)
+        return cls(stream, record_cls, stream.metadata, stream.close)
+
+    @classmethod
+    def from_page(cls, page: Dict[str, Any], array_key: str, record_cls) -> "RecordStream":
+        """Wrap an already decoded page (e.g. mock data) in the same interface"""
+        metadata = {k: v for k, v in page.items() if k != array_key}
+        return cls(page.get(array_key) or [], record_cls, metadata)
+
+    @property
+    def total(self) -> Optional[int]:
+        return self.metadata.get("total")
+
+    @property
+    def has_more(self) -> Optional[bool]:
+        return self.metadata.get("hasMore")
+
+    def __iter__(self):
+        try:
+            if self._record_cls is None:
+                yield from self._items
+                return
+            for item in self._items:
+                try:
+                    yield self._record_cls.from_dict(item)
+                except (ValueError, AttributeError):
+                    continue
+        finally:
+            self.close()
+
+    def close(self):
+        if self._close is not None:
+            self._close()
+            self._close = None
@@ -0,0 +1,114 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+from lib.aggregates import shared
+from lib.rate_limit import INTERACTIVE
+import config
+
+
+class LogJoinIndex:
+    """Secondary indexes traceId -> logs and agentId -> logs over a sliding window of recent logs
+
+    Logs are kept in arrival order up to `window`; the oldest leave the window (and both
+    indexes) as new ones arrive. Each index maps a key to an insertion-ordered dict of
+    log ids, so adding and evicting a log are O(1) and a lookup costs only its result.
+    """
+
+    def __init__(self, window: int = config.LOG_INDEX_WINDOW):
+        self.window = window
+        self._logs: "OrderedDict[str, Any]" = OrderedDict()
+        self._by_trace: Dict[str, Dict[str, None]] = {}
+        self._by_agent: Dict[str, Dict[str, None]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._logs)
+
+    def ingest(self, logs: Iterable[Any]) -> int:
+        """Index Log records not already in the window; returns how many were new"""
+        added = 0
+        with self._lock:
+            for log in logs:
+                if not log.id or log.id in self._logs:
+                    continue
+                self._logs[log.id] = log
+                _link(self._by_trace, log.trace_id, log.id)
+                _link(self._by_agent, log.agent_id, log.id)
+                added += 1
+            while len(self._logs) > self.window:
+                _, old = self._logs.popitem(last=False)
+                _unlink(self._by_trace, old.trace_id, old.id)
+                _unlink(self._by_agent, old.agent_id, old.id)
+        return added
+
+    def for_trace(self, trace_id: str) -> List[Any]:
+        """Indexed logs of a trace, newest first"""
+        return self._lookup(self._by_trace, trace_id)
+
+    def for_agent(self, agent_id: str) -> List[Any]:
+        """Indexed logs of an agent, newest first"""
+        return self._lookup(self._by_agent, agent_id)
+
+    def _lookup(self, index: Dict[str, Dict[str, None]], key: str) -> List[Any]:
+        with self._lock:
+            logs = [self._logs[log_id] for log_id in index.get(key, ())]
+        return sorted(logs, key=lambda log: log.timestamp or "", reverse=True)
+
+    def siblings(self, log: Any) -> List[Any]:
+        """Other indexed logs of the same trace as `log`, newest first"""
+        if not log.trace_id:
+            return []
+        return [other for other in self.for_trace(log.trace_id) if other.id != log.id]
+
+    def trace_logs(self, client, trace: Any, limit: int = config.LOG_INDEX_TRACE_LIMIT) -> Dict[str, Any]:
+        """A trace's logs from the window when all of them are there, else from the backend
+
+        A trace is complete in the window once it holds `totalSpans` of its logs. Returns
+        {"logs": [...], "source": "index" | "server"}; the server's answer is indexed too.
+        """
+        logs = self.for_trace(trace.id)
+        if logs and len(logs) >= trace.total_spans:
+            return {"logs": logs, "source": "index"}
+        page = client.get_logs(limit=min(max(trace.total_spans, 1), limit), trace_id=trace.id,
+                               priority=INTERACTIVE)
+        self.ingest(page.get("logs", []))
+        return {"logs": page.get("logs", []), "source": "server"}
+
+    def on_response(self, endpoint: str, data: Any):
+        """APIClient listener: index every logs page any page fetches"""
+        if endpoint == "/api/v1/logs" and isinstance(data, dict):
+            self.ingest(data.get("logs") or [])
+
+
+def _link(index: Dict[str, Dict[str, None]], key: Optional[str], log_id: str):
+    if key:
+        index.setdefault(key, {})[log_id] = None
+
+
+def _unlink(index: Dict[str, Dict[str, None]], key: Optional[str], log_id: str):
+    ids = index.get(key) if key else None
+    if ids is not None:
+        ids.pop(log_id, None)
+        if not ids:
+            del index[key]
+
+
+def breakdown(logs: List[Any]) -> List[Dict[str, Any]]:
+    """Tokens, cost and calls per (agent, model) over a set of logs, costliest first"""
+    rows: Dict[tuple, Dict[str, Any]] = {}
+    for log in logs:
+        key = (log.agent_name or log.agent_id or "N/A", log.model or "N/A")
+        row = rows.get(key)
+        if row is None:
+            row = rows[key] = {"agent": key[0], "model": key[1], "calls": 0, "inputTokens": 0,
+                               "outputTokens": 0, "cost": 0.0}
+        row["calls"] += 1
+        row["inputTokens"] += log.input_tokens
+        row["outputTokens"] += log.output_tokens
+        row["cost"] += log.cost
+    return sorted(rows.values(), key=lambda row: -row["cost"])
+
+
+def index_for(client) -> LogJoinIndex:
+    """The process-wide index for a backend, subscribed to its clients' responses"""
+    return shared(client, LogJoinIndex)
@@ -0,0 +1,156 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+from lib.aggregates import shared
+import config
+
+WILDCARD = "<*>"
+# Tokens holding a digit (counts, durations, ids, hex) are parameters, never part of a template
+_VARIABLE = re.compile(r"\d")
+
+
+class Template:
+    __slots__ = ("id", "tokens", "count", "first_seen", "last_seen", "sample_ids", "levels")
+
+    def __init__(self, id: int, tokens: List[str]):
+        self.id = id
+        self.tokens = tokens
+        self.count = 0
+        self.first_seen = ""
+        self.last_seen = ""
+        self.sample_ids: List[str] = []
+        self.levels: Dict[str, int] = {}
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.tokens)
+
+
+class TemplateMiner:
+    """Online log template clustering with a fixed-depth parse tree (Drain)
+
+    A message is routed by its token count, then by its first `depth - 2` tokens
+    (parameters share one wildcard branch, as does any token past `max_children` per
+    node), to a short list of templates. It joins the most similar one when at least
+    `similarity` of the positions agree, turning the differing positions into
+    wildcards; otherwise it starts a new template. Routing and matching are O(depth +
+    templates in the leaf), so the cost per record does not grow with the stream.
+    """
+
+    def __init__(self, depth: int = config.LOG_TEMPLATE_DEPTH, similarity: float = config.LOG_TEMPLATE_SIMILARITY,
+                 max_children: int = config.LOG_TEMPLATE_MAX_CHILDREN, samples: int = config.LOG_TEMPLATE_SAMPLES,
+                 seen_ids: int = config.LOG_TEMPLATE_SEEN_IDS):
+        self.depth = depth
+        self.similarity = similarity
+        self.max_children = max_children
+        self.samples = samples
+        self.max_seen = seen_ids
+        self.templates: List[Template] = []
+        self._root: Dict[int, dict] = {}
+        self._seen: "OrderedDict[str, Template]" = OrderedDict()  # log id -> its template
+        self._lock = threading.Lock()
+
+    def add(self, message: str, log_id: str = "", timestamp: str = "", level: str = "") -> Template:
+        """Cluster one message, updating its template's counts and samples"""
+        tokens = _tokens(message)
+        leaf = self._leaf(tokens)
+        template = self._best(leaf, tokens)
+        if template is None:
+            template = Template(len(self.templates), tokens)
+            self.templates.append(template)
+            leaf.append(template)
+        else:
+            template.tokens = [t if t == token else WILDCARD for t, token in zip(template.tokens, tokens)]
+        template.count += 1
+        if timestamp:
+            template.first_seen = min(template.first_seen or timestamp, timestamp)
+            template.last_seen = max(template.last_seen, timestamp)
+        if log_id and len(template.sample_ids) < self.samples:
+            template.sample_ids.append(log_id)
+        if level:
+            template.levels[level] = template.levels.get(level, 0) + 1
+        return template
+
+    def _leaf(self, tokens: List[str]) -> List[Template]:
+        node = self._root.setdefault(len(tokens), {})
+        for token in tokens[:self.depth - 2]:
+            if token not in node:
+                token = token if len(node) < self.max_children else WILDCARD
+            node = node.setdefault(token, {})
+        return node.setdefault(None, [])
+
+    def _best(self, leaf: List[Template], tokens: List[str]) -> Optional[Template]:
+        """The template sharing the most literal tokens with `tokens`, if similar enough"""
+        if not tokens:
+            return leaf[0] if leaf else None
+        best, best_key = None, (-1.0, -1)
+        for template in leaf:
+            same = sum(t == token for t, token in zip(template.tokens, tokens) if t != WILDCARD)
+            literal = sum(t != WILDCARD for t in template.tokens)
+            key = (same / len(tokens), literal)  # Ties go to the more specific template
+            if key > best_key:
+                best, best_key = template, key
+        return best if best is not None and best_key[0] >= self.similarity else None
+
+    def ingest(self, logs: Iterable[Any]) -> int:
+        """Cluster Log records not seen before; returns how many were new"""
+        added = 0
+        with self._lock:
+            for log in logs:
+                if not log.id or log.id in self._seen:
+                    continue
+                self._seen[log.id] = self.add(log.message, log.id, log.timestamp, log.level)
+                added += 1
+            while len(self._seen) > self.max_seen:
+                self._seen.popitem(last=False)
+        return added
+
+    def group(self, logs: List[Any]) -> List[Dict[str, Any]]:
+        """Group a page of Log records by template, largest group first, without mining anything
+
+        Only `on_response` ingests, so a page of mock or stale fallback records never lands in
+        the backend's templates. Records not mined yet join the closest existing template if
+        one is similar enough, else a group of their own keyed by their tokenized text
+        (`template` None, `text` set).
+        """
+        groups: Dict[Any, Dict[str, Any]] = {}
+        with self._lock:
+            for log in logs:
+                template = self._seen.get(log.id) if log.id else None
+                tokens = None
+                if template is None:
+                    tokens = _tokens(log.message)
+                    template = self._match(tokens)
+                key = template.id if template is not None else " ".join(tokens)
+                group = groups.get(key)
+                if group is None:
+                    group = groups[key] = {"template": template, "text": template.text if template else key,
+                                           "logs": []}
+                group["logs"].append(log)
+        return sorted(groups.values(), key=lambda g: -len(g["logs"]))
+
+    def _match(self, tokens: List[str]) -> Optional[Template]:
+        """Read-only `add`: the template `tokens` would join, if any, leaving the tree untouched"""
+        node = self._root.get(len(tokens))
+        for token in tokens[:self.depth - 2]:
+            if node is None:
+                return None
+            if token not in node:
+                token = None if len(node) < self.max_children else WILDCARD  # `add` would open a new branch
+            node = node.get(token)
+        return self._best(node.get(None, []), tokens) if node is not None else None
+
+    def on_response(self, endpoint: str, data: Any):
+        """APIClient listener: cluster every logs page any page fetches"""
+        if endpoint == "/api/v1/logs" and isinstance(data, dict):
+            self.ingest(data.get("logs") or [])
+
+
+def _tokens(message: Optional[str]) -> List[str]:
+    return [WILDCARD if _VARIABLE.search(token) else token for token in (message or "").split()]
+
+
+def miner_for(client) -> TemplateMiner:
+    """The process-wide miner for a backend, subscribed to its clients' responses"""
+    return shared(client, TemplateMiner)
@@ -0,0 +1,211 @@
+import sys
+from typing import Any, Dict, List, Optional
+
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+def _enum(value: Any) -> str:
+    """Intern low-cardinality fields so every record shares one string object"""
+    return sys.intern(_text(value))
+
+
+def _int(value: Any) -> int:
+    if value is None or value == "":
+        return 0
+    return value if type(value) is int else int(float(value))
+
+
+def _float(value: Any) -> float:
+    if value is None or value == "":
+        return 0.0
+    return value if type(value) is float else float(value)
+
+
+def _optional_int(value: Any) -> Optional[int]:
+    return None if value is None or value == "" else _int(value)
+
+
+def _optional_float(value: Any) -> Optional[float]:
+    return None if value is None or value == "" else _float(value)
+
+
+def _bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.lower() in ("true", "1", "yes")
+    return bool(value)
+
+
+def _enum_tuple(value: Any) -> tuple:
+    return tuple(_enum(v) for v in value or ())
+
+
+def _passthrough(value: Any) -> Any:
+    return value
+
+
+class Record:
+    """Slotted record built from an API dict; unknown keys are kept in `extra`
+
+    `source` names the backend a record came from when several are federated.
+    """
+    __slots__ = ("extra", "source")
+    # (attribute, API key, converter); subclasses declare their own
+    _fields = ()
+    _required = ("id",)
+
+    def __init__(self, **kwargs):
+        for attr, key, convert in self._fields:
+            setattr(self, attr, convert(kwargs.get(attr)))
+        self.extra = None
+        self.source = kwargs.get("source")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Record":
+        """Validate and convert one API dict; raises ValueError on missing or malformed fields"""
+        for key in cls._required:
+            if data.get(key) in (None, ""):
+                raise ValueError(f"{cls.__name__} is missing {key!r}")
+        record = cls.__new__(cls)
+        try:
+            for attr, key, convert in cls._fields:
+                setattr(record, attr, convert(data.get(key)))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{cls.__name__} {data.get('id')!r}: {e}") from e
+        extra = {k: v for k, v in data.items() if k not in cls._keys}
+        record.extra = extra or None
+        record.source = data.get("source")
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert back to the API dict shape"""
+        data = {key: getattr(self, attr) for attr, key, convert in self._fields}
+        if self.extra:
+            data.update(self.extra)
+        if self.source is not None:
+            data["source"] = self.source
+        return data
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={getattr(self, 'id', None)!r})"
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._keys = frozenset(key for attr, key, convert in cls._fields) | {"source"}
+
+
+class Log(Record):
+    __slots__ = ("id", "timestamp", "level", "message", "agent_id", "agent_name", "trace_id", "model",
+                 "input_tokens", "output_tokens", "total_tokens", "latency", "cost", "status",
+                 "input", "output", "metadata")
+    _fields = (
+        ("id", "id", _text),
+        ("timestamp", "timestamp", _text),
+        ("level", "level", _enum),
+        ("message", "message", _text),
+        ("agent_id", "agentId", _enum),
+        ("agent_name", "agentName", _enum),
+        ("trace_id", "traceId", _text),
+        ("model", "model", _enum),
+        ("input_tokens", "inputTokens", _int),
+        ("output_tokens", "outputTokens", _int),
+        ("total_tokens", "totalTokens", _int),
+        ("latency", "latency", _int),
+        ("cost", "cost", _float),
+        ("status", "status", _enum),
+        ("input", "input", _passthrough),
+        ("output", "output", _passthrough),
+        ("metadata", "metadata", _passthrough),
+    )
+
+
+class Trace(Record):
+    __slots__ = ("id", "name", "start_time", "duration", "status", "total_spans", "total_tokens",
+                 "total_cost", "agents", "metadata")
+    _fields = (
+        ("id", "id", _text),
+        ("name", "name", _text),
+        ("start_time", "startTime", _text),
+        ("duration", "duration", _int),
+        ("status", "status", _enum),
+        ("total_spans", "totalSpans", _int),
+        ("total_tokens", "totalTokens", _int),
+        ("total_cost", "totalCost", _float),
+        ("agents", "agents", _enum_tuple),
+        ("metadata", "metadata", _passthrough),
+    )
+
+
+class Agent(Record):
+    __slots__ = ("id", "name", "type", "status", "description", "model", "last_active", "total_requests",
+                 "success_rate", "avg_latency", "total_tokens", "total_cost", "is_connected_to_orchestrator",
+                 "current_task")
+    _fields = (
+        ("id", "id", _enum),
+        ("name", "name", _enum),
+        ("type", "type", _enum),
+        ("status", "status", _enum),
+        ("description", "description", _text),
+        ("model", "model", _enum),
+        ("last_active", "lastActive", _text),
+        ("total_requests", "totalRequests", _int),
+        ("success_rate", "successRate", _float),
+        ("avg_latency", "avgLatency", _float),
+        ("total_tokens", "totalTokens", _int),
+        ("total_cost", "totalCost", _float),
+        ("is_connected_to_orchestrator", "isConnectedToOrchestrator", _bool),
+        ("current_task", "currentTask", _passthrough),
+    )
+
+
+class MetricPoint(Record):
+    """One time bucket of any metric series; fields the series does not carry are None"""
+    __slots__ = ("time", "requests", "tokens", "input_tokens", "output_tokens", "total_tokens", "cost",
+                 "avg", "p50", "p95", "p99")
+    _required = ("time",)
+    _fields = (
+        ("time", "time", _text),
+        ("requests", "requests", _optional_int),
+        ("tokens", "tokens", _optional_int),
+        ("input_tokens", "inputTokens", _optional_int),
+        ("output_tokens", "outputTokens", _optional_int),
+        ("total_tokens", "totalTokens", _optional_int),
+        ("cost", "cost", _optional_float),
+        ("avg", "avg", _optional_float),
+        ("p50", "p50", _optional_float),
+        ("p95", "p95", _optional_float),
+        ("p99", "p99", _optional_float),
+    )
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {key: getattr(self, attr) for attr, key, convert in self._fields
+                if getattr(self, attr) is not None}
+        if self.extra:
+            data.update(self.extra)
+        if self.source is not None:
+            data["source"] = self.source
+        return data
+
+
+def parse_records(items: List[Dict[str, Any]], cls) -> List[Record]:
+    """Convert a list of API dicts, dropping entries that fail validation"""
+    records = []
+    for item in items or ():
+        try:
+            records.append(cls.from_dict(item))
+        except (ValueError, AttributeError):
+            continue
+    return records
+
+
+def parse_page(data: Dict[str, Any], key: str, cls) -> Dict[str, Any]:
+    """Replace the list under `key` in a response body with typed records"""
+    if not isinstance(data, dict):
+        return data
+    page = dict(data)
+    page[key] = parse_records(data.get(key), cls)
+    return page
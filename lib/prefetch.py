@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from typing import Any, Callable, Dict, Hashable, List, Optional
+import config
+from lib.rate_limit import BACKGROUND
+
+
+class Prefetcher:
+    """Speculatively loads values on a few background threads and keeps them for `ttl` seconds
+
+    Scheduling is best effort: keys that are fresh or already loading are skipped, and
+    once `max_pending` loads are waiting further ones are dropped rather than queued.
+    A loader returning None (e.g. the backend was unavailable) caches nothing.
+    """
+
+    def __init__(self, workers: int = config.PREFETCH_WORKERS, ttl: float = config.PREFETCH_TTL,
+                 max_entries: int = config.PREFETCH_MAX_ENTRIES, max_pending: int = config.PREFETCH_MAX_PENDING):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._pending: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
+
+    def schedule(self, key: Hashable, loader: Callable[[], Any]) -> bool:
+        """Queue a background load of `key`; False if it was fresh, in flight or dropped"""
+        with self._lock:
+            if self._fresh(key) is not None or key in self._pending:
+                return False
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return False
+            future = self._executor.submit(self._load, key, loader)
+            self._pending[key] = future
+            return True
+
+    def get(self, key: Hashable, wait: float = config.PREFETCH_WAIT) -> Optional[Any]:
+        """The prefetched value for `key`, waiting up to `wait` seconds for an in-flight load; None on a miss"""
+        with self._lock:
+            entry = self._fresh(key)
+            future = self._pending.get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry[1]
+        if future is not None:
+            try:
+                value = future.result(timeout=wait)
+            except TimeoutError:
+                value = None
+            if value is not None:
+                with self._lock:
+                    self.hits += 1
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _fresh(self, key: Hashable) -> Optional[tuple]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        return entry
+
+    def _load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        try:
+            value = loader()
+        except Exception:
+            value = None
+        if value is not None:
+            self.put(key, value)
+        with self._lock:
+            self._pending.pop(key, None)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "pending": len(self._pending), "hits": self.hits,
+                    "misses": self.misses, "dropped": self.dropped}
+
+
+# Shared by every session, so one viewer's prefetch also serves the others
+prefetcher = Prefetcher()
+
+
+def prefetch_agent_details(client, agent_ids: List[str]):
+    """Warm agent details for the agents on screen, at background priority and without mock fallback"""
+    for agent_id in agent_ids[:config.PREFETCH_VISIBLE_AGENTS]:
+        prefetcher.schedule((client.base_url, "agent", agent_id),
+                            lambda agent_id=agent_id: client.get_agent_detail(agent_id, priority=BACKGROUND,
+                                                                              mock_fallback=False))
+
+
+def get_agent_detail(client, agent_id: str) -> Dict[str, Any]:
+    """Agent detail from the prefetch cache, or a regular interactive call on a miss"""
+    detail = prefetcher.get((client.base_url, "agent", agent_id))
+    if detail is None:
+        detail = client.get_agent_detail(agent_id)
+    return detail
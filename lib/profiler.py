@@ -0,0 +1,118 @@
+import contextlib
+import cProfile
+import io
+import pstats
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterator, List, Optional
+from streamlit.delta_generator import DeltaGenerator
+
+# Time not claimed by an explicit phase is attributed to element emission
+PHASES = ("fetch", "prep", "chart", "emit")
+DEFAULT_PHASE = "emit"
+
+# Each Streamlit script run executes on its own thread, so the active profile is thread-local
+_state = threading.local()
+
+
+class RenderProfile:
+    """Wall time and element counts for one page render, split by phase"""
+
+    def __init__(self, page: str):
+        self.page = page
+        self.started = time.time()
+        self.total = 0.0
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.elements = Counter()
+        self.element_types = Counter()
+        self.stats_text = None
+
+    def to_row(self) -> Dict[str, object]:
+        row = {"page": self.page, "at": time.strftime("%H:%M:%S", time.localtime(self.started)),
+               "totalMs": round(self.total * 1000, 1)}
+        for name, seconds in self.seconds.items():
+            row[f"{name}Ms"] = round(seconds * 1000, 1)
+        row["elements"] = sum(self.elements.values())
+        return row
+
+
+class phase(contextlib.ContextDecorator):
+    """Attribute the enclosed time (and emitted elements) to a named phase
+
+    Phases nest: time spent in an inner phase is not counted again in the outer one.
+    Usable as a decorator; a no-op when no page is being profiled.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        stack = getattr(_state, "stack", None)
+        if stack is not None:
+            now = time.perf_counter()
+            _pause(stack, now)
+            stack.append([self.name, now])
+        return self
+
+    def __exit__(self, *exc):
+        stack = getattr(_state, "stack", None)
+        if stack is not None and len(stack) > 1:
+            now = time.perf_counter()
+            _pause(stack, now)
+            stack.pop()
+            stack[-1][1] = now
+        return False
+
+
+def _pause(stack: List[list], now: float):
+    name, resumed = stack[-1]
+    _state.profile.seconds[name] = _state.profile.seconds.get(name, 0.0) + now - resumed
+
+
+def _count_elements():
+    """Wrap DeltaGenerator._enqueue once so every emitted element is counted against the current phase"""
+    if getattr(DeltaGenerator._enqueue, "_profiled", False):
+        return
+    enqueue = DeltaGenerator._enqueue
+
+    def counting_enqueue(self, delta_type, *args, **kwargs):
+        stack = getattr(_state, "stack", None)
+        if stack is not None:
+            _state.profile.elements[stack[-1][0]] += 1
+            _state.profile.element_types[delta_type] += 1
+        return enqueue(self, delta_type, *args, **kwargs)
+
+    counting_enqueue._profiled = True
+    DeltaGenerator._enqueue = counting_enqueue
+
+
+@contextlib.contextmanager
+def profile_page(page: str, cprofile: bool = False, top: int = 40) -> Iterator[RenderProfile]:
+    """Profile one page render; with `cprofile`, also capture pstats output (slow, use for a single rerun)"""
+    _count_elements()
+    profile = RenderProfile(page)
+    profiler = cProfile.Profile() if cprofile else None
+    _state.profile = profile
+    _state.stack = [[DEFAULT_PHASE, time.perf_counter()]]
+    start = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield profile
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        now = time.perf_counter()
+        _pause(_state.stack, now)
+        profile.total = now - start
+        _state.stack = None
+        _state.profile = None
+        if profiler is not None:
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).strip_dirs().sort_stats("cumulative").print_stats(top)
+            profile.stats_text = out.getvalue()
+
+
+def current_profile() -> Optional[RenderProfile]:
+    return getattr(_state, "profile", None)
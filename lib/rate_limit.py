@@ -0,0 +1,142 @@
+import threading
+import time
+from typing import Dict, Optional, Tuple
+import config
+
+# Priority classes: interactive calls (detail views the user just clicked)
+# may drain a bucket completely and wait briefly for a token; background
+# refreshes must leave a reserve untouched and never wait.
+INTERACTIVE = 0
+BACKGROUND = 1
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        """Add tokens accrued since the last refill"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, reserve: float = 0.0) -> float:
+        """Seconds until one token above reserve is available"""
+        missing = reserve + 1.0 - self.tokens
+        if missing <= 0:
+            return 0.0
+        return missing / self.rate if self.rate > 0 else float("inf")
+
+
+class RateLimiter:
+    """Global plus per-endpoint token buckets with priority classes"""
+
+    def __init__(self, rate: float = config.RATE_LIMIT_RPS, burst: float = config.RATE_LIMIT_BURST,
+                 endpoints: Optional[Dict[str, Tuple[float, float]]] = None,
+                 background_reserve: float = config.RATE_LIMIT_BACKGROUND_RESERVE,
+                 interactive_wait: float = config.RATE_LIMIT_INTERACTIVE_WAIT):
+        self.global_bucket = TokenBucket(rate, burst)
+        endpoints = config.RATE_LIMIT_ENDPOINTS if endpoints is None else endpoints
+        self.endpoint_buckets = {name: TokenBucket(r, b) for name, (r, b) in endpoints.items()}
+        self.background_reserve = background_reserve
+        self.interactive_wait = interactive_wait
+        self.allowed = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def _buckets(self, endpoint: str):
+        bucket = self.endpoint_buckets.get(endpoint)
+        return [self.global_bucket] if bucket is None else [self.global_bucket, bucket]
+
+    def _try_acquire(self, endpoint: str, priority: int) -> float:
+        """Take a token from every bucket or none; return 0 on success, else seconds to wait"""
+        with self._lock:
+            now = time.monotonic()
+            buckets = self._buckets(endpoint)
+            reserves = []
+            for bucket in buckets:
+                bucket.refill(now)
+                reserves.append(bucket.capacity * self.background_reserve if priority == BACKGROUND else 0.0)
+            wait = max(b.wait_time(r) for b, r in zip(buckets, reserves))
+            if wait == 0.0:
+                for bucket in buckets:
+                    bucket.tokens -= 1.0
+            return wait
+
+    def acquire(self, endpoint: str, priority: int = BACKGROUND, timeout: Optional[float] = None) -> bool:
+        """Acquire a request slot; interactive calls may block up to interactive_wait (or `timeout`)"""
+        if timeout is None:
+            timeout = self.interactive_wait if priority == INTERACTIVE else 0.0
+        deadline = time.monotonic() + timeout
+        while True:
+            wait = self._try_acquire(endpoint, priority)
+            if wait == 0.0:
+                self.allowed += 1
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or wait > remaining:
+                self.rejected += 1
+                return False
+            time.sleep(wait)
+
+    def stats(self) -> Dict[str, float]:
+        """Current token levels and admission counters"""
+        with self._lock:
+            now = time.monotonic()
+            self.global_bucket.refill(now)
+            stats = {"allowed": self.allowed, "rejected": self.rejected,
+                     "globalTokens": round(self.global_bucket.tokens, 2)}
+            for name, bucket in self.endpoint_buckets.items():
+                bucket.refill(now)
+                stats[f"tokens:{name}"] = round(bucket.tokens, 2)
+            return stats
+
+
+class CircuitBreaker:
+    """Stops calling a backend after repeated failures, then lets a single probe through
+
+    closed -> open after `failure_threshold` consecutive failures; open -> half_open once
+    `reset_timeout` has passed; a successful probe closes the circuit, a failed one reopens it.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = config.BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = config.BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now"""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._probing = False
@@ -0,0 +1,159 @@
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner_utils.script_run_context import get_script_run_ctx
+import config
+
+# Containers longer than this are sized from an evenly spaced sample
+SAMPLE_SIZE = 200
+
+
+def estimate_size(obj: Any, _seen: Optional[set] = None, _depth: int = 0) -> int:
+    """Approximate deep size of `obj` in bytes; shared sub-objects are counted once"""
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen or _depth > 12:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))):
+        return sys.getsizeof(obj)
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, np.ndarray):
+        # getsizeof includes the buffer only when the array owns it
+        return sys.getsizeof(obj) if obj.flags.owndata else sys.getsizeof(obj) + obj.nbytes
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        items = list(obj.items())
+        return size + _sampled(items, lambda kv: estimate_size(kv[0], seen, _depth + 1)
+                                                 + estimate_size(kv[1], seen, _depth + 1))
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + _sampled(list(obj), lambda item: estimate_size(item, seen, _depth + 1))
+    slots = [name for cls in type(obj).__mro__ for name in getattr(cls, "__slots__", ())]
+    if slots:
+        size += sum(estimate_size(getattr(obj, name, None), seen, _depth + 1) for name in slots)
+    if hasattr(obj, "__dict__"):
+        size += estimate_size(vars(obj), seen, _depth + 1)
+    return size
+
+
+def _sampled(items: List[Any], measure) -> int:
+    if len(items) <= SAMPLE_SIZE:
+        return sum(measure(item) for item in items)
+    step = len(items) / SAMPLE_SIZE
+    sample = sum(measure(items[int(i * step)]) for i in range(SAMPLE_SIZE))
+    return int(sample * len(items) / SAMPLE_SIZE)
+
+
+class SessionUsage:
+    __slots__ = ("session_id", "state", "bytes", "keys", "last_seen", "evicted")
+
+    def __init__(self, session_id: str, state):
+        self.session_id = session_id
+        self.state = state
+        self.bytes = 0
+        self.keys: Dict[str, int] = {}
+        self.last_seen = time.monotonic()
+        self.evicted = 0
+
+
+class SessionMemory:
+    """Per-session and process-wide accounting of st.session_state, with eviction
+
+    Each script run measures its own session. Only keys listed in `evictable` (exact
+    names or prefixes ending in "_") are ever dropped: first the largest ones of a
+    session over `session_cap`, then, while all sessions together exceed `global_cap`,
+    those of the least recently active sessions. Pages must rebuild evicted keys.
+    """
+
+    def __init__(self, session_cap: int = config.SESSION_MEMORY_CAP_MB * 1_000_000,
+                 global_cap: int = config.GLOBAL_SESSION_MEMORY_CAP_MB * 1_000_000,
+                 evictable: tuple = config.SESSION_EVICTABLE_KEYS, idle_ttl: float = config.SESSION_MEMORY_IDLE_TTL):
+        self.session_cap = session_cap
+        self.global_cap = global_cap
+        self.evictable = evictable
+        self.idle_ttl = idle_ttl
+        self._sessions: Dict[str, SessionUsage] = {}
+        self._lock = threading.Lock()
+
+    def is_evictable(self, key: str) -> bool:
+        return any(key == name or (name.endswith("_") and key.startswith(name)) for name in self.evictable)
+
+    def account(self) -> Optional[SessionUsage]:
+        """Measure the current session's state and enforce both caps; call once per script run"""
+        ctx = get_script_run_ctx()
+        if ctx is None:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            usage = self._sessions.get(ctx.session_id)
+            if usage is None:
+                usage = self._sessions[ctx.session_id] = SessionUsage(ctx.session_id, ctx.session_state)
+            usage.state = ctx.session_state
+            usage.last_seen = now
+            self._measure(usage)
+            self._evict(usage, usage.bytes - self.session_cap)
+            self._prune(now)
+            over = sum(u.bytes for u in self._sessions.values()) - self.global_cap
+            for other in sorted(self._sessions.values(), key=lambda u: u.last_seen):
+                if over <= 0:
+                    break
+                over -= self._evict(other, over)
+            return usage
+
+    def _measure(self, usage: SessionUsage):
+        state = usage.state.filtered_state
+        usage.keys = {key: estimate_size(value) for key, value in state.items()}
+        usage.bytes = sum(usage.keys.values())
+
+    def _evict(self, usage: SessionUsage, excess: int) -> int:
+        """Drop evictable keys of one session, largest first, until `excess` bytes are freed"""
+        freed = 0
+        for key, size in sorted(usage.keys.items(), key=lambda kv: -kv[1]):
+            if freed >= excess:
+                break
+            if not self.is_evictable(key):
+                continue
+            try:
+                del usage.state[key]
+            except KeyError:
+                pass
+            del usage.keys[key]
+            usage.bytes -= size
+            usage.evicted += 1
+            freed += size
+        return freed
+
+    def _prune(self, now: float):
+        """Forget closed sessions (and, outside a server, idle ones) so their state can be freed"""
+        runtime = Runtime.instance() if Runtime.exists() else None
+        for session_id, usage in list(self._sessions.items()):
+            closed = runtime is not None and not runtime.is_active_session(session_id)
+            if closed or now - usage.last_seen > self.idle_ttl:
+                del self._sessions[session_id]
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """One row per tracked session, most recently active first"""
+        now = time.monotonic()
+        with self._lock:
+            sessions = sorted(self._sessions.values(), key=lambda u: -u.last_seen)
+            return [{"session": u.session_id[:8], "kb": round(u.bytes / 1000, 1), "keys": len(u.keys),
+                     "largestKey": max(u.keys, key=u.keys.get) if u.keys else "",
+                     "evicted": u.evicted, "idleSeconds": round(now - u.last_seen, 1)} for u in sessions]
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(u.bytes for u in self._sessions.values())
+
+    def current(self) -> Optional[SessionUsage]:
+        ctx = get_script_run_ctx()
+        with self._lock:
+            return self._sessions.get(ctx.session_id) if ctx is not None else None
+
+
+session_memory = SessionMemory()
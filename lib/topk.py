@@ -0,0 +1,166 @@
+import heapq
+import itertools
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+from lib.aggregates import shared
+import config
+
+WINDOWS = {"1h": 1, "6h": 6, "24h": 24}
+LOG_METRICS = {
+    "latency": lambda log: log.latency,
+    "cost": lambda log: log.cost,
+    "tokens": lambda log: log.total_tokens,
+}
+TRACE_METRICS = {
+    "duration": lambda trace: trace.duration,
+    "cost": lambda trace: trace.total_cost,
+    "tokens": lambda trace: trace.total_tokens,
+}
+
+
+class Hit:
+    __slots__ = ("kind", "id", "value", "label", "agent_id", "timestamp")
+
+    def __init__(self, kind: str, id: str, value: float, label: str, agent_id: str, timestamp: str):
+        self.kind = kind
+        self.id = id
+        self.value = value
+        self.label = label
+        self.agent_id = agent_id
+        self.timestamp = timestamp
+
+
+class TopKTracker:
+    """Rolling top-K logs and traces per metric, plus error counts per agent, over the last 1h/6h/24h
+
+    Every hour bucket keeps a bounded min-heap of its K largest values per metric, so
+    a window's top K is the K largest across the heaps of its buckets: exact for whole
+    hours, with memory bounded by K per bucket and metric however many records stream
+    past. Windows end at the newest record seen. Each log is counted once (ids are
+    remembered in a bounded LRU); traces are taken once they finish, since a running
+    trace's duration and cost still grow.
+    """
+
+    def __init__(self, k: int = config.HOTSPOT_K, seen_ids: int = config.HOTSPOT_SEEN_IDS):
+        self.k = k
+        self.max_seen = seen_ids
+        self.retention_hours = max(WINDOWS.values())
+        # bucket ("YYYY-MM-DDTHH") -> (kind, metric) -> min-heap of (value, seq, Hit)
+        self._heaps: Dict[str, Dict[tuple, list]] = {}
+        self._errors: Dict[str, Dict[str, int]] = {}  # bucket -> agent id -> error count
+        self._seen = {"log": OrderedDict(), "trace": OrderedDict()}
+        self._seq = itertools.count()
+        self.agent_names: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def ingest_logs(self, logs: Iterable[Any]) -> int:
+        """Fold in Log records not seen before; returns how many were new"""
+        added = 0
+        with self._lock:
+            for log in logs:
+                if not log.timestamp or not self._first_sight("log", log.id):
+                    continue
+                bucket = log.timestamp[:13]
+                hit = Hit("log", log.id, 0.0, log.message, log.agent_id, log.timestamp)
+                for metric, value in LOG_METRICS.items():
+                    self._push(bucket, ("log", metric), value(log), hit)
+                if log.status == "error" and log.agent_id:
+                    errors = self._errors.setdefault(bucket, {})
+                    errors[log.agent_id] = errors.get(log.agent_id, 0) + 1
+                if log.agent_id and log.agent_name:
+                    self.agent_names[log.agent_id] = log.agent_name
+                added += 1
+            self._trim()
+        return added
+
+    def ingest_traces(self, traces: Iterable[Any]) -> int:
+        """Fold in finished Trace records not seen before; returns how many were new"""
+        added = 0
+        with self._lock:
+            for trace in traces:
+                if not trace.start_time or trace.status == "running" or not self._first_sight("trace", trace.id):
+                    continue
+                bucket = trace.start_time[:13]
+                hit = Hit("trace", trace.id, 0.0, trace.name, "", trace.start_time)
+                for metric, value in TRACE_METRICS.items():
+                    self._push(bucket, ("trace", metric), value(trace), hit)
+                added += 1
+            self._trim()
+        return added
+
+    def _first_sight(self, kind: str, record_id: Optional[str]) -> bool:
+        seen = self._seen[kind]
+        if not record_id or record_id in seen:
+            return False
+        seen[record_id] = None
+        return True
+
+    def _push(self, bucket: str, key: tuple, value: Optional[float], hit: Hit):
+        if not value:
+            return
+        heap = self._heaps.setdefault(bucket, {}).setdefault(key, [])
+        if len(heap) < self.k:
+            heapq.heappush(heap, (value, next(self._seq), hit))
+        elif value > heap[0][0]:
+            heapq.heapreplace(heap, (value, next(self._seq), hit))
+
+    def _trim(self):
+        """Bound the id memory and drop buckets older than the longest window"""
+        for seen in self._seen.values():
+            while len(seen) > self.max_seen:
+                seen.popitem(last=False)
+        cutoff = self._cutoff(self.retention_hours)
+        if cutoff is None:
+            return
+        for buckets in (self._heaps, self._errors):
+            for bucket in [b for b in buckets if b < cutoff]:
+                del buckets[bucket]
+
+    def _cutoff(self, hours: int) -> Optional[str]:
+        """First bucket of the `hours`-long window ending at the newest bucket"""
+        newest = max(itertools.chain(self._heaps, self._errors), default=None)
+        if newest is None:
+            return None
+        return (datetime.strptime(newest, "%Y-%m-%dT%H") - timedelta(hours=hours - 1)).strftime("%Y-%m-%dT%H")
+
+    def top(self, kind: str, metric: str, window: str = "6h", k: Optional[int] = None) -> List[Hit]:
+        """The k records of `kind` ("log" or "trace") with the largest `metric` in `window`, largest first"""
+        with self._lock:
+            cutoff = self._cutoff(WINDOWS[window])
+            if cutoff is None:
+                return []
+            entries = itertools.chain.from_iterable(
+                heaps.get((kind, metric), ()) for bucket, heaps in self._heaps.items() if bucket >= cutoff)
+            best = heapq.nlargest(k or self.k, entries, key=lambda entry: entry[0])
+        return [Hit(hit.kind, hit.id, value, hit.label, hit.agent_id, hit.timestamp) for value, _, hit in best]
+
+    def noisiest_agents(self, window: str = "6h", k: Optional[int] = None) -> List[Hit]:
+        """The k agents with the most errored calls in `window`, most first"""
+        with self._lock:
+            cutoff = self._cutoff(WINDOWS[window])
+            if cutoff is None:
+                return []
+            totals: Dict[str, int] = {}
+            for bucket, errors in self._errors.items():
+                if bucket >= cutoff:
+                    for agent_id, count in errors.items():
+                        totals[agent_id] = totals.get(agent_id, 0) + count
+            best = heapq.nlargest(k or self.k, totals.items(), key=lambda item: item[1])
+            return [Hit("agent", agent_id, count, self.agent_names.get(agent_id, agent_id), agent_id, "")
+                    for agent_id, count in best]
+
+    def on_response(self, endpoint: str, data: Any):
+        """APIClient listener: fold in every log and trace page any page fetches"""
+        if not isinstance(data, dict):
+            return
+        if endpoint == "/api/v1/logs":
+            self.ingest_logs(data.get("logs") or [])
+        elif endpoint == "/api/v1/traces":
+            self.ingest_traces(data.get("traces") or [])
+
+
+def tracker_for(client) -> TopKTracker:
+    """The process-wide tracker for a backend, subscribed to its clients' responses"""
+    return shared(client, TopKTracker)
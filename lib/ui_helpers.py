@@ -1,9 +1,12 @@
 import streamlit as st
+import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import config
 from datetime import datetime
+from lib.profiler import phase
 
 def get_status_color(status: str) -> str:
     """Get color for status badge"""
@@ -39,7 +42,7 @@ def render_agent_badge(status: str, name: str = ""):
     color = get_status_color(status)
     return f'<span style="display: inline-block; padding: 4px 12px; border-radius: 20px; background-color: {color}20; color: {color}; font-size: 12px; font-weight: 600; border: 1px solid {color}40;">{name or status}</span>'
 
-def render_log_row(log: dict):
+def render_log_row(log):
     """Render a log entry in table format"""
     level_colors = {
         "info": f"background-color: #d0f0ff; color: #0369a1;",
@@ -47,28 +50,36 @@ def render_log_row(log: dict):
         "error": f"background-color: #fee2e2; color: #991b1b;",
         "debug": f"background-color: #f3f4f6; color: #374151;"
     }
-    level_style = level_colors.get(log.get("level", "info"), "")
+    level_style = level_colors.get(log.level or "info", "")
     
     return f"""
     <div style='display: flex; gap: 12px; padding: 12px; border-bottom: 1px solid {config.NEUTRAL_BORDER}; align-items: center;'>
-        <div style='flex: 0 0 80px;'><span style='padding: 4px 8px; border-radius: 6px; {level_style} font-weight: 500; font-size: 11px;'>{log.get("level", "info").upper()}</span></div>
-        <div style='flex: 1; min-width: 0;'><div style='color: {config.NEUTRAL_TEXT}; font-weight: 500; font-size: 13px;'>{log.get("message", "N/A")}</div><div style='color: #94a3b8; font-size: 11px; margin-top: 2px;'>{log.get("timestamp", "")}</div></div>
-        <div style='flex: 0 0 100px; text-align: right;'><div style='font-size: 12px; color: {config.NEUTRAL_TEXT};'>{log.get("totalTokens", 0)} tokens</div><div style='font-size: 11px; color: #94a3b8; margin-top: 2px;'>${log.get("cost", 0):.4f}</div></div>
-        <div style='flex: 0 0 80px;'><span style='padding: 4px 8px; border-radius: 6px; background-color: {get_status_color(log.get("status", "pending"))}20; color: {get_status_color(log.get("status", "pending"))}; font-weight: 500; font-size: 11px;'>{log.get("status", "pending").upper()}</span></div>
+        <div style='flex: 0 0 80px;'><span style='padding: 4px 8px; border-radius: 6px; {level_style} font-weight: 500; font-size: 11px;'>{(log.level or "info").upper()}</span></div>
+        <div style='flex: 1; min-width: 0;'><div style='color: {config.NEUTRAL_TEXT}; font-weight: 500; font-size: 13px;'>{log.message or "N/A"}</div><div style='color: #94a3b8; font-size: 11px; margin-top: 2px;'>{log.timestamp}</div></div>
+        <div style='flex: 0 0 100px; text-align: right;'><div style='font-size: 12px; color: {config.NEUTRAL_TEXT};'>{log.total_tokens} tokens</div><div style='font-size: 11px; color: #94a3b8; margin-top: 2px;'>${log.cost:.4f}</div></div>
+        <div style='flex: 0 0 80px;'><span style='padding: 4px 8px; border-radius: 6px; background-color: {get_status_color(log.status or "pending")}20; color: {get_status_color(log.status or "pending")}; font-weight: 500; font-size: 11px;'>{(log.status or "pending").upper()}</span></div>
     </div>
     """
 
-def create_activity_chart(data: list):
+@phase("prep")
+def chart_frame(data, columns: dict) -> pd.DataFrame:
+    """Select and rename chart columns from a DataFrame, MetricPoints or point dicts, column-wise"""
+    if isinstance(data, pd.DataFrame):
+        df = data
+    else:
+        df = pd.DataFrame.from_records([p.to_dict() if hasattr(p, "to_dict") else p for p in data])
+    out = pd.DataFrame(index=df.index)
+    for key, label in columns.items():
+        if key in df:
+            out[label] = df[key] if key == "time" else df[key].fillna(0)
+        else:
+            out[label] = "" if key == "time" else 0
+    return out
+
+@phase("chart")
+def create_activity_chart(data):
     """Create activity chart"""
-    df_data = []
-    for point in data:
-        df_data.append({
-            "time": point.get("time", ""),
-            "Requests": point.get("requests", 0),
-            "Tokens": point.get("tokens", 0)
-        })
-    
-    df = __import__("pandas").DataFrame(df_data)
+    df = chart_frame(data, {"time": "time", "requests": "Requests", "tokens": "Tokens"})
     
     fig = make_subplots(specs=[[{"secondary_y": True}]])
     
@@ -100,17 +111,10 @@ def create_activity_chart(data: list):
     
     return fig
 
-def create_token_distribution_chart(data: list):
+@phase("chart")
+def create_token_distribution_chart(data):
     """Create token distribution chart"""
-    df_data = []
-    for point in data:
-        df_data.append({
-            "time": point.get("time", ""),
-            "Input Tokens": point.get("inputTokens", 0),
-            "Output Tokens": point.get("outputTokens", 0)
-        })
-    
-    df = __import__("pandas").DataFrame(df_data)
+    df = chart_frame(data, {"time": "time", "inputTokens": "Input Tokens", "outputTokens": "Output Tokens"})
     
     fig = go.Figure()
     
@@ -143,17 +147,10 @@ def create_token_distribution_chart(data: list):
     
     return fig
 
-def create_cost_chart(data: list):
+@phase("chart")
+def create_cost_chart(data):
     """Create cost over time chart"""
-    df_data = []
-    for point in data:
-        df_data.append({
-            "time": point.get("time", ""),
-            "Cost": point.get("cost", 0),
-            "Requests": point.get("requests", 0)
-        })
-    
-    df = __import__("pandas").DataFrame(df_data)
+    df = chart_frame(data, {"time": "time", "cost": "Cost", "requests": "Requests"})
     
     fig = go.Figure()
     
@@ -179,19 +176,10 @@ def create_cost_chart(data: list):
     
     return fig
 
-def create_latency_chart(data: list):
+@phase("chart")
+def create_latency_chart(data):
     """Create latency percentile chart"""
-    df_data = []
-    for point in data:
-        df_data.append({
-            "time": point.get("time", ""),
-            "P50": point.get("p50", 0),
-            "P95": point.get("p95", 0),
-            "P99": point.get("p99", 0),
-            "Avg": point.get("avg", 0)
-        })
-    
-    df = __import__("pandas").DataFrame(df_data)
+    df = chart_frame(data, {"time": "time", "p50": "P50", "p95": "P95", "p99": "P99", "avg": "Avg"})
     
     fig = go.Figure()
     
@@ -229,6 +217,146 @@ def create_latency_chart(data: list):
     
     return fig
 
+@phase("chart")
+def create_concurrency_chart(timeline: dict, peaks: list):
+    """Create in-flight traces over time (peak per bucket) with the highest peaks marked"""
+    to_time = lambda seconds: pd.to_datetime(np.round(np.asarray(seconds) * 1000).astype("int64"), unit="ms", utc=True)
+    times = to_time(timeline["time"])
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(
+        x=times, y=timeline["concurrency"],
+        name="In flight",
+        line=dict(color=config.PRIMARY_COLOR, width=1.5, shape="hv"),
+        fill="tozeroy", fillcolor=config.PRIMARY_COLOR, opacity=0.3
+    ))
+
+    if peaks:
+        fig.add_trace(go.Scatter(
+            x=to_time([p["time"] for p in peaks]),
+            y=[p["concurrency"] for p in peaks],
+            name="Peaks",
+            mode="markers+text",
+            text=[str(p["concurrency"]) for p in peaks],
+            textposition="top center",
+            marker=dict(color=config.ERROR_COLOR, size=9, symbol="triangle-down")
+        ))
+
+    fig.update_layout(
+        height=300,
+        hovermode="x unified",
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        font=dict(family="system-ui, -apple-system, sans-serif", size=12, color=config.NEUTRAL_TEXT),
+        margin=dict(l=0, r=0, t=20, b=0),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+
+    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor=config.NEUTRAL_BORDER)
+    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor=config.NEUTRAL_BORDER, rangemode="tozero")
+
+    return fig
+
+@phase("chart")
+def create_attribution_chart(series: pd.DataFrame, by: str, measure: str, labels: dict = None, top: int = 10):
+    """Create stacked hourly bars of one measure per value of a dimension (smaller values merged into Other)"""
+    totals = series.groupby(by)[measure].sum().sort_values(ascending=False)
+    shown = set(totals.index[:top])
+    df = series.assign(**{by: series[by].where(series[by].isin(shown), "Other")})
+    df = df.groupby(["time", by], as_index=False)[measure].sum()
+    names = labels or {}
+
+    fig = go.Figure()
+
+    order = list(totals.index[:top])
+    if len(totals) > top and "Other" not in shown:
+        order.append("Other")
+    for value in order:
+        part = df[df[by] == value]
+        fig.add_trace(go.Bar(x=part["time"], y=part[measure], name=names.get(value, value)))
+
+    fig.update_layout(
+        barmode="stack",
+        height=320,
+        hovermode="x unified",
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        font=dict(family="system-ui, -apple-system, sans-serif", size=12, color=config.NEUTRAL_TEXT),
+        margin=dict(l=0, r=0, t=20, b=0),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+
+    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor=config.NEUTRAL_BORDER)
+    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor=config.NEUTRAL_BORDER)
+
+    return fig
+
+def render_missing_backends(page: dict):
+    """Warn that a federated page left out backends that failed or missed the deadline"""
+    missing = page.get("missing")
+    if missing:
+        st.warning(f"⚠️ Partial results: no answer in time from {', '.join(missing)}")
+
+
+def render_export_panel(client, kind: str, filters: dict = None):
+    """Render an export expander that writes logs/traces page by page and offers the result for download"""
+    import io
+    from lib import export
+
+    with st.expander(f"⬇️ Export {kind}"):
+        col1, col2, col3 = st.columns(3)
+        fmt = col1.selectbox("Format", export.FORMATS, key=f"export_format_{kind}")
+        max_rows = col2.number_input("Max rows", min_value=1, max_value=config.EXPORT_UI_MAX_ROWS, value=10000,
+                                     step=1000, key=f"export_max_rows_{kind}")
+        page_size = col3.number_input("Page size", min_value=100, max_value=10000, value=1000, step=100,
+                                      key=f"export_page_size_{kind}")
+        st.caption(f"The file is built in memory, so exports here stop at {config.EXPORT_UI_MAX_ROWS:,} rows; "
+                   f"use `python -m lib.export {kind} -o FILE` for more")
+
+        if st.button("Prepare export", key=f"export_run_{kind}"):
+            bar = st.progress(0.0)
+            status = st.empty()
+
+            def on_progress(progress):
+                if progress.total:
+                    bar.progress(min(progress.rows / progress.total, 1.0))
+                status.caption(str(progress))
+
+            # st.download_button keeps its payload in memory anyway, so the file is built there too,
+            # bounded by the row cap; the previous file is dropped first rather than held alongside
+            st.session_state.pop(f"export_file_{kind}", None)
+            out = io.BytesIO()
+            try:
+                progress = export.export(client, kind, fmt, out, int(page_size), int(max_rows),
+                                         filters, on_progress=on_progress)
+            except Exception as e:
+                st.error(f"Export failed: {e}")
+                return
+            bar.progress(1.0)
+            st.session_state[f"export_file_{kind}"] = (out.getvalue(), fmt)
+            status.caption(f"Exported {progress}")
+
+        prepared = st.session_state.get(f"export_file_{kind}")
+        if prepared:
+            data, fmt = prepared
+            st.download_button(f"Download {kind}.{fmt}", data, file_name=f"{kind}.{fmt}",
+                               mime=export.MIME_TYPES[fmt], key=f"export_download_{kind}")
+
+def render_profiler_panel(history: list):
+    """Render recent page render timings, element counts and any captured cProfile output"""
+    with st.expander("⏱️ Render profile", expanded=True):
+        if not history:
+            st.caption("No renders recorded yet")
+            return
+        latest = history[-1]
+        st.dataframe(pd.DataFrame([p.to_row() for p in reversed(history)]),
+                     use_container_width=True, hide_index=True)
+        st.caption("Elements by type: " + ", ".join(f"{t} × {n}" for t, n in latest.element_types.most_common()))
+        if latest.stats_text:
+            st.markdown(f"**cProfile of the last {latest.page} render**")
+            st.code(latest.stats_text, language="text")
+
 import streamlit as st
 
 def apply_light_theme():
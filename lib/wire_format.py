@@ -0,0 +1,92 @@
+import json
+from typing import Any
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow as pa
+    from pyarrow import ipc
+except ImportError:
+    pa = ipc = None
+
+try:
+    # urllib3 advertises br / zstd only when the matching decoder is installed
+    from urllib3.util.request import ACCEPT_ENCODING
+except ImportError:
+    ACCEPT_ENCODING = "gzip,deflate"
+
+MSGPACK_TYPE = "application/msgpack"
+JSON_TYPE = "application/json"
+ARROW_STREAM_TYPE = "application/vnd.apache.arrow.stream"
+
+# orjson decodes a logs page faster than msgpack does (benchmarks/bench_decode.py, end to end
+# through APIClient too), so msgpack is preferred only over the stdlib json decoder
+if msgpack is None:
+    ACCEPT = JSON_TYPE
+elif orjson is not None:
+    ACCEPT = f"{JSON_TYPE}, {MSGPACK_TYPE};q=0.9"
+else:
+    ACCEPT = f"{MSGPACK_TYPE}, {JSON_TYPE};q=0.9"
+# Columnar endpoints additionally accept Arrow IPC streams when pyarrow is installed
+ACCEPT_FRAME = f"{ARROW_STREAM_TYPE}, {ACCEPT}" if pa is not None else ACCEPT
+
+
+def decode(content: bytes, content_type: str = JSON_TYPE) -> Any:
+    """Decode a response body using the fastest decoder available for its type"""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type in (MSGPACK_TYPE, "application/x-msgpack"):
+        if msgpack is None:
+            raise ValueError("msgpack response received but msgpack is not installed")
+        return msgpack.unpackb(content, raw=False)
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def records_frame(data: Any, records_key: str) -> pd.DataFrame:
+    """Build a DataFrame from a decoded JSON/msgpack body; other top-level keys go to attrs"""
+    frame = pd.DataFrame.from_records(data.get(records_key) or [])
+    frame.attrs = {k: v for k, v in data.items() if k != records_key}
+    return frame
+
+
+def decode_frame(content: bytes, content_type: str, records_key: str) -> pd.DataFrame:
+    """Decode a columnar response; Arrow record batches map onto pandas columns without a row loop"""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type != ARROW_STREAM_TYPE:
+        return records_frame(decode(content, content_type), records_key)
+    if pa is None:
+        raise ValueError("Arrow response received but pyarrow is not installed")
+    table = ipc.open_stream(content).read_all()
+    # split_blocks keeps one block per column so null-free numeric columns are zero-copy
+    frame = table.to_pandas(split_blocks=True)
+    metadata = table.schema.metadata or {}
+    frame.attrs = {k.decode(): json.loads(v) for k, v in metadata.items() if not k.startswith(b"pandas")}
+    return frame
+
+
+def encode(data: Any, media_type: str = JSON_TYPE) -> bytes:
+    """Encode a body in the given media type (used by the stub backend and benchmarks)"""
+    if media_type == MSGPACK_TYPE:
+        return msgpack.packb(data, use_bin_type=True)
+    if media_type == ARROW_STREAM_TYPE:
+        records_key = next(k for k, v in data.items() if isinstance(v, list))
+        table = pa.Table.from_pylist(data[records_key])
+        metadata = {k: json.dumps(v) for k, v in data.items() if k != records_key}
+        table = table.replace_schema_metadata(metadata)
+        sink = pa.BufferOutputStream()
+        with ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode()
@@ -1,6 +1,14 @@
 import streamlit as st
-from pages import overview, agents, logs, metrics, traces, settings
-from lib.ui_helpers import apply_light_theme
+from pages import overview, agents, agent_detail, logs, metrics, traces, settings
+from lib.ui_helpers import apply_light_theme, render_profiler_panel
+from lib.instrumentation import instrumentation
+from lib.profiler import profile_page
+from lib.session_memory import session_memory
+from lib.anomaly import detector
+from lib.client_registry import get_client
+from lib.log_index import index_for
+from lib.log_templates import miner_for
+from lib.topk import tracker_for
 import config
 
 # Page config
@@ -16,6 +24,9 @@ st.set_page_config(
 # Apply light theme
 apply_light_theme()
 
+# Serve client metrics to Prometheus (no-op when disabled or already running)
+instrumentation.start_exporter(config.METRICS_EXPORTER_PORT, config.METRICS_EXPORTER_HOST)
+
 # Initialize session state
 if 'page' not in st.session_state:
     st.session_state.page = 'overview'
@@ -35,8 +46,15 @@ with st.sidebar:
         "⚙️ Settings": "settings"
     }
 
-    selected = st.radio("Navigation", list(pages.keys()), key="nav")
-    st.session_state.page = pages[selected]
+    # Only an actual navigation change switches pages, so drill-downs (agent detail) survive reruns
+    st.radio("Navigation", list(pages.keys()), key="nav",
+             on_change=lambda: st.session_state.update(page=pages[st.session_state.nav]))
+
+    st.divider()
+
+    # Render profiling
+    show_profiler = st.checkbox("Show render profile", key="profiler_enabled")
+    capture_cprofile = show_profiler and st.button("Profile this page (cProfile)", use_container_width=True)
 
     st.divider()
 
@@ -49,18 +67,34 @@ with st.sidebar:
         st.metric("API", "Connected")
 
 # Main content
-if st.session_state.page == 'overview':
-    overview.render()
-elif st.session_state.page == 'agents':
-    agents.render()
-elif st.session_state.page == 'logs':
-    logs.render()
-elif st.session_state.page == 'metrics':
-    metrics.render()
-elif st.session_state.page == 'traces':
-    traces.render()
-elif st.session_state.page == 'settings':
-    settings.render()
+page_modules = {
+    'overview': overview,
+    'agents': agents,
+    'agent_detail': agent_detail,
+    'agent_analytics': agent_detail,
+    'logs': logs,
+    'metrics': metrics,
+    'traces': traces,
+    'settings': settings,
+}
+# Listener-fed aggregates subscribe before any page fetches, so they see every downloaded response
+tracker_for(get_client())
+index_for(get_client())
+miner_for(get_client())
+detector.subscribe(get_client())
+
+with profile_page(st.session_state.page, cprofile=capture_cprofile) as render_profile:
+    page_modules[st.session_state.page].render()
+
+# Keep the last few renders per session so regressions between reruns are visible
+history = st.session_state.setdefault("render_profiles", [])
+history.append(render_profile)
+del history[:-20]
+
+# Measure this session's state and evict cached keys past the per-session and global caps
+session_memory.account()
+if show_profiler:
+    render_profiler_panel(history)
 
 # Footer
 st.divider()
@@ -0,0 +1,68 @@
+import streamlit as st
+from lib.client_registry import get_client
+from lib.prefetch import get_agent_detail
+from lib.profiler import phase
+from lib.ui_helpers import apply_light_theme, render_stat_card, render_agent_badge, render_log_row, create_activity_chart
+import config
+
+
+def _back_to_agents():
+    st.session_state.page = "agents"
+
+
+def render():
+    apply_light_theme()
+    api_client = get_client()
+
+    st.button("← Back to Agents", on_click=_back_to_agents)
+
+    agent_id = st.session_state.get("selected_agent_id")
+    if not agent_id:
+        st.info("Select an agent on the Agents page to see its details.")
+        return
+
+    with phase("fetch"):
+        detail = get_agent_detail(api_client, agent_id)
+        logs = api_client.get_logs(limit=10, agent_id=agent_id)
+    metrics = detail.get("metrics", {})
+
+    st.markdown(f"## 🤖 {detail.get('name', agent_id)}")
+    st.markdown(f"{render_agent_badge(detail.get('status', 'offline'), (detail.get('status') or 'offline').upper())} "
+                f"&nbsp; *{detail.get('type', '')}* · {detail.get('model', '')}", unsafe_allow_html=True)
+    if detail.get("description"):
+        st.markdown(detail["description"])
+    st.caption(f"Created {detail.get('createdAt', 'N/A')} • Last active {detail.get('lastActive', 'N/A')}")
+    st.divider()
+
+    # Key metrics
+    col1, col2, col3, col4 = st.columns(4)
+    render_stat_card(col1, "Requests", f"{metrics.get('totalRequests', 0):,}",
+                     f"{metrics.get('errorCount', 0):,} errors", "📨", config.PRIMARY_COLOR)
+    render_stat_card(col2, "Success Rate", f"{metrics.get('successRate', 0):.1f}%", "", "✅", config.SUCCESS_COLOR)
+    render_stat_card(col3, "Avg Latency", f"{metrics.get('avgLatency', 0):.0f}ms", "", "⚡", config.PRIMARY_COLOR)
+    render_stat_card(col4, "Total Cost", f"${metrics.get('totalCost', 0):.2f}",
+                     f"{metrics.get('totalTokens', 0):,} tokens", "💰", config.WARNING_COLOR)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Input Tokens", f"{metrics.get('inputTokens', 0):,}")
+    with col2:
+        st.metric("Output Tokens", f"{metrics.get('outputTokens', 0):,}")
+
+    st.divider()
+
+    # Recent activity
+    st.markdown("### Recent Activity")
+    activity = detail.get("recentActivity", [])
+    if activity:
+        fig = create_activity_chart(activity)
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("No recent activity for this agent.")
+
+    st.markdown("### Recent Logs")
+    log_list = logs.get("logs", [])
+    if log_list:
+        st.markdown("".join(render_log_row(log) for log in log_list), unsafe_allow_html=True)
+    else:
+        st.info("No logs for this agent.")
@@ -1,18 +1,28 @@
 import streamlit as st
-from lib.api_client import api_client
+from lib.anomaly import anomalies_for, describe
+from lib.client_registry import get_client
+from lib.prefetch import prefetch_agent_details
+from lib.profiler import phase
 from lib.ui_helpers import apply_light_theme
 import config
 
 
+def _open_agent(agent_id: str, page: str):
+    st.session_state.selected_agent_id = agent_id
+    st.session_state.page = page
+
+
 def render():
     apply_light_theme()
+    api_client = get_client()
 
     st.markdown("## 🤖 Agents")
     st.markdown("Monitor all active agents and their performance metrics")
     st.divider()
 
     # Get agents data
-    agents_data = api_client.get_agents()
+    with phase("fetch"):
+        agents_data = api_client.get_agents()
     agents = agents_data.get("agents", [])
 
     # Filters
@@ -28,11 +38,20 @@ def render():
 
     # Re-fetch if filters changed
     if status_filter != "all" or search:
-        agents_data = api_client.get_agents(status=status_filter, search=search)
+        with phase("fetch"):
+            agents_data = api_client.get_agents(status=status_filter, search=search)
         agents = agents_data.get("agents", [])
 
     st.markdown(f"### Found {len(agents)} Agents")
 
+    # Opening an agent should not wait on a round trip: warm the details of the agents on screen
+    prefetch_agent_details(api_client, [agent.id for agent in agents])
+
+    # Regression flags; the detector observes fresh agents responses through the client's listener
+    flags = {}
+    for anomaly in anomalies_for(api_client):
+        flags.setdefault(anomaly["scope"], []).append(describe(anomaly))
+
     # Tabs for view modes
     tab1, tab2 = st.tabs(["📋 Grid View", "📊 Detailed View"])
 
@@ -47,29 +66,34 @@ def render():
                         # Agent Header
                         status_color = (
                             config.SUCCESS_COLOR
-                            if agent["status"] == "active"
+                            if agent.status == "active"
                             else config.WARNING_COLOR
                         )
-                        st.markdown(f"**{agent['name']}**")
-                        st.markdown(f"*{agent['type']}*")
-                        st.markdown(f"<span style='color:{status_color}'>{agent['status'].upper()}</span>",
+                        st.markdown(f"**{agent.name}**")
+                        st.markdown(f"*{agent.type}*")
+                        st.markdown(f"<span style='color:{status_color}'>{agent.status.upper()}</span>",
                                     unsafe_allow_html=True)
+                        for flag in flags.get(agent.id, []):
+                            st.markdown(f"<span style='color:{config.ERROR_COLOR}'>⚠️ {flag}</span>",
+                                        unsafe_allow_html=True)
 
                         # Metrics
-                        st.metric("Requests", agent["totalRequests"])
-                        st.metric("Success Rate", f"{agent['successRate']:.1f}%", delta=None)
-                        st.metric("Avg Latency", f"{agent['avgLatency']}ms")
-                        st.metric("Total Cost", f"${agent['totalCost']:.2f}")
+                        st.metric("Requests", agent.total_requests)
+                        st.metric("Success Rate", f"{agent.success_rate:.1f}%", delta=None)
+                        st.metric("Avg Latency", f"{agent.avg_latency:.0f}ms")
+                        st.metric("Total Cost", f"${agent.total_cost:.2f}")
 
                         # Connection status
-                        connection_status = "Connected to Orchestrator" if agent[
-                            "isConnectedToOrchestrator"] else "Not connected"
+                        connection_status = (
+                            "Connected to Orchestrator"
+                            if agent.is_connected_to_orchestrator
+                            else "Not connected"
+                        )
                         st.caption(connection_status)
 
                         # View Details button
-                        if st.button("View Details", key=f"agent_detail_{agent['id']}"):
-                            st.session_state.selected_agent_id = agent['id']
-                            st.session_state.page = "agent_detail"
+                        st.button("View Details", key=f"agent_detail_{agent.id}",
+                                  on_click=_open_agent, args=(agent.id, "agent_detail"))
         else:
             st.info("No agents found matching the filters.")
 
@@ -79,31 +103,31 @@ def render():
 
         if agents:
             for agent in agents:
-                with st.expander(f"🤖 {agent['name']} - {agent['status'].upper()}"):
+                warning = " ⚠️" if agent.id in flags else ""
+                with st.expander(f"🤖 {agent.name} - {agent.status.upper()}{warning}"):
                     col1, col2, col3, col4 = st.columns(4)
 
                     with col1:
-                        st.metric("Total Requests", agent["totalRequests"])
+                        st.metric("Total Requests", agent.total_requests)
 
                     with col2:
-                        st.metric("Success Rate", f"{agent['successRate']:.1f}%")
+                        st.metric("Success Rate", f"{agent.success_rate:.1f}%")
 
                     with col3:
-                        st.metric("Avg Latency", f"{agent['avgLatency']}ms")
+                        st.metric("Avg Latency", f"{agent.avg_latency:.0f}ms")
 
                     with col4:
-                        st.metric("Total Cost", f"${agent['totalCost']:.2f}")
+                        st.metric("Total Cost", f"${agent.total_cost:.2f}")
 
                     st.markdown(f"""
-**Description:** {agent['description']}
+**Description:** {agent.description}
 
-**Model:** {agent['model']}
+**Model:** {agent.model}
 
-**Last Active:** {agent['lastActive']}
+**Last Active:** {agent.last_active}
                     """)
 
-                    if st.button("View Full Analytics", key=f"analytics_{agent['id']}"):
-                        st.session_state.selected_agent_id = agent['id']
-                        st.session_state.page = "agent_analytics"
+                    st.button("View Full Analytics", key=f"analytics_{agent.id}",
+                              on_click=_open_agent, args=(agent.id, "agent_analytics"))
         else:
             st.info("No agents to display in detailed view.")
@@ -1,10 +1,17 @@
 import streamlit as st
-from lib.api_client import api_client
-from lib.ui_helpers import apply_light_theme
+from lib.client_registry import get_client
+from lib.log_index import index_for
+from lib.log_templates import miner_for
+from lib.profiler import phase
+from lib.ui_helpers import apply_light_theme, render_export_panel, render_missing_backends
 import config
 
+LOG_TABLE_COLUMNS = ["timestamp", "level", "status", "agentName", "message", "traceId",
+                     "inputTokens", "outputTokens", "totalTokens", "latency", "cost"]
+
 def render():
     apply_light_theme()
+    api_client = get_client()
     
     st.markdown("## 📝 Logs")
     st.markdown("Real-time logs from all agents")
@@ -26,62 +33,118 @@ def render():
         search = st.text_input("Search logs...", placeholder="Search...")
     
     # Get logs
-    logs_data = api_client.get_logs(
-        limit=limit,
-        level=level_filter,
-        status=status_filter,
-        search=search
-    )
+    with phase("fetch"):
+        logs_data = api_client.get_logs(
+            limit=limit,
+            level=level_filter,
+            status=status_filter,
+            search=search
+        )
     logs = logs_data.get("logs", [])
     
     st.markdown(f"### Showing {len(logs)} Logs (Total: {logs_data.get('total', 0)})")
+    render_missing_backends(logs_data)
+
+    render_export_panel(api_client, "logs", {
+        "level": level_filter,
+        "status": status_filter,
+        "search": search
+    })
     
-    # Display logs
-    st.markdown(f"""
-    <div style='background: white; border: 1px solid {config.NEUTRAL_BORDER}; border-radius: 12px; overflow: hidden;'>
-    """, unsafe_allow_html=True)
+    # Only the selected view is built; templates collapse the page to a handful of rows
+    view = st.radio("View", ["🧩 Templates", "📋 Entries", "📊 Table"], horizontal=True, key="log_view",
+                    label_visibility="collapsed")
+
+    if view == "🧩 Templates":
+        render_templates(api_client, logs)
+
+    elif view == "📋 Entries":
+        log_index = index_for(api_client)
+        # Display logs
+        st.markdown(f"""
+        <div style='background: white; border: 1px solid {config.NEUTRAL_BORDER}; border-radius: 12px; overflow: hidden;'>
+        """, unsafe_allow_html=True)
     
-    for log in logs:
-        level_colors = {
-            "info": ("#0369a1", "#d0f0ff"),
-            "warning": ("#b45309", "#fef3c7"),
-            "error": ("#991b1b", "#fee2e2"),
-            "debug": ("#374151", "#f3f4f6")
-        }
+        for log in logs:
+            level_colors = {
+                "info": ("#0369a1", "#d0f0ff"),
+                "warning": ("#b45309", "#fef3c7"),
+                "error": ("#991b1b", "#fee2e2"),
+                "debug": ("#374151", "#f3f4f6")
+            }
         
-        level_text_color, level_bg_color = level_colors.get(log.get("level", "info"), ("#0369a1", "#d0f0ff"))
-        status_color = config.SUCCESS_COLOR if log["status"] == "success" else config.ERROR_COLOR
+            level_text_color, level_bg_color = level_colors.get(log.level, ("#0369a1", "#d0f0ff"))
+            status_color = config.SUCCESS_COLOR if log.status == "success" else config.ERROR_COLOR
         
-        with st.expander(f"[{log['level'].upper()}] {log['message'][:60]} - {log['timestamp']}"):
-            col1, col2, col3 = st.columns(3)
+            with st.expander(f"[{log.level.upper()}] {log.message[:60]} - {log.timestamp}"):
+                col1, col2, col3 = st.columns(3)
             
-            with col1:
-                st.markdown(f"**Agent:** {log.get('agentName', 'N/A')}")
-                st.markdown(f"**Trace ID:** `{log.get('traceId', 'N/A')}`")
-                st.markdown(f"**Level:** {log.get('level', 'N/A').upper()}")
+                with col1:
+                    st.markdown(f"**Agent:** {log.agent_name or 'N/A'}")
+                    st.markdown(f"**Trace ID:** `{log.trace_id or 'N/A'}`")
+                    st.markdown(f"**Level:** {(log.level or 'N/A').upper()}")
             
-            with col2:
-                st.markdown(f"**Input Tokens:** {log.get('inputTokens', 0)}")
-                st.markdown(f"**Output Tokens:** {log.get('outputTokens', 0)}")
-                st.markdown(f"**Total Tokens:** {log.get('totalTokens', 0)}")
+                with col2:
+                    st.markdown(f"**Input Tokens:** {log.input_tokens}")
+                    st.markdown(f"**Output Tokens:** {log.output_tokens}")
+                    st.markdown(f"**Total Tokens:** {log.total_tokens}")
             
-            with col3:
-                st.markdown(f"**Latency:** {log.get('latency', 0)}ms")
-                st.markdown(f"**Cost:** ${log.get('cost', 0):.6f}")
-                st.markdown(f"**Status:** {log.get('status', 'N/A').upper()}")
+                with col3:
+                    st.markdown(f"**Latency:** {log.latency}ms")
+                    st.markdown(f"**Cost:** ${log.cost:.6f}")
+                    st.markdown(f"**Status:** {(log.status or 'N/A').upper()}")
             
-            st.divider()
+                st.divider()
             
-            if log.get('input'):
-                st.markdown("**Input:**")
-                st.code(log.get('input', 'N/A')[:200] + "...", language="text")
+                if log.input:
+                    st.markdown("**Input:**")
+                    st.code(str(log.input)[:200] + "...", language="text")
             
-            if log.get('output'):
-                st.markdown("**Output:**")
-                st.code(log.get('output', 'N/A')[:200] + "...", language="text")
+                if log.output:
+                    st.markdown("**Output:**")
+                    st.code(str(log.output)[:200] + "...", language="text")
             
-            if log.get('metadata'):
-                st.markdown("**Metadata:**")
-                st.json(log.get('metadata', {}))
+                if log.metadata:
+                    st.markdown("**Metadata:**")
+                    st.json(log.metadata)
+
+                siblings = log_index.siblings(log)
+                if siblings:
+                    st.markdown(f"**Same trace ({len(siblings)} more):**")
+                    for sibling in siblings[:config.LOG_SIBLINGS_SHOWN]:
+                        st.caption(f"{sibling.timestamp} · {sibling.agent_name or 'N/A'} · {sibling.message[:80]}")
     
-    st.markdown("</div>", unsafe_allow_html=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    else:
+        # Columnar fetch: Arrow record batches when the backend supports them, JSON otherwise
+        with phase("fetch"):
+            logs_frame = api_client.get_logs_frame(
+                limit=limit,
+                level=level_filter,
+                status=status_filter,
+                search=search
+            )
+        columns = [c for c in LOG_TABLE_COLUMNS if c in logs_frame.columns]
+        st.dataframe(logs_frame[columns], use_container_width=True, hide_index=True)
+
+
+def render_templates(api_client, logs: list):
+    """One row per message template with its counts; instances only inside each template"""
+    miner = miner_for(api_client)
+    with phase("prep"):
+        groups = miner.group(logs)
+    st.caption(f"{len(logs)} logs in {len(groups)} templates ({len(miner.templates)} seen on this backend)")
+
+    for group in groups:
+        template, members = group["template"], group["logs"]
+        text = group["text"] or "(empty message)"
+        with st.expander(f"{len(members)}× {text}"):
+            if template:
+                levels = ", ".join(f"{level} {count}" for level, count in template.levels.items())
+                st.caption(f"{template.count:,} seen · first {template.first_seen} · last {template.last_seen} · "
+                           f"{levels} · samples: {', '.join(template.sample_ids)}")
+            instances = [{"timestamp": log.timestamp, "level": log.level, "status": log.status,
+                          "agentName": log.agent_name, "message": log.message, "traceId": log.trace_id,
+                          "latency": log.latency, "cost": log.cost} for log in members]
+            st.dataframe(instances, use_container_width=True, hide_index=True)
@@ -1,10 +1,18 @@
 import streamlit as st
-from lib.api_client import api_client
-from lib.ui_helpers import apply_light_theme, create_token_distribution_chart, create_cost_chart, create_latency_chart
+from lib.client_registry import get_client
+from lib.profiler import phase
+from lib.ui_helpers import (apply_light_theme, create_token_distribution_chart, create_cost_chart,
+                            create_latency_chart, create_attribution_chart)
+from lib.cost_cube import cube_for, DIMENSIONS, MEASURES
 import config
 
+DIMENSION_LABELS = {"agent": "Agent", "model": "Model", "trace": "Trace"}
+MEASURE_LABELS = {"cost": "Cost", "inputTokens": "Input Tokens", "outputTokens": "Output Tokens",
+                  "requests": "Requests"}
+
 def render():
     apply_light_theme()
+    api_client = get_client()
     
     st.markdown("## 📊 Metrics")
     st.markdown("Detailed analytics and performance metrics")
@@ -18,18 +26,20 @@ def render():
     st.divider()
     
     # Get metrics data
-    tokens_data = api_client.get_metrics_tokens(period)
-    costs_data = api_client.get_metrics_costs(period)
-    latency_data = api_client.get_metrics_latency(period)
-    agents_data = api_client.get_agents()
+    with phase("fetch"):
+        tokens_data = api_client.get_metrics_frame("tokens", period)
+        costs_data = api_client.get_metrics_frame("costs", period)
+        latency_data = api_client.get_metrics_frame("latency", period)
+        agents_data = api_client.get_agents()
     
-    tab1, tab2, tab3, tab4 = st.tabs(["📊 Token Usage", "💰 Costs", "⚡ Latency", "🤖 Agent Stats"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 Token Usage", "💰 Costs", "⚡ Latency", "🤖 Agent Stats",
+                                            "🧮 Attribution"])
     
     with tab1:
         st.markdown("### Token Usage Over Time")
         
-        if tokens_data and tokens_data.get("data"):
-            totals = tokens_data.get("totals", {})
+        if not tokens_data.empty:
+            totals = tokens_data.attrs.get("totals", {})
             
             col1, col2, col3 = st.columns(3)
             col1.metric("Input Tokens", f"{totals.get('inputTokens', 0):,}")
@@ -38,14 +48,14 @@ def render():
             
             st.divider()
             
-            fig = create_token_distribution_chart(tokens_data.get("data", []))
+            fig = create_token_distribution_chart(tokens_data)
             st.plotly_chart(fig, use_container_width=True)
     
     with tab2:
         st.markdown("### Costs Over Time")
         
-        if costs_data and costs_data.get("data"):
-            totals = costs_data.get("totals", {})
+        if not costs_data.empty:
+            totals = costs_data.attrs.get("totals", {})
             
             col1, col2 = st.columns(2)
             col1.metric("Total Cost", f"${totals.get('cost', 0):.2f}")
@@ -53,14 +63,14 @@ def render():
             
             st.divider()
             
-            fig = create_cost_chart(costs_data.get("data", []))
+            fig = create_cost_chart(costs_data)
             st.plotly_chart(fig, use_container_width=True)
     
     with tab3:
         st.markdown("### Latency Percentiles")
         
-        if latency_data and latency_data.get("data"):
-            summary = latency_data.get("summary", {})
+        if not latency_data.empty:
+            summary = latency_data.attrs.get("summary", {})
             
             col1, col2, col3, col4 = st.columns(4)
             col1.metric("Avg Latency", f"{summary.get('avg', 0)}ms")
@@ -70,7 +80,7 @@ def render():
             
             st.divider()
             
-            fig = create_latency_chart(latency_data.get("data", []))
+            fig = create_latency_chart(latency_data)
             st.plotly_chart(fig, use_container_width=True)
     
     with tab4:
@@ -81,9 +91,64 @@ def render():
         for agent in agents:
             col1, col2, col3, col4 = st.columns(4)
             
-            col1.metric(f"{agent['name']} - Requests", agent["totalRequests"])
-            col2.metric(f"Success Rate", f"{agent['successRate']:.1f}%")
-            col3.metric(f"Latency", f"{agent['avgLatency']}ms")
-            col4.metric(f"Cost", f"${agent['totalCost']:.2f}")
+            col1.metric(f"{agent.name} - Requests", agent.total_requests)
+            col2.metric(f"Success Rate", f"{agent.success_rate:.1f}%")
+            col3.metric(f"Latency", f"{agent.avg_latency:.0f}ms")
+            col4.metric(f"Cost", f"${agent.total_cost:.2f}")
             
             st.divider()
+
+    with tab5:
+        render_attribution(api_client, period)
+
+
+def render_attribution(api_client, period: str):
+    """Cost and token pivots by agent, model and trace, served from the incremental cube"""
+    st.markdown("### Cost & Token Attribution")
+    cube = cube_for(api_client)
+    with phase("fetch"):
+        cube.sync(api_client)
+    labels = {"agent": cube.agent_names}
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        rows = st.selectbox("Group by", DIMENSIONS, format_func=DIMENSION_LABELS.get, key="cube_rows")
+    with col2:
+        others = [d for d in DIMENSIONS if d != rows]
+        columns = st.selectbox("Then by", [None] + others, key="cube_columns",
+                               format_func=lambda d: "—" if d is None else DIMENSION_LABELS[d])
+    with col3:
+        measure = st.selectbox("Measure", MEASURES, format_func=MEASURE_LABELS.get, key="cube_measure")
+    with col4:
+        values = list(cube.pivot(rows, measure=measure, period=period).index)
+        drill = st.selectbox(f"Drill into {DIMENSION_LABELS[rows].lower()}", [None] + values, key="cube_drill",
+                             format_func=lambda v: "All" if v is None else labels.get(rows, {}).get(v, v))
+
+    # Drilling into one value regroups its slice by the next dimension
+    filters = {}
+    if drill is not None:
+        filters = {rows: drill}
+        rows, columns = columns or others[0], None
+
+    with phase("prep"):
+        table = cube.pivot(rows, columns, measure, period, filters)
+        series = cube.series(rows, measure, period, filters)
+
+    if table.empty:
+        st.info("No log records in this period yet")
+        return
+
+    total = table.to_numpy().sum()
+    col1, col2, col3 = st.columns(3)
+    col1.metric(f"Total {MEASURE_LABELS[measure]}", f"${total:,.2f}" if measure == "cost" else f"{int(total):,}")
+    col2.metric(f"{DIMENSION_LABELS[rows]}s", len(table))
+    col3.metric("Logs Aggregated", f"{cube.logs:,}")
+
+    fig = create_attribution_chart(series, rows, measure, labels.get(rows))
+    st.plotly_chart(fig, use_container_width=True)
+
+    shown = table.rename(index=labels.get(rows, {}), columns=labels.get(columns, {}) if columns else {})
+    shown.index.name = DIMENSION_LABELS[rows]
+    st.dataframe(shown, use_container_width=True)
+    st.caption(f"Aggregated from {cube.logs:,} logs; smaller {DIMENSION_LABELS[rows].lower()}s are merged into "
+               f"\"Other\" beyond the top {cube.top_k[rows]}")
@@ -1,21 +1,50 @@
 import streamlit as st
-from lib.api_client import api_client
+from lib.anomaly import detector, anomalies_for, baseline_delta, describe
+from lib.client_registry import get_client
+from lib.profiler import phase
+from lib.topk import tracker_for
 from lib.ui_helpers import render_stat_card, apply_light_theme, create_activity_chart, render_agent_badge
 import config
 
+HOTSPOT_VIEWS = {
+    "🐢 Slowest calls": ("log", "latency", "{:,.0f}ms"),
+    "💸 Costliest calls": ("log", "cost", "${:.4f}"),
+    "🔤 Most tokens per call": ("log", "tokens", "{:,.0f} tok"),
+    "⏱️ Longest traces": ("trace", "duration", "{:,.0f}ms"),
+    "💰 Costliest traces": ("trace", "cost", "${:.4f}"),
+    "🧵 Most tokens per trace": ("trace", "tokens", "{:,.0f} tok"),
+    "🚨 Noisiest agents": ("agent", "errors", "{:,.0f} errors"),
+}
+
+
+def _open_hotspot(kind: str, record_id: str):
+    if kind == "agent":
+        st.session_state.selected_agent_id = record_id
+        st.session_state.page = "agent_detail"
+    else:
+        st.session_state.hotspot = (kind, record_id)
+
+
 def render():
     apply_light_theme()
+    api_client = get_client()
     
     st.markdown("## 📊 Overview")
     st.markdown("Real-time system metrics and agent activity")
     st.divider()
     
     # Get stats
-    stats = api_client.get_overview_stats()
-    activity = api_client.get_overview_activity()
-    orchestrator = api_client.get_orchestrator_status()
-    agents = api_client.get_agents()
-    logs = api_client.get_logs(limit=5)
+    with phase("fetch"):
+        stats, activity, orchestrator, agents, logs = api_client.batch(
+            lambda c: c.get_overview_stats(),
+            lambda c: c.get_overview_activity(),
+            lambda c: c.get_orchestrator_status(),
+            lambda c: c.get_agents(),
+            lambda c: c.get_logs(limit=5),
+        )
+    agent_list = agents.get("agents", [])
+    # The detector is fed by the client's listener (fresh responses only), never from fallbacks
+    anomalies = anomalies_for(api_client)
     
     # Key metrics row
     st.markdown("### Key Metrics")
@@ -23,13 +52,22 @@ def render():
     
     render_stat_card(col1, "Active Agents", str(stats.get("activeAgents", 0)), 
                     f"of {stats.get('totalAgents', 0)}", "🤖", config.SUCCESS_COLOR)
-    render_stat_card(col2, "Success Rate", f"{stats.get('successRate', 0):.1f}%", 
-                    "+2.5% from yesterday", "✅", config.SUCCESS_COLOR)
-    render_stat_card(col3, "Avg Latency", f"{stats.get('avgLatency', 0)}ms", 
-                    "-15ms from avg", "⚡", config.PRIMARY_COLOR)
+    render_stat_card(col2, "Success Rate", f"{stats.get('successRate', 0):.1f}%",
+                    baseline_delta(detector.latest(api_client.base_url, "all", "errorRate"), "{:+.1f} pts", -1),
+                    "✅", config.SUCCESS_COLOR)
+    render_stat_card(col3, "Avg Latency", f"{stats.get('avgLatency', 0)}ms",
+                    baseline_delta(detector.latest(api_client.base_url, "all", "latency"), "{:+.0f}ms"),
+                    "⚡", config.PRIMARY_COLOR)
     render_stat_card(col4, "Total Cost", f"${stats.get('totalCost', 0):.2f}", 
                     f"{stats.get('totalTokens', 0):,} tokens", "💰", config.WARNING_COLOR)
     
+    # Regressions against each agent's usual level for this hour
+    if anomalies:
+        names = {agent.id: agent.name for agent in agent_list}
+        for anomaly in anomalies[:5]:
+            scope = "All agents" if anomaly["scope"] == "all" else names.get(anomaly["scope"], anomaly["scope"])
+            st.warning(f"⚠️ **{scope}**: {describe(anomaly)} (z={anomaly['z']:.1f})")
+
     st.divider()
     
     # Activity chart
@@ -39,26 +77,30 @@ def render():
         st.plotly_chart(fig, use_container_width=True)
     
     st.divider()
+
+    render_hotspots(api_client)
+
+    st.divider()
     
     # Agent status and recent activity
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("### 🤖 Agent Status")
-        agent_list = agents.get("agents", [])
+        flagged = {anomaly["scope"] for anomaly in anomalies}
         
         for agent in agent_list[:6]:
-            status_color = config.SUCCESS_COLOR if agent["status"] == "active" else config.WARNING_COLOR
+            status_color = config.SUCCESS_COLOR if agent.status == "active" else config.WARNING_COLOR
             st.markdown(f"""
             <div style='background: white; padding: 12px; border-radius: 8px; border: 1px solid {config.NEUTRAL_BORDER}; margin-bottom: 8px;'>
                 <div style='display: flex; justify-content: space-between; align-items: center;'>
                     <div>
-                        <div style='font-weight: 600; color: {config.NEUTRAL_TEXT};'>{agent["name"]}</div>
-                        <div style='font-size: 12px; color: #94a3b8; margin-top: 2px;'>{agent["totalRequests"]} requests</div>
+                        <div style='font-weight: 600; color: {config.NEUTRAL_TEXT};'>{"⚠️ " if agent.id in flagged else ""}{agent.name}</div>
+                        <div style='font-size: 12px; color: #94a3b8; margin-top: 2px;'>{agent.total_requests} requests</div>
                     </div>
                     <div style='text-align: right;'>
-                        <div style='display: inline-block; padding: 4px 8px; border-radius: 6px; background-color: {status_color}20; color: {status_color}; font-size: 11px; font-weight: 600;'>{agent["status"].upper()}</div>
-                        <div style='font-size: 12px; color: #94a3b8; margin-top: 4px;'>{agent["successRate"]:.1f}% success</div>
+                        <div style='display: inline-block; padding: 4px 8px; border-radius: 6px; background-color: {status_color}20; color: {status_color}; font-size: 11px; font-weight: 600;'>{agent.status.upper()}</div>
+                        <div style='font-size: 12px; color: #94a3b8; margin-top: 4px;'>{agent.success_rate:.1f}% success</div>
                     </div>
                 </div>
             </div>
@@ -75,17 +117,61 @@ def render():
                 "error": "#991b1b",
                 "debug": "#374151"
             }
-            level_color = level_colors.get(log.get("level", "info"), "#0369a1")
-            status_color = config.SUCCESS_COLOR if log["status"] == "success" else config.ERROR_COLOR
+            level_color = level_colors.get(log.level, "#0369a1")
+            status_color = config.SUCCESS_COLOR if log.status == "success" else config.ERROR_COLOR
             
             st.markdown(f"""
             <div style='background: white; padding: 12px; border-radius: 8px; border: 1px solid {config.NEUTRAL_BORDER}; margin-bottom: 8px;'>
                 <div style='display: flex; gap: 8px; align-items: start;'>
-                    <div style='padding: 2px 6px; border-radius: 4px; background-color: {level_color}20; color: {level_color}; font-size: 10px; font-weight: 600; white-space: nowrap;'>{log["level"].upper()}</div>
+                    <div style='padding: 2px 6px; border-radius: 4px; background-color: {level_color}20; color: {level_color}; font-size: 10px; font-weight: 600; white-space: nowrap;'>{log.level.upper()}</div>
                     <div style='flex: 1;'>
-                        <div style='font-size: 12px; color: {config.NEUTRAL_TEXT}; font-weight: 500;'>{log["message"][:50]}</div>
-                        <div style='font-size: 11px; color: #94a3b8; margin-top: 2px;'>{log["timestamp"]}</div>
+                        <div style='font-size: 12px; color: {config.NEUTRAL_TEXT}; font-weight: 500;'>{log.message[:50]}</div>
+                        <div style='font-size: 11px; color: #94a3b8; margin-top: 2px;'>{log.timestamp}</div>
                     </div>
                 </div>
             </div>
             """, unsafe_allow_html=True)
+
+
+def render_hotspots(api_client):
+    """Rolling top-K calls, traces and agents, with click-through to their details
+
+    The tracker only sees what the client's listeners report: logs and traces pages
+    other pages fetch from the backend. Mock fallbacks are never reported.
+    """
+    st.markdown("### 🔥 Hotspots")
+    tracker = tracker_for(api_client)
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        view = st.selectbox("Hotspot", list(HOTSPOT_VIEWS), key="hotspot_view", label_visibility="collapsed")
+    with col2:
+        window = st.radio("Window", ["1h", "6h", "24h"], index=1, horizontal=True, key="hotspot_window",
+                          label_visibility="collapsed")
+    kind, metric, template = HOTSPOT_VIEWS[view]
+    hits = tracker.noisiest_agents(window) if kind == "agent" else tracker.top(kind, metric, window)
+    if not hits:
+        st.caption("Nothing recorded in this window yet; hotspots fill in as the Logs and Traces pages "
+                   "load data from the backend")
+        return
+
+    for rank, hit in enumerate(hits, 1):
+        col1, col2, col3, col4 = st.columns([1, 5, 2, 1])
+        col1.markdown(f"**{rank}.** {template.format(hit.value)}")
+        if kind == "log":
+            col2.markdown(f"{hit.label[:70]} · {tracker.agent_names.get(hit.agent_id, hit.agent_id)}")
+        elif kind == "trace":
+            col2.markdown(f"{hit.label} · `{hit.id}`")
+        else:
+            col2.markdown(hit.label)
+        col3.caption(hit.timestamp)
+        col4.button("Open", key=f"hotspot_{kind}_{hit.id}", on_click=_open_hotspot, args=(kind, hit.id))
+
+    selected = st.session_state.get("hotspot")
+    if selected:
+        kind, record_id = selected
+        with phase("fetch"):
+            detail = api_client.get_log_detail(record_id) if kind == "log" else api_client.get_trace_detail(record_id)
+        with st.expander(f"{kind.title()} {record_id}", expanded=True):
+            st.button("Close", key="hotspot_close", on_click=st.session_state.pop, args=("hotspot", None))
+            st.json(detail)
@@ -1,10 +1,16 @@
 import streamlit as st
-from lib.api_client import api_client
+from lib.client_registry import get_client, registry, DEFAULT_BASE_URL
+from lib.profiler import phase
 from lib.ui_helpers import apply_light_theme
+from lib.instrumentation import instrumentation
+from lib.prefetch import prefetcher
+from lib.session_memory import session_memory
+import pandas as pd
 import config
 
 def render():
     apply_light_theme()
+    api_client = get_client()
     
     st.markdown("## ⚙️ Settings")
     st.markdown("Configure your monitoring dashboard")
@@ -17,28 +23,32 @@ def render():
     
     with col1:
         st.markdown("**Base URL**")
-        base_url = st.text_input("API Base URL", value=config.API_BASE_URL, 
-                                placeholder="http://localhost:8000")
-        st.markdown("*Where your Python backend is running*")
+        base_url = st.text_input("API Base URL",
+                                 value=st.session_state.get("api_base_url", DEFAULT_BASE_URL),
+                                 placeholder="http://localhost:8000")
+        st.markdown("*Where your Python backend is running (comma-separate several to federate)*")
     
     with col2:
         st.markdown("**WebSocket URL**")
-        ws_url = st.text_input("WebSocket URL", value=config.API_WS_URL,
+        ws_url = st.text_input("WebSocket URL", value=st.session_state.get("api_ws_url", config.API_WS_URL),
                               placeholder="ws://localhost:8000")
         st.markdown("*For real-time log streaming*")
     
     if st.button("Save Configuration", use_container_width=True):
         st.session_state.api_base_url = base_url
         st.session_state.api_ws_url = ws_url
-        st.success("Configuration saved! Refresh the page to apply changes.")
+        # Selecting a backend creates (or reuses) its pooled client and pre-warms connections
+        api_client = get_client()
+        st.success(f"Configuration saved! Now using {api_client.base_url}.")
     
     st.divider()
     
     # Health Status
     st.markdown("### System Health")
     
-    health = api_client.get_health()
-    orchestrator = api_client.get_orchestrator_status()
+    with phase("fetch"):
+        health = api_client.get_health()
+        orchestrator = api_client.get_orchestrator_status()
     
     col1, col2, col3 = st.columns(3)
     
@@ -70,8 +80,63 @@ def render():
             <div style='color: {config.PRIMARY_COLOR}; font-size: 14px; margin-top: 4px;'>{connected} agents</div>
         </div>
         """, unsafe_allow_html=True)
+
+    # Per-backend health when several backends are federated
+    backends = health.get("backends", {})
+    if backends:
+        st.markdown("**Backends**")
+        for url, backend_status in backends.items():
+            icon = "🟢" if backend_status == "healthy" else "🔴"
+            st.caption(f"{icon} {url} — {backend_status}")
     
     st.divider()
+
+    # Client instrumentation
+    st.markdown("### Dashboard Performance")
+    rows = instrumentation.snapshot()
+    if rows:
+        perf = pd.DataFrame(rows)
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("API Requests", f"{perf['requests'].sum():,}")
+        with col2:
+            lookups = perf["cache_hits"].sum() + perf["cache_misses"].sum()
+            hit_rate = perf["cache_hits"].sum() / lookups * 100 if lookups else 0
+            st.metric("Cache Hit Rate", f"{hit_rate:.0f}%")
+        with col3:
+            st.metric("Mock Fallbacks", f"{perf['fallbacks'].sum():,}")
+        with col4:
+            open_breakers = (perf.drop_duplicates("backend")["breaker"] != "closed").sum()
+            st.metric("Open Breakers", f"{open_breakers}")
+        st.dataframe(perf, use_container_width=True, hide_index=True)
+    else:
+        st.caption("No API calls recorded yet")
+    prefetch = prefetcher.stats()
+    st.caption(f"Agent detail prefetch: {prefetch['entries']} cached, {prefetch['hits']} hits, "
+               f"{prefetch['misses']} misses, {prefetch['dropped']} dropped")
+
+    # Session state memory
+    st.markdown("**Memory**")
+    current = session_memory.current()
+    sessions = session_memory.stats()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("This Session", f"{(current.bytes if current else 0) / 1e6:.2f} MB",
+                  help=f"Cap {config.SESSION_MEMORY_CAP_MB} MB")
+    with col2:
+        st.metric("All Sessions", f"{session_memory.total_bytes() / 1e6:.2f} MB",
+                  help=f"Cap {config.GLOBAL_SESSION_MEMORY_CAP_MB} MB")
+    with col3:
+        st.metric("Shared Response Cache", f"{registry.cache_bytes() / 1e6:.2f} MB")
+    with col4:
+        st.metric("Sessions", len(sessions))
+    if sessions:
+        st.dataframe(pd.DataFrame(sessions), use_container_width=True, hide_index=True)
+    if config.METRICS_EXPORTER_PORT:
+        st.caption(f"Prometheus metrics: "
+                   f"http://{config.METRICS_EXPORTER_HOST}:{config.METRICS_EXPORTER_PORT}/metrics")
+
+    st.divider()
     
     # API Endpoints Reference
     st.markdown("### API Endpoints Reference")
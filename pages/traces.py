@@ -1,8 +1,11 @@
 import streamlit as st
-from lib.api_client import api_client
-from lib.ui_helpers import apply_light_theme
+from lib.client_registry import get_client
+from lib.intervals import trace_index
+from lib.log_index import index_for, breakdown
+from lib.profiler import phase
+from lib.ui_helpers import apply_light_theme, render_export_panel, render_missing_backends, create_concurrency_chart
 import config
-from datetime import datetime
+from datetime import datetime, timezone
 
 # Define color palette
 CARD_BG = "#f0f8ff"  # AliceBlue / soft sky blue
@@ -16,6 +19,7 @@ WARNING_COLOR = "#facc15"  # yellow
 
 def render():
     apply_light_theme()
+    api_client = get_client()
 
     st.markdown("<h2 style='color:{};'>🔗 Traces</h2>".format(TEXT_PRIMARY), unsafe_allow_html=True)
     st.markdown("<p style='color:{};'>Session and execution traces from your agents</p>".format(TEXT_SECONDARY),
@@ -37,24 +41,32 @@ def render():
         )
 
     # Fetch traces
-    traces_data = api_client.get_traces(limit=limit)
+    with phase("fetch"):
+        traces_data = api_client.get_traces(limit=limit)
     traces = traces_data.get("traces", [])
+    # Filled by the client's listener from every logs page any page downloads
+    log_index = index_for(api_client)
 
     # Local filtering by status
     if status_filter != "all":
-        traces = [t for t in traces if t.get("status") == status_filter]
+        traces = [t for t in traces if t.status == status_filter]
 
     st.markdown(
         f"<h4 style='color:{TEXT_PRIMARY};'>Found {len(traces)} Traces (Total: {traces_data.get('total', 0)})</h4>",
         unsafe_allow_html=True)
+    render_missing_backends(traces_data)
+
+    render_export_panel(api_client, "traces")
+
+    render_concurrency(api_client)
 
     # Display traces as card-like expanders
     if traces:
         for trace in traces:
             # Determine status color
             status_color = (
-                SUCCESS_COLOR if trace.get("status") == "completed"
-                else ERROR_COLOR if trace.get("status") == "error"
+                SUCCESS_COLOR if trace.status == "completed"
+                else ERROR_COLOR if trace.status == "error"
                 else WARNING_COLOR
             )
 
@@ -64,35 +76,35 @@ def render():
                     f"""
                     <div style='background-color:{CARD_BG}; border:1px solid {CARD_BORDER}; border-radius:12px; padding:16px; margin-bottom:12px;'>
                         <div style='display:flex; justify-content:space-between; align-items:center; margin-bottom:12px;'>
-                            <div style='color:{TEXT_PRIMARY}; font-weight:700;'>{trace.get('name', 'N/A')}</div>
-                            <div style='color:{status_color}; font-weight:700;'>{trace.get('status', 'N/A').upper()}</div>
+                            <div style='color:{TEXT_PRIMARY}; font-weight:700;'>{trace.name or 'N/A'}</div>
+                            <div style='color:{status_color}; font-weight:700;'>{(trace.status or 'N/A').upper()}</div>
                         </div>
                     </div>
                     """, unsafe_allow_html=True
                 )
 
                 # Expander for details
-                expander_label = f"Details - {trace.get('totalSpans', 0)} spans"
+                expander_label = f"Details - {trace.total_spans} spans"
                 with st.expander(expander_label):
                     col1, col2, col3, col4 = st.columns(4)
 
                     with col1:
-                        duration_sec = trace.get('duration', 0) / 1000
+                        duration_sec = trace.duration / 1000
                         st.metric("Duration", f"{duration_sec:.2f}s")
 
                     with col2:
-                        st.metric("Total Tokens", f"{trace.get('totalTokens', 0):,}")
+                        st.metric("Total Tokens", f"{trace.total_tokens:,}")
 
                     with col3:
-                        st.metric("Total Cost", f"${trace.get('totalCost', 0):.4f}")
+                        st.metric("Total Cost", f"${trace.total_cost:.4f}")
 
                     with col4:
-                        st.metric("Agents", len(trace.get("agents", [])))
+                        st.metric("Agents", len(trace.agents))
 
                     st.divider()
 
                     # Additional details
-                    start_time = trace.get('startTime')
+                    start_time = trace.start_time
                     if start_time:
                         try:
                             start_time = datetime.fromisoformat(start_time).strftime("%Y-%m-%d %H:%M:%S")
@@ -100,11 +112,13 @@ def render():
                             pass
                     st.markdown(f"**Start Time:** {start_time or 'N/A'}")
 
-                    agents_involved = trace.get('agents', [])
+                    agents_involved = trace.agents
                     st.markdown(f"**Agents Involved:** {', '.join(agents_involved) if agents_involved else 'None'}")
 
+                    render_trace_logs(api_client, log_index, trace)
+
                     # Metadata section
-                    metadata = trace.get('metadata', {})
+                    metadata = trace.metadata
                     st.markdown("**Metadata:**")
                     if metadata:
                         st.json(metadata)
@@ -112,3 +126,83 @@ def render():
                         st.info("No metadata available")
     else:
         st.info("No traces found with the selected filters.")
+
+
+def _request_trace_logs(trace_id: str):
+    st.session_state.setdefault("trace_logs_requested", set()).add(trace_id)
+
+
+def render_trace_logs(api_client, log_index, trace):
+    """A trace's logs with tokens and cost per agent and model, from the join index when complete"""
+    st.markdown("**Logs:**")
+    indexed = log_index.for_trace(trace.id)
+    if len(indexed) < trace.total_spans and trace.id not in st.session_state.get("trace_logs_requested", ()):
+        st.caption(f"{len(indexed)} of {trace.total_spans} logs in the local window")
+        st.button("Load logs from server", key=f"trace_logs_{trace.id}", on_click=_request_trace_logs,
+                  args=(trace.id,))
+        return
+    with phase("fetch"):
+        result = log_index.trace_logs(api_client, trace)
+    logs = result["logs"]
+    if not logs:
+        st.info("No logs recorded for this trace")
+        return
+
+    st.dataframe(breakdown(logs), use_container_width=True, hide_index=True)
+    st.dataframe([{"timestamp": log.timestamp, "agentName": log.agent_name, "model": log.model, "level": log.level,
+                   "message": log.message, "inputTokens": log.input_tokens, "outputTokens": log.output_tokens,
+                   "latency": log.latency, "cost": log.cost} for log in logs],
+                 use_container_width=True, hide_index=True)
+    st.caption(f"{len(logs)} logs from {'the local index' if result['source'] == 'index' else 'the backend'}")
+
+
+def render_concurrency(api_client):
+    """In-flight traces over time, with the busiest moments and the agents overlapping in them"""
+    with st.expander("📈 Concurrency timeline", expanded=True):
+        col1, col2 = st.columns([2, 2])
+        with col1:
+            window = st.selectbox("Traces to analyse", config.TRACE_TIMELINE_SIZES, key="trace_timeline_size",
+                                  format_func=lambda n: f"Last {n:,}")
+        with col2:
+            buckets = st.select_slider("Resolution (buckets)", [100, 250, 500, 1000], value=500,
+                                       key="trace_timeline_buckets")
+
+        # The window is large, so it is fetched only on request and its index kept for later reruns
+        analysed = st.session_state.get("trace_timeline")
+        current = analysed is not None and analysed[0] == (api_client.base_url, window)
+        if st.button("Refresh" if current else "Analyse", key="trace_timeline_run"):
+            with phase("fetch"):
+                window_traces = api_client.get_traces(limit=window).get("traces", [])
+            with phase("prep"):
+                analysed = ((api_client.base_url, window), trace_index(window_traces))
+            st.session_state.trace_timeline = analysed
+            current = True
+        if not current:
+            st.caption(f"Analyse fetches the last {window:,} traces")
+            return
+        index = analysed[1]
+        if index is None:
+            st.info("No traces with a start time in this window.")
+            return
+        with phase("prep"):
+            timeline = index.timeline(index.starts[0], index.ends[-1], buckets)
+            peaks = index.peaks(timeline, k=5, separation=max(1, buckets // 50))
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Traces", f"{len(index):,}")
+        with col2:
+            st.metric("Peak In Flight", peaks[0]["concurrency"] if peaks else 0)
+        with col3:
+            st.metric("In Flight At Window End", index.active_at(index.ends[-1] - 1e-6))
+
+        fig = create_concurrency_chart(timeline, peaks)
+        st.plotly_chart(fig, use_container_width=True)
+
+        # Which agents were busy together at each peak
+        for peak in peaks:
+            overlapping = index.items_overlapping(peak["time"], peak["time"])
+            agents = sorted({agent for trace in overlapping for agent in trace.agents})
+            at = datetime.fromtimestamp(peak["time"], tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+            st.markdown(f"**{at} UTC** — {peak['concurrency']} traces in flight; "
+                        f"agents: {', '.join(agents) if agents else 'None'}")